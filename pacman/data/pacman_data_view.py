@@ -24,6 +24,10 @@ from spinn_machine.data import MachineDataView
 from pacman.exceptions import PacmanNotPlacedError
 from pacman.model.graphs.application import ApplicationGraph
 from pacman.model.resources import AbstractSDRAM, ConstantSDRAM
+from pacman.model.routing_table_by_partition.partition_routes import (
+    PartitionRoutesCache)
+from pacman.utilities.algorithm_utilities.machine_topology import (
+    MachineTopology)
 
 if TYPE_CHECKING:
     from pacman.model.graphs import AbstractEdgePartition
@@ -65,6 +69,8 @@ class _PacmanDataModel(object):
     __slots__ = (
         # Data values cached
         "_graph",
+        "_machine_topology",
+        "_partition_routes_cache",
         "_placements",
         "_plan_n_timesteps",
         "_precompressed",
@@ -92,6 +98,8 @@ class _PacmanDataModel(object):
         self._graph = ApplicationGraph()
         # set at the start of every run
         self._plan_n_timesteps: Optional[int] = None
+        # kept over hard resets so that unchanged partitions can reuse routes
+        self._partition_routes_cache = PartitionRoutesCache()
         self._hard_reset()
 
     def _hard_reset(self) -> None:
@@ -100,6 +108,7 @@ class _PacmanDataModel(object):
         """
         if self._graph:
             self._graph.reset()
+        self._machine_topology: Optional[MachineTopology] = None
         self._placements: Optional[Placements] = None
         self._precompressed: Optional[MulticastRoutingTables] = None
         self._all_monitor_vertices: List[MachineVertex] = []
@@ -333,6 +342,27 @@ class PacmanDataView(MachineDataView):
         for app_vertex in cls.__pacman_data._graph.vertices:
             yield from app_vertex.machine_vertices
 
+    # machine topology
+
+    @classmethod
+    def get_machine_topology(cls) -> MachineTopology:
+        """
+        The integer-indexed topology of the current machine.
+
+        This is built the first time it is asked for and then reused until
+        the machine changes, at which point it is rebuilt.
+
+        :rtype: MachineTopology
+        :raises ~spinn_utilities.exceptions.SpiNNUtilsException:
+            If the machine is currently unavailable
+        """
+        machine = cls.get_machine()
+        topology = cls.__pacman_data._machine_topology
+        if topology is None or topology.machine is not machine:
+            topology = MachineTopology(machine)
+            cls.__pacman_data._machine_topology = topology
+        return topology
+
     # placements
 
     @classmethod
@@ -527,6 +557,19 @@ class PacmanDataView(MachineDataView):
         """
         return cls.__pacman_data._plan_n_timesteps
 
+    @classmethod
+    def get_partition_routes_cache(cls) -> PartitionRoutesCache:
+        """
+        The routes of application partitions kept by the router between
+        runs.
+
+        Unlike most data this is kept over a hard reset, as it is only
+        used for partitions whose routes would not change.
+
+        :rtype: PartitionRoutesCache
+        """
+        return cls.__pacman_data._partition_routes_cache
+
     @classmethod
     def get_routing_table_by_partition(
             cls) -> MulticastRoutingTableByPartition:
@@ -89,13 +89,17 @@ class SplitterFixedLegacy(AbstractSplitterCommon[V], Generic[V]):
         # We know is does because we checked when setting
         lp = cast(LegacyPartitionerAPI, app_vertex)
 
+        fixed_sdram = list()
+        per_timestep_sdram = list()
         for vertex_slice in self.__fixed_slices:
             sdram = lp.get_sdram_used_by_atoms(vertex_slice)
-            chip_counter.add_core(sdram)
+            fixed_sdram.append(sdram.fixed)
+            per_timestep_sdram.append(sdram.per_timestep)
             label = f"{app_vertex.label}{vertex_slice}"
             machine_vertex = lp.create_machine_vertex(
                 vertex_slice, sdram, label)
             app_vertex.remember_machine_vertex(machine_vertex)
+        chip_counter.add_cores(fixed_sdram, per_timestep_sdram)
 
     @overrides(AbstractSplitterCommon.reset_called)
     def reset_called(self) -> None:
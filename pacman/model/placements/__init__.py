@@ -14,5 +14,6 @@
 
 from .placement import Placement
 from .placements import Placements
+from .array_placements import ArrayPlacements
 
-__all__ = ["Placement", "Placements"]
+__all__ = ["ArrayPlacements", "Placement", "Placements"]
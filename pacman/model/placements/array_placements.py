@@ -0,0 +1,329 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Collection, Dict, Iterable, Iterator, List
+
+import numpy
+from numpy.typing import NDArray
+
+from spinn_utilities.typing.coords import XY
+
+from pacman.exceptions import (
+    PacmanAlreadyPlacedError, PacmanNotPlacedError,
+    PacmanProcessorAlreadyOccupiedError, PacmanProcessorNotOccupiedError)
+from pacman.model.graphs.machine.machine_vertex import MachineVertex
+
+from .placement import Placement
+from .placements import Placements
+
+#: The number of processors in each word of the occupancy masks
+_WORD_BITS = 32
+
+
+class ArrayPlacements(Placements):
+    """
+    The placements of vertices on the chips of the machine, held in arrays
+    instead of one :py:class:`Placement` per vertex, for large numbers of
+    placements.
+
+    The vertices are numbered in the order they are placed, with their
+    coordinates held in numpy arrays by that number.  Each chip has a mask
+    of the processors that are occupied, and an array from each processor
+    to the number of the vertex on it.  The :py:class:`Placement` objects
+    are made when asked for, so they are equal to, but not the same
+    objects as, those that were added.
+
+    Placements on each chip are returned in order of processor, and chips
+    in order of x and then y.
+    """
+
+    __slots__ = (
+        # The vertices in the order they were placed
+        "_vertices",
+        # MachineVertex -> index in _vertices
+        "_vertex_ids",
+        # numpy arrays of the x, y and p of each vertex by index; may be
+        # longer than the number of vertices
+        "_xs",
+        "_ys",
+        "_ps",
+        # numpy array of (x, y, word) -> bit mask of occupied processors
+        "_occupied",
+        # numpy array of (x, y) -> number of placements on the chip
+        "_n_on_chip",
+        # numpy array of (x, y, p) -> index of the vertex, or -1 if none
+        "_on_processor")
+
+    def __init__(self, placements: Iterable[Placement] = (),
+                 width: int = 1, height: int = 1, n_processors: int = 1):
+        """
+        :param iterable(Placement) placements: Any initial placements
+        :param int width:
+            The width of the machine, to make the arrays big enough for from
+            the start; they grow as needed anyway
+        :param int height: The height of the machine
+        :param int n_processors: The number of processors on each chip
+        :raise PacmanAlreadyPlacedError:
+            If there is any vertex with more than one placement.
+        :raise PacmanProcessorAlreadyOccupiedError:
+            If two placements are made to the same processor.
+        """
+        super().__init__()
+        self._vertices: List[MachineVertex] = list()
+        self._vertex_ids: Dict[MachineVertex, int] = dict()
+        self._xs: NDArray[numpy.uint16] = numpy.zeros(16, dtype=numpy.uint16)
+        self._ys: NDArray[numpy.uint16] = numpy.zeros(16, dtype=numpy.uint16)
+        self._ps: NDArray[numpy.uint16] = numpy.zeros(16, dtype=numpy.uint16)
+        self._occupied: NDArray[numpy.uint32] = numpy.zeros(
+            (0, 0, 0), dtype=numpy.uint32)
+        self._n_on_chip: NDArray[numpy.uint16] = numpy.zeros(
+            (0, 0), dtype=numpy.uint16)
+        self._on_processor: NDArray[numpy.int32] = numpy.zeros(
+            (0, 0, 0), dtype=numpy.int32)
+        self.__resize(max(width, 1), max(height, 1), max(n_processors, 1))
+        if placements:
+            self.add_placements(placements)
+
+    def __grow_chips(self, x: int, y: int, p: int):
+        """
+        Make the per chip arrays big enough to hold a processor, doubling
+        each dimension that is too small.
+        """
+        width, height, n_processors = self._on_processor.shape
+        while width <= x:
+            width *= 2
+        while height <= y:
+            height *= 2
+        while n_processors <= p:
+            n_processors *= 2
+        self.__resize(width, height, n_processors)
+
+    def __resize(self, width: int, height: int, n_processors: int):
+        """
+        Make the per chip arrays a new size, keeping what they hold.
+        """
+        old_width, old_height, old_processors = self._on_processor.shape
+        old_words = self._occupied.shape[2]
+        occupied = numpy.zeros(
+            (width, height, -(-n_processors // _WORD_BITS)),
+            dtype=numpy.uint32)
+        occupied[:old_width, :old_height, :old_words] = self._occupied
+        self._occupied = occupied
+        n_on_chip = numpy.zeros((width, height), dtype=numpy.uint16)
+        n_on_chip[:old_width, :old_height] = self._n_on_chip
+        self._n_on_chip = n_on_chip
+        on_processor = numpy.full(
+            (width, height, n_processors), -1, dtype=numpy.int32)
+        on_processor[:old_width, :old_height, :old_processors] = \
+            self._on_processor
+        self._on_processor = on_processor
+
+    def __in_range(self, x: int, y: int, p: int) -> bool:
+        width, height, n_processors = self._on_processor.shape
+        return 0 <= x < width and 0 <= y < height and 0 <= p < n_processors
+
+    def __placement(self, index: int) -> Placement:
+        return Placement(
+            self._vertices[index], int(self._xs[index]),
+            int(self._ys[index]), int(self._ps[index]))
+
+    @property
+    def n_placements(self) -> int:
+        """
+        The number of placements.
+
+        :rtype: int
+        """
+        return len(self._vertices)
+
+    def add_placement(self, placement: Placement):
+        """
+        Add a placement.
+
+        :param Placement placement: The placement to add
+        :raise PacmanAlreadyPlacedError:
+            If there is any vertex with more than one placement.
+        :raise PacmanProcessorAlreadyOccupiedError:
+            If two placements are made to the same processor.
+        """
+        x, y, p = placement.location
+        if not self.__in_range(x, y, p):
+            self.__grow_chips(x, y, p)
+        word, bit = divmod(p, _WORD_BITS)
+        if (int(self._occupied[x, y, word]) >> bit) & 1:
+            raise PacmanProcessorAlreadyOccupiedError((x, y, p))
+        vertex = placement.vertex
+        if vertex in self._vertex_ids:
+            raise PacmanAlreadyPlacedError(vertex)
+
+        index = len(self._vertices)
+        if index == len(self._xs):
+            self._xs = numpy.concatenate((self._xs, self._xs))
+            self._ys = numpy.concatenate((self._ys, self._ys))
+            self._ps = numpy.concatenate((self._ps, self._ps))
+        self._xs[index] = x
+        self._ys[index] = y
+        self._ps[index] = p
+        self._vertices.append(vertex)
+        self._vertex_ids[vertex] = index
+        self._occupied[x, y, word] |= numpy.uint32(1 << bit)
+        self._n_on_chip[x, y] += 1
+        self._on_processor[x, y, p] = index
+
+    def get_placement_on_processor(self, x: int, y: int, p: int) -> Placement:
+        """
+        Get the placement on a specific processor, or raises an exception
+        if the processor has not been allocated.
+
+        :param int x: the x coordinate of the chip
+        :param int y: the y coordinate of the chip
+        :param int p: the processor on the chip
+        :return: the placement on the given processor
+        :rtype: Placement
+        :raise PacmanProcessorNotOccupiedError:
+            If the processor is not occupied
+        """
+        if not self.is_processor_occupied(x, y, p):
+            raise PacmanProcessorNotOccupiedError((x, y, p))
+        return self.__placement(int(self._on_processor[x, y, p]))
+
+    def is_vertex_placed(self, vertex: MachineVertex) -> bool:
+        """
+        Determine if a vertex has been placed.
+
+        :param MachineVertex vertex: The vertex to determine the status of
+        :rtype: bool
+        """
+        return vertex in self._vertex_ids
+
+    def get_placement_of_vertex(self, vertex: MachineVertex) -> Placement:
+        """
+        Return the placement information for a vertex.
+
+        :param MachineVertex vertex: The vertex to find the placement of
+        :return: The placement
+        :rtype: Placement
+        :raise PacmanNotPlacedError: If the vertex has not been placed.
+        """
+        try:
+            return self.__placement(self._vertex_ids[vertex])
+        except KeyError as e:
+            raise PacmanNotPlacedError(vertex) from e
+
+    def is_processor_occupied(self, x: int, y: int, p: int) -> bool:
+        """
+        Determine if a processor has a vertex on it.
+
+        :param int x: x coordinate of processor.
+        :param int y: y coordinate of processor.
+        :param int p: Index of processor.
+        :return bool: Whether the processor has an assigned vertex.
+        """
+        if not self.__in_range(x, y, p):
+            return False
+        word, bit = divmod(p, _WORD_BITS)
+        return bool((int(self._occupied[x, y, word]) >> bit) & 1)
+
+    def iterate_placements_on_core(self, xy: XY) -> Iterable[Placement]:
+        """
+        Iterate over placements with this x and y.
+
+        :param tuple(int, int) xy: x and y coordinates to find placements for.
+        :rtype: iterable(Placement)
+        """
+        return self.placements_on_chip(xy)
+
+    def iterate_placements_by_xy_and_type(
+            self, xy: XY, vertex_type: type) -> Iterable[Placement]:
+        """
+        Iterate over placements with this x, y and this vertex_type.
+
+        :param tuple(int, int) xy: x and y coordinate to find placements for.
+        :param class vertex_type: Class of vertex to find
+        :rtype: iterable(Placement)
+        """
+        for placement in self.placements_on_chip(xy):
+            if isinstance(placement.vertex, vertex_type):
+                yield placement
+
+    def iterate_placements_by_vertex_type(
+            self, vertex_type: type) -> Iterable[Placement]:
+        """
+        Iterate over placements on any chip with this vertex_type.
+
+        :param class vertex_type: Class of vertex to find
+        :rtype: iterable(Placement)
+        """
+        for index, vertex in enumerate(self._vertices):
+            if isinstance(vertex, vertex_type):
+                yield self.__placement(index)
+
+    def n_placements_on_chip(self, xy: XY) -> int:
+        """
+        The number of placements on the given chip.
+
+        :param tuple(int, int) xy: x and y coordinate of chip.
+        :rtype: int
+        """
+        x, y = xy
+        if not self.__in_range(x, y, 0):
+            return 0
+        return int(self._n_on_chip[x, y])
+
+    @property
+    def placements(self) -> Iterable[Placement]:
+        """
+        All of the placements.
+
+        :return: iterable of placements
+        :rtype: iterable(Placement)
+        """
+        return iter(self)
+
+    def placements_on_chip(self, xy: XY) -> Collection[Placement]:
+        """
+        Get the placements on a specific chip.
+
+        :param tuple(int , int) xy: The x and y coordinates of the chip
+        :rtype: iterable(Placement)
+        """
+        x, y = xy
+        if not self.__in_range(x, y, 0) or not self._n_on_chip[x, y]:
+            return []
+        indices = self._on_processor[x, y]
+        return [self.__placement(int(index))
+                for index in indices[indices >= 0]]
+
+    @property
+    def chips_with_placements(self) -> Iterable[XY]:
+        """
+        The chips with placements on them.
+
+        :rtype: iterable(tuple(int,int))
+        """
+        xs, ys = numpy.nonzero(self._n_on_chip)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def __repr__(self) -> str:
+        return "".join(repr(xy) for xy in self.chips_with_placements)
+
+    def __iter__(self) -> Iterator[Placement]:
+        """
+        An iterator for the placements object within.
+        """
+        for index in range(len(self._vertices)):
+            yield self.__placement(index)
+
+    def __len__(self) -> int:
+        return len(self._vertices)
@@ -16,6 +16,8 @@ from .multicast_routing_table_by_partition import (
     MulticastRoutingTableByPartition)
 from .multicast_routing_table_by_partition_entry import (
     MulticastRoutingTableByPartitionEntry)
+from .partition_routes import PartitionRoutes, PartitionRoutesCache
 
 __all__ = ["MulticastRoutingTableByPartition",
-           "MulticastRoutingTableByPartitionEntry"]
+           "MulticastRoutingTableByPartitionEntry", "PartitionRoutes",
+           "PartitionRoutesCache"]
@@ -88,6 +88,30 @@ class MulticastRoutingTableByPartition(object):
                     "Error merging entries on %s for %s", key, source_key)
                 raise e
 
+    def remove_path_entry(
+            self, router_x: int, router_y: int,
+            source_vertex: AbstractVertex, partition_id: str) -> Optional[
+                MulticastRoutingTableByPartitionEntry]:
+        """
+        Removes a multicast routing path entry, if it exists.
+
+        :param int router_x: the X coordinate of the router
+        :param int router_y: the Y coordinate of the router
+        :param source_vertex: The source that sends via the entry
+        :type source_vertex: ApplicationVertex or MachineVertex
+        :param str partition_id: The ID of the partition being sent
+        :return: The entry removed, or `None` if there was no such entry
+        :rtype: MulticastRoutingTableByPartitionEntry or None
+        """
+        key = (router_x, router_y)
+        entries = self._router_to_entries_map.get(key)
+        if entries is None:
+            return None
+        entry = entries.pop((source_vertex, partition_id), None)
+        if not entries:
+            del self._router_to_entries_map[key]
+        return entry
+
     def get_routers(self) -> Iterator[XY]:
         """
         Get the coordinates of all stored routers.
@@ -0,0 +1,214 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+from typing import (
+    Dict, Hashable, Iterator, List, Optional, Tuple, TYPE_CHECKING)
+from spinn_utilities.typing.coords import XY
+from pacman.model.graphs.application import ApplicationVertex
+if TYPE_CHECKING:
+    from pacman.utilities.algorithm_utilities.machine_topology import (
+        MachineTopology)
+    from pacman.utilities.algorithm_utilities.routing_tree import RoutingTree
+    from .multicast_routing_table_by_partition import (
+        MulticastRoutingTableByPartition)
+    from .multicast_routing_table_by_partition_entry import (
+        MulticastRoutingTableByPartitionEntry)
+
+#: An entry of a partition: the router coordinates, the index of the
+#: source machine vertex in the application vertex (or `None` if the
+#: source is the application vertex), the partition identifier and the entry
+RouteEntry = Tuple[
+    XY, Optional[int], str, "MulticastRoutingTableByPartitionEntry"]
+
+
+class PartitionRoutes(object):
+    """
+    The routes made for one application partition, and the fingerprint
+    of everything that they were made from.
+
+    Sources are held as indices into the machine vertices of the source
+    application vertex, so that the routes stay valid if the machine
+    vertices are recreated in the same order and places.
+    """
+
+    __slots__ = (
+        # The fingerprint of the inputs to routing the partition
+        "_fingerprint",
+        # The routing table entries, in the order they were added
+        "_entries",
+        # The routing trees by chip, or None if not available
+        "_trees")
+
+    def __init__(
+            self, fingerprint: Hashable, entries: List[RouteEntry],
+            trees: Optional[Dict[XY, RoutingTree]] = None):
+        """
+        :param fingerprint:
+            Something that compares equal only if the routes would be the
+            same
+        :param list(tuple) entries:
+            The entries as (router (x, y), source index or `None`,
+            partition identifier, entry)
+        :param trees: The routing trees made by chip, if kept
+        :type trees: dict(tuple(int, int), RoutingTree) or None
+        """
+        self._fingerprint = fingerprint
+        self._entries = entries
+        self._trees = trees
+
+    @property
+    def fingerprint(self) -> Hashable:
+        """
+        The fingerprint of the inputs to routing the partition.
+        """
+        return self._fingerprint
+
+    @property
+    def entries(self) -> List[RouteEntry]:
+        """
+        The routing table entries, in the order they were added.
+
+        :rtype: list(tuple(tuple(int, int), int or None, str,
+            MulticastRoutingTableByPartitionEntry))
+        """
+        return self._entries
+
+    @property
+    def trees(self) -> Optional[Dict[XY, RoutingTree]]:
+        """
+        The routing trees by chip, if they were kept.
+
+        :rtype: dict(tuple(int, int), RoutingTree) or None
+        """
+        return self._trees
+
+    def add_to(self, routing_tables: MulticastRoutingTableByPartition,
+               source: ApplicationVertex):
+        """
+        Add the entries to a set of routing tables.
+
+        :param MulticastRoutingTableByPartition routing_tables:
+            The tables to add to
+        :param ApplicationVertex source:
+            The current source vertex of the partition
+        """
+        m_vertices = list(source.machine_vertices)
+        for (x, y), index, partition_id, entry in self._entries:
+            vertex = source if index is None else m_vertices[index]
+            routing_tables.add_path_entry(entry, x, y, vertex, partition_id)
+
+
+class PartitionRoutesCache(object):
+    """
+    Routes of application partitions kept from one routing run to the next.
+    """
+
+    __slots__ = (
+        # The signature of the machine and options last routed with
+        "_signature",
+        # The topology the routes were changed to avoid faults on, if any
+        "_topology",
+        # (source vertex, partition identifier) -> PartitionRoutes
+        "_routes")
+
+    def __init__(self) -> None:
+        self._signature: Optional[Hashable] = None
+        self._topology: Optional[MachineTopology] = None
+        self._routes: Dict[
+            Tuple[ApplicationVertex, str], PartitionRoutes] = dict()
+
+    def start(self, signature: Hashable):
+        """
+        Start a routing run, dropping all the routes if the machine or
+        options being routed with have changed.
+
+        :param signature:
+            Something that compares equal only if the machine and options
+            are the same
+        """
+        if signature != self._signature:
+            self._routes = dict()
+            self._signature = signature
+            self._topology = None
+
+    def set_signature(self, signature: Hashable,
+                      topology: Optional[MachineTopology] = None):
+        """
+        Record that the kept routes are now for a different machine or
+        options, without dropping them; for example when they have been
+        changed to avoid some faults.
+
+        :param signature:
+        :param topology:
+            The topology without the faults the routes now avoid, if any
+        :type topology: MachineTopology or None
+        """
+        self._signature = signature
+        self._topology = topology
+
+    @property
+    def topology(self) -> Optional[MachineTopology]:
+        """
+        The topology without the faults the kept routes have been changed
+        to avoid, or `None` if they have not been.
+
+        :rtype: MachineTopology or None
+        """
+        return self._topology
+
+    def get_routes(self, source: ApplicationVertex, partition_id: str) -> \
+            Optional[PartitionRoutes]:
+        """
+        Get the routes kept for a partition.
+
+        :param ApplicationVertex source: The source vertex of the partition
+        :param str partition_id: The identifier of the partition
+        :rtype: PartitionRoutes or None
+        """
+        return self._routes.get((source, partition_id))
+
+    def add_routes(self, source: ApplicationVertex, partition_id: str,
+                   routes: PartitionRoutes):
+        """
+        Keep (or replace) the routes of one partition.
+
+        :param ApplicationVertex source: The source vertex of the partition
+        :param str partition_id: The identifier of the partition
+        :param PartitionRoutes routes: The routes to keep
+        """
+        self._routes[source, partition_id] = routes
+
+    def set_routes(self, routes: Dict[
+            Tuple[ApplicationVertex, str], PartitionRoutes]):
+        """
+        Replace all the routes kept, so that routes of partitions that no
+        longer exist are dropped.
+
+        :param dict(tuple(ApplicationVertex, str), PartitionRoutes) routes:
+        """
+        self._routes = routes
+
+    def clear(self) -> None:
+        """
+        Drop all the routes kept.
+        """
+        self._routes = dict()
+        self._signature = None
+        self._topology = None
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def __iter__(self) -> Iterator[Tuple[ApplicationVertex, str]]:
+        return iter(self._routes)
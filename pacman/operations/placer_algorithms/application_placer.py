@@ -14,11 +14,15 @@
 from __future__ import annotations
 import logging
 import os
-from typing import Dict, List, Optional, Tuple, Sequence, Set
+from typing import (
+    Collection, Dict, List, Optional, Tuple, Sequence, Set)
 
-from spinn_utilities.config_holder import get_config_bool
+from spinn_utilities.config_holder import (
+    get_config_bool, get_config_float, get_config_int, get_config_str,
+    get_config_str_or_none)
 from spinn_utilities.log import FormatAdapter
 from spinn_utilities.progress_bar import ProgressBar
+from spinn_utilities.typing.coords import XY
 
 from spinn_machine import Chip
 
@@ -30,6 +34,14 @@ from pacman.model.graphs.application import ApplicationVertex
 from pacman.model.resources import AbstractSDRAM
 from pacman.exceptions import (
     PacmanPlaceException, PacmanConfigurationException, PacmanTooBigToPlace)
+from pacman.utilities.utility_calls import (
+    get_fork_context, map_in_fork, split_into_shards)
+from .board_assignment import assign_boards, assign_regions, board_order
+from .chip_order import chip_order
+from .chip_resources import ChipResources
+from .placement_cache import PlacementCache, machine_fingerprint
+from .placement_refiner import refine_placements
+from .vertex_order import vertex_order
 
 logger = FormatAdapter(logging.getLogger(__name__))
 
@@ -70,16 +82,25 @@ class ApplicationPlacer(object):
 
         # Pointer to the placements including all previous Application Vertices
         "__placements",
-        # A Function to yield the Chips in a consistent order
-        "__chips",
+        # The cores and sdram left on each Chip after the placements,
+        # with the Chips in a consistent order
+        "__resources",
         # Chips that have been fully placed by previous Application Vertices
         "__full_chips",
         # Chips that have already been used by this ApplicationVertex
         "__prepared_chips",
-        # Start Chips from previous ApplicationVertices not yet marked as full
-        "__restored_chips",
-        # Start Chips tried for this ApplicationVertex
-        "__starts_tried",
+        # Index in the Chip order of the next start Chip to consider
+        "__next_start",
+        # Ethernet (x, y) -> range of the indices of the Chips of each board
+        # in the Chip order, if assigning vertices to boards
+        "__board_ranges",
+        # ApplicationVertex -> Ethernet (x, y) of the board assigned to it
+        "__boards",
+        # Range of the indices of the Chips to start on for this
+        # ApplicationVertex, or None if any
+        "__start_range",
+        # Number of start Chips tried for this ApplicationVertex
+        "__n_starts_tried",
         # Label of the current ApplicationVertex for (error) reporting
         "__app_vertex_label",
 
@@ -100,10 +121,12 @@ class ApplicationPlacer(object):
         # List of available neighbours not on the current board
         "__other_board_chips")
 
-    def __init__(self, placements: Placements):
+    def __init__(self, placements: Placements,
+                 chips: Optional[Collection[Chip]] = None):
         """
         :param Placements placements:
-        :param int plan_n_timesteps:
+        :param chips: The only Chips to place on, or None for all of them
+        :type chips: collection(Chip) or None
         """
         # Data cached for speed
         self.__machine = PacmanDataView.get_machine()
@@ -119,12 +142,24 @@ class ApplicationPlacer(object):
         self.__min_sdram = self.__max_sdram // self.__max_cores
 
         self.__placements = placements
-        self.__chips = self._chip_order()
+        ordered_chips = self._chip_order()
+        if chips is not None:
+            ordered_chips = [chip for chip in ordered_chips if chip in chips]
+        self.__resources = ChipResources(
+            ordered_chips, self.__plan_n_timesteps, placements)
 
         self.__full_chips: Set[Chip] = set()
         self.__prepared_chips: Set[Chip] = set()
-        self.__restored_chips: List[Chip] = list()
-        self.__starts_tried: List[Chip] = list()
+        self.__next_start = 0
+        self.__n_starts_tried = 0
+        self.__board_ranges: Dict[XY, Tuple[int, int]] = dict()
+        if get_config_bool("Mapping", "placer_board_assignment"):
+            for index, chip in enumerate(self.__resources.chips):
+                board = (chip.nearest_ethernet_x, chip.nearest_ethernet_y)
+                first, _ = self.__board_ranges.get(board, (index, index))
+                self.__board_ranges[board] = (first, index + 1)
+        self.__boards: Dict[ApplicationVertex, XY] = dict()
+        self.__start_range: Optional[Tuple[int, int]] = None
 
         self.__current_chip: Optional[Chip] = None
         self.__current_cores_free: List[int] = list()
@@ -153,6 +188,7 @@ class ApplicationPlacer(object):
         :raises PacmanTooBigToPlace:
             If the requirements are too big for any chip
         """
+        cache = self._placement_cache(system_placements)
         # Go through the application graph by application vertex
         progress = ProgressBar(
             PacmanDataView.get_n_vertices() * 2, "Placing Vertices")
@@ -162,12 +198,46 @@ class ApplicationPlacer(object):
                 if app_vertex.has_fixed_location():
                     self._place_fixed_vertex(app_vertex)
 
-            for app_vertex in progress.over(PacmanDataView.iterate_vertices()):
+            to_place = vertex_order(
+                PacmanDataView.iterate_vertices(),
+                PacmanDataView.iterate_partitions(),
+                get_config_str("Mapping", "placer_vertex_order"))
+            n_to_place = len(to_place)
+            if cache is not None:
+                to_place = self._restore_vertices(to_place, cache)
+            remaining = to_place
+            n_processes = get_config_int("Mapping", "placer_n_processes")
+            if n_processes and n_processes > 1:
+                remaining = self._place_in_regions(to_place, n_processes)
+            if self.__board_ranges:
+                self.__boards = assign_boards(
+                    [app_vertex for app_vertex in remaining
+                     if not app_vertex.has_fixed_location()],
+                    PacmanDataView.iterate_partitions(), self.__resources,
+                    self.__plan_n_timesteps)
+            for app_vertex in progress.over(remaining):
                 # as this checks if placed already not need to check if fixed
                 self._place_vertex(app_vertex)
         except PacmanPlaceException as e:
             raise self._place_error(system_placements, e) from e
 
+        if to_place:
+            refine_seconds = get_config_float(
+                "Mapping", "placer_refine_seconds")
+            if refine_seconds:
+                self.__placements = refine_placements(
+                    self.__placements, system_placements, refine_seconds)
+        if cache is not None:
+            logger.info(
+                "Restored the placements of {} of {} application vertices",
+                n_to_place - len(to_place), n_to_place)
+            if to_place:
+                cache.save(
+                    (app_vertex for app_vertex in
+                     PacmanDataView.iterate_vertices()
+                     if not app_vertex.has_fixed_location()),
+                    self.__placements)
+
         if get_config_bool("Reports", "draw_placements"):
             # pylint: disable=import-outside-toplevel
             from .draw_placements import draw_placements as dp
@@ -175,6 +245,146 @@ class ApplicationPlacer(object):
 
         return self.__placements
 
+    def _placement_cache(
+            self, system_placements: Placements) -> Optional[PlacementCache]:
+        """
+        The placements kept from earlier runs, if the placer_cache_file
+        config option is set.
+
+        :param Placements system_placements:
+        :rtype: PlacementCache or None
+        """
+        path = get_config_str_or_none("Mapping", "placer_cache_file")
+        if path is None:
+            return None
+        options = [
+            get_config_str("Mapping", option) for option in (
+                "placer_chip_order", "placer_vertex_order",
+                "placer_refine_seconds", "placer_board_assignment")]
+        return PlacementCache(
+            path, machine_fingerprint(system_placements, options))
+
+    def _restore_vertices(
+            self, app_vertices: List[ApplicationVertex],
+            cache: PlacementCache) -> List[ApplicationVertex]:
+        """
+        Put back the application vertices that have placements in the
+        cache where they were, so that the others are placed around them.
+
+        :param list(ApplicationVertex) app_vertices: The vertices to place
+        :param PlacementCache cache:
+        :return: The vertices that still need to be placed, in order
+        :rtype: list(ApplicationVertex)
+        """
+        to_place = list()
+        for app_vertex in app_vertices:
+            placements = None
+            if not app_vertex.has_fixed_location():
+                placements = cache.restore(app_vertex, self.__resources)
+            if placements is None:
+                to_place.append(app_vertex)
+            else:
+                self.__placements.add_placements(placements)
+                self.__resources.add_placements(placements)
+        return to_place
+
+    def _place_in_regions(
+            self, app_vertices: List[ApplicationVertex],
+            n_processes: int) -> List[ApplicationVertex]:
+        """
+        Split the machine into regions of whole boards, assign the
+        application vertices to the regions, and place the vertices of each
+        region on its Chips in a forked process.
+
+        :param list(ApplicationVertex) app_vertices: The vertices to place
+        :param int n_processes: The most processes to place in
+        :return: The vertices that did not fit in a region, still to be
+            placed, in order
+        :rtype: list(ApplicationVertex)
+        """
+        context = get_fork_context()
+        boards: Dict[XY, int] = dict()
+        for chip in self.__resources.chips:
+            boards.setdefault(
+                (chip.nearest_ethernet_x, chip.nearest_ethernet_y),
+                len(boards))
+        shards = split_into_shards(len(boards), n_processes)
+        if context is None or len(shards) < 2 or len(app_vertices) < 2:
+            return app_vertices
+        region_of_board = {
+            board: region for region, shard in enumerate(shards)
+            for board, index in boards.items() if index in shard}
+        regions = assign_regions(
+            [app_vertex for app_vertex in app_vertices
+             if not app_vertex.has_fixed_location()],
+            PacmanDataView.iterate_partitions(), self.__resources,
+            self.__plan_n_timesteps,
+            lambda chip: region_of_board[
+                chip.nearest_ethernet_x, chip.nearest_ethernet_y])
+
+        region_chips: List[Set[Chip]] = [set() for _ in shards]
+        for chip in self.__resources.chips:
+            region_chips[region_of_board[
+                chip.nearest_ethernet_x, chip.nearest_ethernet_y]].add(chip)
+        region_vertices: List[List[ApplicationVertex]] = [
+            list() for _ in shards]
+        for app_vertex in app_vertices:
+            if app_vertex in regions:
+                region_vertices[regions[app_vertex]].append(app_vertex)
+
+        placed: Set[ApplicationVertex] = set()
+        for vertices, region_placed in zip(region_vertices, map_in_fork(
+                (self.__placements, region_chips, region_vertices),
+                _place_region, range(len(shards)), n_processes)):
+            for index, xyps in region_placed:
+                app_vertex = vertices[index]
+                placements = [
+                    Placement(m_vertex, x, y, p)
+                    for m_vertex, (x, y, p) in zip(
+                        app_vertex.machine_vertices, xyps)
+                    if p >= 0]
+                self.__placements.add_placements(placements)
+                self.__resources.add_placements(placements)
+                placed.add(app_vertex)
+        logger.info(
+            "Placed {} of {} application vertices in {} regions in parallel",
+            len(placed), len(app_vertices), len(shards))
+        return [app_vertex for app_vertex in app_vertices
+                if app_vertex not in placed]
+
+    def place_region(self, app_vertices: List[ApplicationVertex]) -> List[
+            Tuple[int, List[Tuple[int, int, int]]]]:
+        """
+        Place application vertices on the Chips of this placer, skipping
+        any that do not fit.
+
+        :param list(ApplicationVertex) app_vertices: The vertices to place
+        :return: The index of each vertex placed, with the (x, y, p) of
+            each of its machine vertices in order, where p is -1 if not
+            placed
+        :rtype: list(tuple(int, list(tuple(int, int, int))))
+        """
+        if self.__board_ranges:
+            self.__boards = assign_boards(
+                app_vertices, PacmanDataView.iterate_partitions(),
+                self.__resources, self.__plan_n_timesteps)
+        placed = list()
+        for index, app_vertex in enumerate(app_vertices):
+            try:
+                self._place_vertex(app_vertex)
+            except PacmanPlaceException:
+                # Placed after the regions, anywhere
+                continue
+            xyps = list()
+            for m_vertex in app_vertex.machine_vertices:
+                if self.__placements.is_vertex_placed(m_vertex):
+                    xyps.append(self.__placements.get_placement_of_vertex(
+                        m_vertex).location)
+                else:
+                    xyps.append((-1, -1, -1))
+            placed.append((index, xyps))
+        return placed
+
     def _place_vertex(self, app_vertex: ApplicationVertex):
         """
         Place the next application vertex
@@ -191,19 +401,49 @@ class ApplicationPlacer(object):
 
         self.__app_vertex_label = app_vertex.label
 
-        # Restore the starts tried last time.
-        # Check if they are full comes later
-        while len(self.__starts_tried) > 0:
-            self.__restored_chips.append(self.__starts_tried.pop(0))
+        placements_to_make = None
+        board = self.__boards.get(app_vertex)
+        if board is not None:
+            # Try starting only on the board assigned, and if it is too
+            # full after all, anywhere
+            self.__start_range = self.__board_ranges[board]
+            try:
+                placements_to_make = self._prepare_from_starts(
+                    same_chip_groups)
+            except PacmanPlaceException:
+                logger.debug(
+                    "{} did not fit on board {}", app_vertex.label, board)
+            finally:
+                self.__start_range = None
+        if placements_to_make is None:
+            placements_to_make = self._prepare_from_starts(same_chip_groups)
+
+        # Now actually add the placements having confirmed all can be done
+        self.__placements.add_placements(placements_to_make)
+        self.__resources.add_placements(placements_to_make)
+
+    def _prepare_from_starts(self, same_chip_groups:  Sequence[
+            Tuple[Sequence[MachineVertex], AbstractSDRAM]]
+            ) -> List[Placement]:
+        """
+        Try to make the placements for this ApplicationVertex from each
+        start Chip in turn until it works.
+
+        :param list(list(MachineVertex), AbstractSdram) same_chip_groups:
+        :rtype: list(Placement)
+        :raises PacmanPlaceException: If no new start Chip is available
+        :raises PacmanTooBigToPlace:
+            If the requirements are too big for any chip
+        """
+        # Consider all the Chips as starts again
+        self.__next_start = 0
+        self.__n_starts_tried = 0
 
         # try to make placements with a different start Chip each time
         while True:
             placements_to_make = self._prepare_placements(same_chip_groups)
             if placements_to_make is not None:
-                break
-
-        # Now actually add the placements having confirmed all can be done
-        self.__placements.add_placements(placements_to_make)
+                return placements_to_make
 
     def _prepare_placements(self, same_chip_groups:  Sequence[
             Tuple[Sequence[MachineVertex], AbstractSDRAM]]
@@ -421,31 +661,40 @@ class ApplicationPlacer(object):
                     raise PacmanConfigurationException(
                         f"Core {fixed.p} on {x}, {y} not available to "
                         f"place {vertex} on")
-                self.__placements.add_placement(
-                    Placement(vertex, x, y, fixed.p))
+                self.__add_placement(Placement(vertex, x, y, fixed.p))
         # Then do the ones without a fixed p
         for vertex in vertices:
             fixed = vertex.get_fixed_location()
             if not fixed or fixed.p is None:
                 try:
-                    self.__placements.add_placement(
+                    self.__add_placement(
                         Placement(vertex, x, y, next(next_cores)))
                 except StopIteration:
                     # pylint: disable=raise-missing-from
                     raise PacmanConfigurationException(
                         f"No more cores available on {x}, {y}: {on_chip}")
 
-    def _chip_order(self):
+    def __add_placement(self, placement: Placement):
+        """
+        Add a placement, keeping the resources left up to date.
+
+        :param Placement placement:
+        """
+        self.__placements.add_placement(placement)
+        self.__resources.add_placement(placement)
+
+    def _chip_order(self) -> List[Chip]:
         """
-        Iterate the Chips in a guaranteed order
+        The Chips in a guaranteed order, as set by the placer_chip_order
+        config option
 
-        :rtype: iterable(Chip)
+        :rtype: list(Chip)
         """
-        for x in range(self.__machine.width):
-            for y in range(self.__machine.height):
-                chip = self.__machine.get_chip_at(x, y)
-                if chip:
-                    yield chip
+        chips = chip_order(
+            self.__machine, get_config_str("Mapping", "placer_chip_order"))
+        if get_config_bool("Mapping", "placer_board_assignment"):
+            chips = board_order(chips)
+        return chips
 
     def _space_on_chip(
             self, chip: Chip, n_cores: int, plan_sdram: int) -> bool:
@@ -474,20 +723,13 @@ class ApplicationPlacer(object):
         :raises PacmanTooBigToPlace:
             If the requirements are too big for any chip
         """
-        cores_free = list(chip.placable_processors_ids)
-        sdram_free = chip.sdram
-
-        # remove the already placed for other Application Vertices
-        on_chip = self.__placements.placements_on_chip(chip)
-        if len(on_chip) == len(cores_free):
+        # What is left after the placements for other Application Vertices
+        n_cores_free = self.__resources.n_cores_free(chip)
+        if n_cores_free == 0:
             self.__full_chips.add(chip)
             return False
 
-        for placement in on_chip:
-            cores_free.remove(placement.p)
-            sdram_free -= placement.vertex.sdram_required.get_total_sdram(
-                self.__plan_n_timesteps)
-
+        sdram_free = self.__resources.sdram_free(chip)
         if sdram_free < self.__min_sdram:
             self.__full_chips.add(chip)
             return False
@@ -496,14 +738,14 @@ class ApplicationPlacer(object):
         # This assumes all groups are the same size so even if too small
         self.__prepared_chips.add(chip)
 
-        if len(cores_free) < n_cores or sdram_free < plan_sdram:
+        if n_cores_free < n_cores or sdram_free < plan_sdram:
             self._check_could_fit(n_cores, plan_sdram)
             return False
 
         # record the current Chip
         self.__current_chip = chip
         # cores are popped out later to keep them here for now
-        self.__current_cores_free = cores_free
+        self.__current_cores_free = self.__resources.cores_free(chip)
         # sdram is the whole group so can be removed now
         self.__current_sdram_free = sdram_free - plan_sdram
 
@@ -576,9 +818,7 @@ class ApplicationPlacer(object):
 
         # Find the next start chip
         while True:
-            start = self._pop_start_chip()
-            # Save as tried as not full even if toO small
-            self.__starts_tried.append(start)
+            start = self._pop_start_chip(n_cores, plan_sdram)
             # Set the Ethernet x and y in case space_on_chip adds neighbours
             self.__ethernet_x = start.nearest_ethernet_x
             self.__ethernet_y = start.nearest_ethernet_y
@@ -588,30 +828,36 @@ class ApplicationPlacer(object):
         logger.debug("Starting placement from {}", start)
         return start
 
-    def _pop_start_chip(self) -> Chip:
+    def _pop_start_chip(self, n_cores: int, plan_sdram: int) -> Chip:
         """
-        Gets the next start Chip from either restored or if none the Machine
-
-        Ignores any Chip that are already full
+        Gets the next start Chip in order, not yet tried for this
+        ApplicationVertex, with space for the group
 
+        :param int n_cores: number of cores needs
+        :param int plan_sdram: minimum amount of SDRAM needed
         :rtype: Chip
         :raises PacmanPlaceException: If no new start Chip is available
+        :raises PacmanTooBigToPlace:
+            If the requirements are too big for any chip
         """
-        while self.__restored_chips:
-            chip = self.__restored_chips.pop(0)
-            if chip not in self.__full_chips:
-                return chip
-        try:
-            start = next(self.__chips)
-            while start in self.__full_chips:
-                start = next(self.__chips)
-            return start
-        except StopIteration:
-            raise PacmanPlaceException(  # pylint: disable=raise-missing-from
+        first = self.__next_start
+        end = len(self.__resources.chips)
+        if self.__start_range is not None:
+            first = max(first, self.__start_range[0])
+            end = self.__start_range[1]
+        index = self.__resources.first_fitting(
+            n_cores, max(plan_sdram, self.__min_sdram), first)
+        if index < 0 or index >= end:
+            self._check_could_fit(n_cores, plan_sdram)
+            n_full = self.__resources.n_chips_without(1, self.__min_sdram)
+            raise PacmanPlaceException(
                 f"No more chips to start with for {self.__app_vertex_label} "
                 f"Out of {self.__machine.n_chips} "
-                f"{len(self.__full_chips)} already full "
-                f"and {len(self.__starts_tried)} tried")
+                f"{n_full} already full "
+                f"and {self.__n_starts_tried} tried")
+        self.__next_start = index + 1
+        self.__n_starts_tried += 1
+        return self.__resources.chips[index]
 
     def _get_next_neighbour(self, n_cores: int, plan_sdram: int):
         """
@@ -669,6 +915,8 @@ class ApplicationPlacer(object):
         """
         for link in chip.router.links:
             target = self.__machine[link.destination_x, link.destination_y]
+            if not self.__resources.has_chip(target):
+                continue
             if (target not in self.__full_chips
                     and target not in self.__prepared_chips):
                 if (target.nearest_ethernet_x == self.__ethernet_x and
@@ -688,7 +936,7 @@ class ApplicationPlacer(object):
             k = next(iter(self.__same_board_chips))
             del self.__same_board_chips[k]
             return k
-        if self.__other_board_chips:
+        if self.__other_board_chips and self.__start_range is None:
             next_chip = next(iter(self.__other_board_chips))
             del self.__other_board_chips[next_chip]
             self.__ethernet_x = next_chip.nearest_ethernet_x
@@ -705,3 +953,21 @@ class ApplicationPlacer(object):
 
         # Signal that there are no more Chips with a None
         return None
+
+
+def _place_region(
+        state: Tuple[
+            Placements, List[Set[Chip]], List[List[ApplicationVertex]]],
+        region: int) -> List[Tuple[int, List[Tuple[int, int, int]]]]:
+    """
+    Place the application vertices of a region on its Chips, in a worker
+    process.
+
+    :param tuple state:
+        The placements so far and the chips and vertices of each region
+    :param int region: The index of the region
+    :return: See :py:meth:`ApplicationPlacer.place_region`
+    """
+    placements, region_chips, region_vertices = state
+    placer = ApplicationPlacer(placements, region_chips[region])
+    return placer.place_region(region_vertices[region])
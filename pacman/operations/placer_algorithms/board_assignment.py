@@ -0,0 +1,236 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from collections import defaultdict
+import logging
+from typing import (
+    Callable, Dict, Hashable, Iterable, List, Optional, Sequence, TypeVar)
+
+from spinn_utilities.log import FormatAdapter
+from spinn_utilities.typing.coords import XY
+from spinn_machine import Chip
+
+from pacman.model.graphs import AbstractVirtual
+from pacman.model.graphs.application import (
+    ApplicationEdgePartition, ApplicationVertex)
+from .chip_resources import ChipResources
+
+logger = FormatAdapter(logging.getLogger(__name__))
+
+#: The type of the regions vertices are assigned to
+R = TypeVar("R", bound=Hashable)
+
+#: The most of the cores and SDRAM of a region to assign, leaving some room
+#: for groups that do not fit in the space left on the chips
+_MAX_FILL = 0.9
+
+#: The most passes to make over the vertices looking for better regions
+_MAX_PASSES = 10
+
+
+class _Region(object):
+    """
+    The cores and SDRAM of a region still to be assigned.
+    """
+
+    __slots__ = (
+        # The cores not yet assigned
+        "n_cores",
+        # The SDRAM not yet assigned
+        "sdram",
+        # The cores and SDRAM the region started with
+        "max_cores",
+        "max_sdram")
+
+    def __init__(self, n_cores: int, sdram: int):
+        self.n_cores = int(n_cores * _MAX_FILL)
+        self.sdram = int(sdram * _MAX_FILL)
+        self.max_cores = max(self.n_cores, 1)
+        self.max_sdram = max(self.sdram, 1)
+
+    def fits(self, n_cores: int, sdram: int) -> bool:
+        """
+        Whether there is still room for some cores and SDRAM.
+        """
+        return n_cores <= self.n_cores and sdram <= self.sdram
+
+    def load(self) -> float:
+        """
+        The most of the cores or SDRAM that has been assigned, as a
+        fraction.
+        """
+        return max(1 - self.n_cores / self.max_cores,
+                   1 - self.sdram / self.max_sdram)
+
+
+def _board_of(chip: Chip) -> XY:
+    return (chip.nearest_ethernet_x, chip.nearest_ethernet_y)
+
+
+def assign_boards(
+        app_vertices: Sequence[ApplicationVertex],
+        partitions: Iterable[ApplicationEdgePartition],
+        resources: ChipResources,
+        plan_n_timesteps: Optional[int]) -> Dict[ApplicationVertex, XY]:
+    """
+    Assign application vertices to boards (the chips with the same nearest
+    Ethernet chip), so that few edges go between boards; see
+    :py:func:`assign_regions`.
+
+    :param list(ApplicationVertex) app_vertices:
+        The vertices to assign, in the order to assign them
+    :param iterable(ApplicationEdgePartition) partitions:
+        The partitions of the edges between the vertices
+    :param ChipResources resources: The cores and SDRAM free on each chip
+    :param plan_n_timesteps:
+        The number of time steps to work out the SDRAM of the vertices for
+    :type plan_n_timesteps: int or None
+    :return: The Ethernet chip coordinates of the board of each vertex
+    :rtype: dict(ApplicationVertex, tuple(int, int))
+    """
+    return assign_regions(
+        app_vertices, partitions, resources, plan_n_timesteps, _board_of)
+
+
+def assign_regions(
+        app_vertices: Sequence[ApplicationVertex],
+        partitions: Iterable[ApplicationEdgePartition],
+        resources: ChipResources, plan_n_timesteps: Optional[int],
+        region_of: Callable[[Chip], R]) -> Dict[ApplicationVertex, R]:
+    """
+    Assign application vertices to regions of the machine, so that few
+    edges go between regions.
+
+    Each vertex in turn goes in the region it has the most edges to the
+    vertices already in, or if none, the region with the least assigned;
+    as long as the region has enough cores and SDRAM left.  Vertices are
+    then moved to the region they have the most edges to while that cuts
+    fewer edges.  Vertices that do not fit in any region are not assigned.
+
+    :param list(ApplicationVertex) app_vertices:
+        The vertices to assign, in the order to assign them
+    :param iterable(ApplicationEdgePartition) partitions:
+        The partitions of the edges between the vertices
+    :param ChipResources resources: The cores and SDRAM free on each chip
+    :param plan_n_timesteps:
+        The number of time steps to work out the SDRAM of the vertices for
+    :type plan_n_timesteps: int or None
+    :param callable(~spinn_machine.Chip, object) region_of:
+        Gets the region of a chip
+    :return: The region of each vertex
+    :rtype: dict(ApplicationVertex, object)
+    """
+    region_cores: Dict[R, int] = defaultdict(int)
+    region_sdram: Dict[R, int] = defaultdict(int)
+    for chip in resources.chips:
+        region = region_of(chip)
+        region_cores[region] += resources.n_cores_free(chip)
+        region_sdram[region] += resources.sdram_free(chip)
+    regions = {region: _Region(n_cores, region_sdram[region])
+               for region, n_cores in region_cores.items()}
+
+    # The cores and SDRAM each vertex needs
+    n_cores: Dict[ApplicationVertex, int] = dict()
+    sdram: Dict[ApplicationVertex, int] = dict()
+    for app_vertex in app_vertices:
+        for vertices, group_sdram in \
+                app_vertex.splitter.get_same_chip_groups():
+            n_group = sum(1 for vertex in vertices
+                          if not isinstance(vertex, AbstractVirtual))
+            if n_group:
+                n_cores[app_vertex] = n_cores.get(app_vertex, 0) + n_group
+                sdram[app_vertex] = sdram.get(app_vertex, 0) + \
+                    group_sdram.get_total_sdram(plan_n_timesteps)
+
+    # vertex -> neighbour -> number of edges between them
+    weights: Dict[ApplicationVertex, Dict[ApplicationVertex, int]] = \
+        defaultdict(lambda: defaultdict(int))
+    for partition in partitions:
+        pre = partition.pre_vertex
+        for edge in partition.edges:
+            post = edge.post_vertex
+            if post != pre and pre in n_cores and post in n_cores:
+                weights[pre][post] += 1
+                weights[post][pre] += 1
+
+    assigned: Dict[ApplicationVertex, R] = dict()
+
+    def weight_to_regions(
+            app_vertex: ApplicationVertex) -> Dict[R, int]:
+        to_regions: Dict[R, int] = defaultdict(int)
+        for neighbour, weight in weights[app_vertex].items():
+            if neighbour in assigned:
+                to_regions[assigned[neighbour]] += weight
+        return to_regions
+
+    for app_vertex in app_vertices:
+        if app_vertex not in n_cores:
+            continue
+        to_regions = weight_to_regions(app_vertex)
+        best: Optional[R] = None
+        for region, space in regions.items():
+            if not space.fits(n_cores[app_vertex], sdram[app_vertex]):
+                continue
+            if best is None or (to_regions[region], -space.load()) > (
+                    to_regions[best], -regions[best].load()):
+                best = region
+        if best is not None:
+            assigned[app_vertex] = best
+            regions[best].n_cores -= n_cores[app_vertex]
+            regions[best].sdram -= sdram[app_vertex]
+
+    for _ in range(_MAX_PASSES):
+        n_moved = 0
+        for app_vertex, region in list(assigned.items()):
+            to_regions = weight_to_regions(app_vertex)
+            best = region
+            for other, weight in to_regions.items():
+                if weight > to_regions[best] and regions[other].fits(
+                        n_cores[app_vertex], sdram[app_vertex]):
+                    best = other
+            if best != region:
+                assigned[app_vertex] = best
+                regions[region].n_cores += n_cores[app_vertex]
+                regions[region].sdram += sdram[app_vertex]
+                regions[best].n_cores -= n_cores[app_vertex]
+                regions[best].sdram -= sdram[app_vertex]
+                n_moved += 1
+        if not n_moved:
+            break
+
+    n_edges = 0
+    n_cut = 0
+    for app_vertex, neighbours in weights.items():
+        for neighbour, weight in neighbours.items():
+            n_edges += weight
+            if assigned.get(app_vertex) != assigned.get(neighbour):
+                n_cut += weight
+    logger.info(
+        "Assigned {} of {} application vertices to {} regions, with {} of "
+        "{} edges between regions", len(assigned), len(n_cores),
+        len(set(assigned.values())), n_cut // 2, n_edges // 2)
+    return assigned
+
+
+def board_order(chips: Iterable[Chip]) -> List[Chip]:
+    """
+    Put chips in order of board, keeping the order of the chips on each
+    board, and the boards in the order of their first chip.
+
+    :param iterable(~spinn_machine.Chip) chips:
+    :rtype: list(~spinn_machine.Chip)
+    """
+    by_board: Dict[XY, List[Chip]] = dict()
+    for chip in chips:
+        by_board.setdefault(_board_of(chip), []).append(chip)
+    return [chip for board_chips in by_board.values() for chip in board_chips]
@@ -0,0 +1,120 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Callable, Dict, List, Tuple
+
+from spinn_machine import Chip, Machine
+
+from pacman.exceptions import PacmanConfigurationException
+
+#: Chips column by column, as x then y
+COLUMN = "Column"
+#: Boards, and the chips on each board, along a Hilbert curve
+HILBERT = "Hilbert"
+#: Boards, and the chips on each board, along a Morton (Z-order) curve
+MORTON = "Morton"
+
+
+def hilbert_index(x: int, y: int, n_bits: int) -> int:
+    """
+    The distance along a Hilbert curve covering a square of side
+    ``2 ** n_bits`` of a point in that square.
+
+    :param int x: The x coordinate of the point
+    :param int y: The y coordinate of the point
+    :param int n_bits: The number of bits in each coordinate
+    :rtype: int
+    """
+    side = 1 << n_bits
+    index = 0
+    s = side >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        index += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the curve within it joins up
+        if not ry:
+            if rx:
+                x = side - 1 - x
+                y = side - 1 - y
+            x, y = y, x
+        s >>= 1
+    return index
+
+
+def morton_index(x: int, y: int, n_bits: int) -> int:
+    """
+    The distance along a Morton (Z-order) curve of a point, made by
+    interleaving the bits of the coordinates.
+
+    :param int x: The x coordinate of the point
+    :param int y: The y coordinate of the point
+    :param int n_bits: The number of bits in each coordinate
+    :rtype: int
+    """
+    index = 0
+    for bit in range(n_bits):
+        index |= ((x >> bit) & 1) << (2 * bit)
+        index |= ((y >> bit) & 1) << (2 * bit + 1)
+    return index
+
+
+_CURVES: Dict[str, Callable[[int, int, int], int]] = {
+    HILBERT: hilbert_index,
+    MORTON: morton_index}
+
+
+def _n_bits(value: int) -> int:
+    return max(1, value.bit_length())
+
+
+def chip_order(machine: Machine, order: str) -> List[Chip]:
+    """
+    Get the chips of a machine in the order to place on them.
+
+    With :py:data:`COLUMN` the chips are in order of x and then y.
+    Otherwise each board (the chips with the same nearest Ethernet chip)
+    is kept together, with the boards in the order of their Ethernet chips
+    along the curve, and the chips of each board in the order of their
+    offset from the Ethernet chip along the curve.  Chips in order are
+    then mostly near each other, and seldom on different boards.
+
+    :param ~spinn_machine.Machine machine: The machine to order the chips of
+    :param str order: One of :py:data:`COLUMN`, :py:data:`HILBERT` or
+        :py:data:`MORTON`
+    :rtype: list(~spinn_machine.Chip)
+    :raises PacmanConfigurationException: If the order is not known
+    """
+    if order == COLUMN:
+        return sorted(machine.chips, key=lambda chip: (chip.x, chip.y))
+    if order not in _CURVES:
+        raise PacmanConfigurationException(
+            f"Unknown chip order {order}; expected one of "
+            f"{[COLUMN] + list(_CURVES)}")
+    curve = _CURVES[order]
+    width = machine.width
+    height = machine.height
+    machine_bits = _n_bits(max(width, height) - 1)
+    local: Dict[Chip, Tuple[int, int]] = {
+        chip: ((chip.x - chip.nearest_ethernet_x) % width,
+               (chip.y - chip.nearest_ethernet_y) % height)
+        for chip in machine.chips}
+    board_bits = _n_bits(max((max(xy) for xy in local.values()), default=0))
+
+    def key(chip: Chip) -> Tuple[int, int]:
+        return (
+            curve(chip.nearest_ethernet_x, chip.nearest_ethernet_y,
+                  machine_bits),
+            curve(*local[chip], board_bits))
+
+    return sorted(machine.chips, key=key)
@@ -0,0 +1,240 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy
+from numpy.typing import NDArray
+
+from spinn_utilities.typing.coords import XY
+from spinn_machine import Chip
+
+from pacman.model.placements import Placement
+
+
+class ChipResources(object):
+    """
+    The cores and SDRAM left on each chip of a machine, kept up to date as
+    placements are added, so that finding what is free on a chip doesn't
+    need to look at the placements already on it.
+
+    Chips are passed as their coordinates; a
+    :py:class:`~spinn_machine.Chip` can be used as it is.
+
+    The chips are also indexed by the most free cores and SDRAM in each
+    range of them (in a segment tree), so that the first chip in order
+    with enough space for something can be found without looking at each
+    chip before it.
+    """
+
+    __slots__ = (
+        # The chips in order
+        "_chips",
+        # (x, y) -> index of the chip in the arrays
+        "_ids",
+        # numpy bool array of (chip, processor id) -> True if placable and
+        # free
+        "_free_cores",
+        # numpy array of the number of free cores on each chip
+        "_n_free_cores",
+        # numpy array of the SDRAM not yet used on each chip
+        "_sdram_free",
+        # The number of time steps to work out the SDRAM of placements for
+        "_plan_n_timesteps",
+        # The number of leaves of the trees; a power of 2
+        "_n_leaves",
+        # Segment trees as lists, where node i has children 2i and 2i + 1
+        # and the leaf of chip index c is node n_leaves + c, of the most
+        # free cores and most free SDRAM of any chip under each node
+        "_max_cores",
+        "_max_sdram")
+
+    def __init__(self, chips: Sequence[Chip],
+                 plan_n_timesteps: Optional[int],
+                 placements: Iterable[Placement] = ()):
+        """
+        :param list(~spinn_machine.Chip) chips:
+            The chips to track, in the order to search them in
+        :param plan_n_timesteps:
+            The number of time steps to work out the SDRAM of placements for
+        :type plan_n_timesteps: int or None
+        :param iterable(Placement) placements:
+            The placements already made on the chips; any on other chips
+            are ignored
+        """
+        self._chips = list(chips)
+        self._ids: Dict[XY, int] = {
+            (chip.x, chip.y): chip_id for chip_id, chip in enumerate(chips)}
+        n_processors = 1 + max(
+            (max(chip.placable_processors_ids, default=0) for chip in chips),
+            default=0)
+        self._free_cores: NDArray[numpy.bool_] = numpy.zeros(
+            (len(chips), n_processors), dtype=numpy.bool_)
+        for chip_id, chip in enumerate(chips):
+            self._free_cores[chip_id, list(chip.placable_processors_ids)] = \
+                True
+        self._n_free_cores: NDArray[numpy.int32] = numpy.count_nonzero(
+            self._free_cores, axis=1).astype(numpy.int32)
+        self._sdram_free: NDArray[numpy.int64] = numpy.array(
+            [chip.sdram for chip in chips], dtype=numpy.int64)
+        self._plan_n_timesteps = plan_n_timesteps
+        self._n_leaves = 1
+        while self._n_leaves < len(chips):
+            self._n_leaves *= 2
+        self._max_cores = self.__build_tree(self._n_free_cores.tolist())
+        self._max_sdram = self.__build_tree(self._sdram_free.tolist())
+        self.add_placements(placements)
+
+    def __build_tree(self, values: List[int]) -> List[int]:
+        tree = [-1] * (2 * self._n_leaves)
+        tree[self._n_leaves:self._n_leaves + len(values)] = values
+        for node in range(self._n_leaves - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        return tree
+
+    def __update_trees(self, chip_id: int):
+        max_cores = self._max_cores
+        max_sdram = self._max_sdram
+        node = self._n_leaves + chip_id
+        max_cores[node] = int(self._n_free_cores[chip_id])
+        max_sdram[node] = int(self._sdram_free[chip_id])
+        node //= 2
+        while node:
+            max_cores[node] = max(max_cores[2 * node], max_cores[2 * node + 1])
+            max_sdram[node] = max(max_sdram[2 * node], max_sdram[2 * node + 1])
+            node //= 2
+
+    @property
+    def chips(self) -> Sequence[Chip]:
+        """
+        The chips, in the order they are searched in.
+
+        :rtype: list(~spinn_machine.Chip)
+        """
+        return self._chips
+
+    def has_chip(self, xy: XY) -> bool:
+        """
+        Whether a chip is one of those tracked.
+
+        :param tuple(int, int) xy: The coordinates of the chip
+        :rtype: bool
+        """
+        return xy in self._ids
+
+    def add_placements(self, placements: Iterable[Placement]):
+        """
+        Record that some placements have been made.  Placements on chips
+        not tracked are ignored.
+
+        :param iterable(Placement) placements:
+        """
+        chip_ids = {self.__record(placement) for placement in placements}
+        chip_ids.discard(-1)
+        for chip_id in chip_ids:
+            self.__update_trees(chip_id)
+
+    def add_placement(self, placement: Placement):
+        """
+        Record that a placement has been made, using up its core and SDRAM.
+        A placement on a chip not tracked is ignored.
+
+        :param Placement placement:
+        """
+        chip_id = self.__record(placement)
+        if chip_id >= 0:
+            self.__update_trees(chip_id)
+
+    def __record(self, placement: Placement) -> int:
+        chip_id = self._ids.get((placement.x, placement.y), -1)
+        if chip_id < 0:
+            return chip_id
+        p = placement.p
+        if p < self._free_cores.shape[1] and self._free_cores[chip_id, p]:
+            self._free_cores[chip_id, p] = False
+            self._n_free_cores[chip_id] -= 1
+        self._sdram_free[chip_id] -= \
+            placement.vertex.sdram_required.get_total_sdram(
+                self._plan_n_timesteps)
+        return chip_id
+
+    def n_cores_free(self, xy: XY) -> int:
+        """
+        The number of cores that can still be placed on, on a chip.
+
+        :param tuple(int, int) xy: The coordinates of the chip
+        :rtype: int
+        """
+        return int(self._n_free_cores[self._ids[xy]])
+
+    def sdram_free(self, xy: XY) -> int:
+        """
+        The SDRAM not yet used by placements, on a chip.
+
+        :param tuple(int, int) xy: The coordinates of the chip
+        :rtype: int
+        """
+        return int(self._sdram_free[self._ids[xy]])
+
+    def cores_free(self, xy: XY) -> List[int]:
+        """
+        The ids of the cores that can still be placed on, on a chip, in
+        ascending order.
+
+        :param tuple(int, int) xy: The coordinates of the chip
+        :rtype: list(int)
+        """
+        return numpy.flatnonzero(self._free_cores[self._ids[xy]]).tolist()
+
+    def n_chips_without(self, n_cores: int, sdram: int) -> int:
+        """
+        The number of chips with fewer than some cores or less than some
+        SDRAM free.
+
+        :param int n_cores: The number of cores
+        :param int sdram: The SDRAM
+        :rtype: int
+        """
+        return int(numpy.count_nonzero(
+            (self._n_free_cores < n_cores) | (self._sdram_free < sdram)))
+
+    def first_fitting(self, n_cores: int, sdram: int, first: int = 0) -> int:
+        """
+        Find the first chip at or after a given index with at least the
+        given number of cores and SDRAM free.
+
+        :param int n_cores: The number of cores needed
+        :param int sdram: The SDRAM needed
+        :param int first: The index of the first chip to consider
+        :return: The index of the chip in :py:attr:`chips`, or -1 if there
+            is no such chip
+        :rtype: int
+        """
+        max_cores = self._max_cores
+        max_sdram = self._max_sdram
+        n_leaves = self._n_leaves
+        # Depth first search, left to right, of the nodes that might have
+        # a chip that fits, as (node, index of first chip under node, size)
+        to_search = [(1, 0, n_leaves)]
+        while to_search:
+            node, start, size = to_search.pop()
+            if (start + size <= first or max_cores[node] < n_cores or
+                    max_sdram[node] < sdram):
+                continue
+            if size == 1:
+                return start
+            size //= 2
+            to_search.append((2 * node + 1, start + size, size))
+            to_search.append((2 * node, start, size))
+        return -1
@@ -0,0 +1,224 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+from collections import defaultdict
+import gzip
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from spinn_utilities.log import FormatAdapter
+from spinn_utilities.typing.coords import XY
+
+from pacman.data import PacmanDataView
+from pacman.model.graphs import AbstractVirtual
+from pacman.model.graphs.application import ApplicationVertex
+from pacman.model.graphs.machine import MachineVertex
+from pacman.model.placements import Placement, Placements
+from .chip_resources import ChipResources
+
+logger = FormatAdapter(logging.getLogger(__name__))
+
+#: The version of the format of the file; files of other versions are not
+#: used
+_FORMAT_VERSION = 1
+
+
+def _placed_groups(app_vertex: ApplicationVertex) -> \
+        List[Tuple[List[MachineVertex], int]]:
+    """
+    The groups of machine vertices of an application vertex that the placer
+    places, without the virtual vertices, with the SDRAM of each group.
+
+    :param ApplicationVertex app_vertex:
+    :rtype: list(tuple(list(MachineVertex), int))
+    """
+    plan_n_timesteps = PacmanDataView.get_plan_n_timestep()
+    groups = list()
+    for vertices, sdram in app_vertex.splitter.get_same_chip_groups():
+        to_place = [vertex for vertex in vertices
+                    if not isinstance(vertex, AbstractVirtual)]
+        if to_place:
+            groups.append(
+                (to_place, sdram.get_total_sdram(plan_n_timesteps)))
+    return groups
+
+
+def vertex_fingerprint(app_vertex: ApplicationVertex) -> str:
+    """
+    A hash of what the placer places of an application vertex: its class,
+    label and number of atoms, and the class, label and SDRAM of each
+    machine vertex in each of its same chip groups, and the SDRAM of
+    each group.
+
+    :param ApplicationVertex app_vertex:
+    :rtype: str
+    """
+    plan_n_timesteps = PacmanDataView.get_plan_n_timestep()
+    description = [
+        type(app_vertex).__qualname__, app_vertex.label, app_vertex.n_atoms,
+        [[sdram, [[type(vertex).__qualname__, vertex.label,
+                   vertex.sdram_required.get_total_sdram(plan_n_timesteps)]
+                  for vertex in vertices]]
+         for vertices, sdram in _placed_groups(app_vertex)]]
+    return hashlib.md5(json.dumps(description).encode()).hexdigest()
+
+
+def machine_fingerprint(
+        system_placements: Placements, options: Sequence[str] = ()) -> str:
+    """
+    A hash of what placements are made around: the chips and links of the
+    machine, the cores and SDRAM of each chip, the system placements and
+    the options the placer was run with.
+
+    :param Placements system_placements:
+    :param list(str) options: The values of the placer options
+    :rtype: str
+    """
+    machine = PacmanDataView.get_machine()
+    plan_n_timesteps = PacmanDataView.get_plan_n_timestep()
+    description = [
+        PacmanDataView.get_machine_topology().signature,
+        [[chip.x, chip.y, chip.sdram, list(chip.placable_processors_ids)]
+         for chip in sorted(machine.chips, key=lambda c: (c.x, c.y))],
+        sorted([placement.x, placement.y, placement.p,
+                placement.vertex.sdram_required.get_total_sdram(
+                    plan_n_timesteps)]
+               for placement in system_placements),
+        list(options)]
+    return hashlib.md5(json.dumps(description).encode()).hexdigest()
+
+
+class PlacementCache(object):
+    """
+    Placements of application vertices kept in a file from one run to the
+    next, so that vertices which have not changed can be put back where
+    they were instead of being placed again.
+
+    Each application vertex is recorded by its
+    :py:func:`vertex_fingerprint` with the (x, y, p) of each of its placed
+    machine vertices in order, so the records stay valid when the vertices
+    are made again in a new run.  All the records are dropped if the
+    :py:func:`machine_fingerprint` changes.
+    """
+
+    __slots__ = (
+        # The path of the file the placements are kept in
+        "_path",
+        # The fingerprint of the machine, system placements and options
+        "_machine_fingerprint",
+        # vertex fingerprint -> list of flat (x, y, p, x, y, p, ...) lists,
+        # one for each application vertex with that fingerprint
+        "_records")
+
+    def __init__(self, path: str, fingerprint: str):
+        """
+        :param str path: The path of the file to keep the placements in
+        :param str fingerprint:
+            The fingerprint of the machine, system placements and options
+            being placed with
+        """
+        self._path = path
+        self._machine_fingerprint = fingerprint
+        self._records: Dict[str, List[List[int]]] = defaultdict(list)
+        if not os.path.exists(path):
+            return
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            if (data["version"] != _FORMAT_VERSION or
+                    data["machine"] != fingerprint):
+                return
+            for fingerprint, xyps in data["vertices"]:
+                self._records[fingerprint].append(xyps)
+        except (OSError, ValueError, KeyError, TypeError) as ex:
+            logger.warning("Ignoring placement cache {}: {}", path, ex)
+            self._records.clear()
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+
+    def restore(self, app_vertex: ApplicationVertex,
+                resources: ChipResources) -> Optional[List[Placement]]:
+        """
+        Get the placements of an application vertex from the cache, if it
+        has a record and the cores and SDRAM recorded are still free.
+        The record is used up, so that another vertex with the same
+        fingerprint gets the next record.
+
+        :param ApplicationVertex app_vertex:
+        :param ChipResources resources: What is free on each chip
+        :return: The placements, not yet added, or `None` if there are none
+        :rtype: list(Placement) or None
+        """
+        records = self._records.get(vertex_fingerprint(app_vertex))
+        if not records:
+            return None
+        xyps = records.pop(0)
+        groups = _placed_groups(app_vertex)
+        if len(xyps) != 3 * sum(len(vertices) for vertices, _ in groups):
+            return None
+        placements: List[Placement] = list()
+        cores: Dict[XY, List[int]] = defaultdict(list)
+        sdram: Dict[XY, int] = defaultdict(int)
+        index = 0
+        for vertices, group_sdram in groups:
+            xy = (xyps[index], xyps[index + 1])
+            sdram[xy] += group_sdram
+            for vertex in vertices:
+                x, y, p = xyps[index:index + 3]
+                if (x, y) != xy:
+                    return None
+                cores[xy].append(p)
+                placements.append(Placement(vertex, x, y, p))
+                index += 3
+        for xy, ps in cores.items():
+            if not PacmanDataView.get_machine().is_chip_at(*xy):
+                return None
+            if (not set(ps).issubset(resources.cores_free(xy)) or
+                    len(set(ps)) != len(ps) or
+                    sdram[xy] > resources.sdram_free(xy)):
+                return None
+        return placements
+
+    def save(self, app_vertices: Iterable[ApplicationVertex],
+             placements: Placements):
+        """
+        Replace the file with the placements of some application vertices.
+
+        :param iterable(ApplicationVertex) app_vertices:
+            The vertices to keep the placements of
+        :param Placements placements: Where the vertices are placed
+        """
+        vertices = list()
+        for app_vertex in app_vertices:
+            xyps: List[int] = list()
+            for group, _sdram in _placed_groups(app_vertex):
+                for vertex in group:
+                    placement = placements.get_placement_of_vertex(vertex)
+                    xyps.extend((placement.x, placement.y, placement.p))
+            vertices.append([vertex_fingerprint(app_vertex), xyps])
+        data = {"version": _FORMAT_VERSION,
+                "machine": self._machine_fingerprint,
+                "vertices": vertices}
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to one side first so a failed run leaves the old cache
+        temp_path = self._path + ".tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, self._path)
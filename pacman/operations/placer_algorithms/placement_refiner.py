@@ -0,0 +1,586 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+from collections import defaultdict
+import logging
+import math
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from spinn_utilities.log import FormatAdapter
+from spinn_utilities.typing.coords import XY
+
+from pacman.data import PacmanDataView
+from pacman.model.graphs import AbstractVirtual
+from pacman.model.graphs.application import ApplicationVertex
+from pacman.model.graphs.machine import MachineVertex
+from pacman.model.placements import Placements, Placement
+from pacman.utilities.algorithm_utilities.machine_topology import NO_CHIP
+
+logger = FormatAdapter(logging.getLogger(__name__))
+
+# The number of steps between looks at the clock
+_CHECK_TIME_EVERY = 64
+
+# The number of steps made to work out the starting temperature
+_N_WARM_UP_STEPS = 100
+
+# The chance at the start of making a move that makes things worse by the
+# typical amount
+_START_ACCEPTANCE = 0.01
+
+# The temperature at the end, as a fraction of the starting temperature
+_FINAL_TEMPERATURE = 0.01
+
+#: Application vertex -> (x, y) -> number of its vertices on the chip
+_AppChips = Dict[ApplicationVertex, Dict[XY, int]]
+
+
+def refine_placements(
+        placements: Placements, system_placements: Placements,
+        time_budget: float, max_steps: Optional[int] = None,
+        seed: Optional[int] = None) -> Placements:
+    """
+    Improve the placements of an application graph by simulated annealing,
+    moving same-chip groups of vertices between chips, or swapping them, to
+    make the multicast routes between them shorter.
+
+    As the router builds a tree from the chips of each application vertex
+    to the chips of each of its targets, the wire length is estimated
+    from the application edges, as the average distance between the chips
+    of the vertices at each end of each edge, plus the number of chips
+    each application vertex is on for each edge it is at one end of.
+    As well as moving single groups, all the groups of two application
+    vertices with groups of the same sizes can be swapped.
+
+    Groups are only moved where there are enough cores and SDRAM left on
+    the chips, and where the chips of each application vertex stay
+    connected by links, as the placer leaves them and the router expects.
+    Vertices of application vertices with a fixed location, system
+    vertices and virtual vertices are not moved.
+
+    :param Placements placements:
+        The placements to improve, including the system placements
+    :param Placements system_placements: The placements of system vertices
+    :param float time_budget: The number of seconds to spend at most; if
+        not more than 0, the placements given are returned
+    :param max_steps: The number of moves to try at most, or `None` to stop
+        only when the time is up
+    :type max_steps: int or None
+    :param seed: The seed of the random moves, or `None` for any
+    :type seed: int or None
+    :return: The improved placements, or the ones given if nothing better
+        was found
+    :rtype: Placements
+    """
+    return _PlacementRefiner(placements, system_placements, seed).refine(
+        time_budget, max_steps)
+
+
+class _Group(object):
+    """
+    Vertices that must be on the same chip, and so are moved together.
+    """
+
+    __slots__ = (
+        # The application vertex of the group
+        "app_vertex",
+        # The vertices of the group
+        "vertices",
+        # The SDRAM used by the group
+        "sdram",
+        # The chip the group is on
+        "xy")
+
+    def __init__(self, app_vertex: ApplicationVertex,
+                 vertices: List[MachineVertex], sdram: int, xy: XY):
+        self.app_vertex = app_vertex
+        self.vertices = vertices
+        self.sdram = sdram
+        self.xy = xy
+
+
+class _PlacementRefiner(object):
+    """
+    The state of a run of simulated annealing over placements.
+    """
+
+    __slots__ = (
+        "_machine",
+        "_topology",
+        "_placements",
+        "_random",
+        # The groups that can be moved
+        "_groups",
+        # (x, y) -> indices of the movable groups on the chip
+        "_groups_on_chip",
+        # (x, y) -> sorted list of cores not used
+        "_free_cores",
+        # (x, y) -> SDRAM not used
+        "_sdram_free",
+        # Vertex -> core of the vertices of the movable groups
+        "_cores",
+        # Application vertex -> (x, y) -> number of its vertices on the chip
+        "_app_chips",
+        # Application vertices with the chips of their virtual vertices
+        # added to _app_chips
+        "_virtual_added",
+        # Application vertex -> indices of its groups, smallest first, for
+        # those with all their placed vertices in the groups
+        "_app_groups",
+        # Application vertex -> others with groups of the same sizes
+        "_same_shape",
+        # The (pre, post) application vertices of each edge
+        "_edges",
+        # Application vertex -> indices of the edges it is at an end of
+        "_edges_of",
+        # Application vertex -> the application vertices it has edges with
+        "_neighbours",
+        # Estimated length of each edge
+        "_costs",
+        # (source (x, y), target (x, y)) -> distance
+        "_distances")
+
+    def __init__(self, placements: Placements,
+                 system_placements: Placements, seed: Optional[int]):
+        """
+        :param Placements placements:
+        :param Placements system_placements:
+        :param seed:
+        :type seed: int or None
+        """
+        self._machine = PacmanDataView.get_machine()
+        self._topology = PacmanDataView.get_machine_topology()
+        self._placements = placements
+        self._random = random.Random(seed)
+        self._distances: Dict[Tuple[XY, XY], int] = dict()
+        self._cores: Dict[MachineVertex, int] = dict()
+        self._groups: List[_Group] = list()
+        self._groups_on_chip: Dict[XY, List[int]] = defaultdict(list)
+        self.__find_groups(system_placements)
+        self.__find_resources()
+        self.__find_edges()
+        self.__find_same_shapes()
+
+    def __find_groups(self, system_placements: Placements):
+        plan_n_timesteps = PacmanDataView.get_plan_n_timestep()
+        for app_vertex in PacmanDataView.iterate_vertices():
+            if app_vertex.has_fixed_location():
+                continue
+            for vertices, sdram in app_vertex.splitter.get_same_chip_groups():
+                to_move = [
+                    vertex for vertex in vertices
+                    if not isinstance(vertex, AbstractVirtual) and
+                    not system_placements.is_vertex_placed(vertex)]
+                if not to_move:
+                    continue
+                xys = {self.__placed_xy(vertex) for vertex in to_move}
+                if len(xys) != 1:
+                    continue
+                group_sdram = max(
+                    sdram.get_total_sdram(plan_n_timesteps),
+                    sum(vertex.sdram_required.get_total_sdram(
+                        plan_n_timesteps) for vertex in to_move))
+                xy = xys.pop()
+                self._groups_on_chip[xy].append(len(self._groups))
+                self._groups.append(
+                    _Group(app_vertex, to_move, group_sdram, xy))
+                for vertex in to_move:
+                    self._cores[vertex] = self._placements.\
+                        get_placement_of_vertex(vertex).p
+
+    def __placed_xy(self, vertex: MachineVertex) -> XY:
+        placement = self._placements.get_placement_of_vertex(vertex)
+        return placement.x, placement.y
+
+    def __find_resources(self):
+        plan_n_timesteps = PacmanDataView.get_plan_n_timestep()
+        self._free_cores: Dict[XY, List[int]] = dict()
+        self._sdram_free: Dict[XY, int] = dict()
+        self._app_chips: _AppChips = defaultdict(dict)
+        for chip in self._machine.chips:
+            self._free_cores[chip.x, chip.y] = list(
+                chip.placable_processors_ids)
+            self._sdram_free[chip.x, chip.y] = chip.sdram
+        for placement in self._placements:
+            xy = (placement.x, placement.y)
+            if placement.p in self._free_cores[xy]:
+                self._free_cores[xy].remove(placement.p)
+            if placement.vertex not in self._cores:
+                self._sdram_free[xy] -= placement.vertex.sdram_required.\
+                    get_total_sdram(plan_n_timesteps)
+            app_vertex = placement.vertex.app_vertex
+            if app_vertex is not None:
+                counts = self._app_chips[app_vertex]
+                counts[xy] = counts.get(xy, 0) + 1
+        for group in self._groups:
+            self._sdram_free[group.xy] -= group.sdram
+
+    def __find_edges(self):
+        self._virtual_added: Set[ApplicationVertex] = set()
+        self._edges: List[Tuple[ApplicationVertex, ApplicationVertex]] = \
+            list()
+        self._edges_of: Dict[ApplicationVertex, List[int]] = \
+            defaultdict(list)
+        # Dicts rather than sets to keep the order the same every run
+        neighbours: Dict[ApplicationVertex, Dict[
+            ApplicationVertex, None]] = defaultdict(dict)
+        for partition in PacmanDataView.iterate_partitions():
+            pre_vertex = partition.pre_vertex
+            self.__add_virtual_chips(pre_vertex)
+            for edge in partition.edges:
+                post_vertex = edge.post_vertex
+                self.__add_virtual_chips(post_vertex)
+                index = len(self._edges)
+                self._edges.append((pre_vertex, post_vertex))
+                self._edges_of[pre_vertex].append(index)
+                if post_vertex != pre_vertex:
+                    self._edges_of[post_vertex].append(index)
+                    neighbours[pre_vertex][post_vertex] = None
+                    neighbours[post_vertex][pre_vertex] = None
+        self._neighbours: Dict[ApplicationVertex, List[ApplicationVertex]] = {
+            app_vertex: list(others)
+            for app_vertex, others in neighbours.items()}
+        self._costs: List[float] = [
+            self.__edge_cost(index, {}) for index in range(len(self._edges))]
+
+    def __find_same_shapes(self):
+        groups_of: Dict[ApplicationVertex, List[int]] = defaultdict(list)
+        for g, group in enumerate(self._groups):
+            groups_of[group.app_vertex].append(g)
+        self._app_groups: Dict[ApplicationVertex, List[int]] = dict()
+        shapes: Dict[Tuple[int, ...], List[ApplicationVertex]] = \
+            defaultdict(list)
+        for app_vertex, indices in groups_of.items():
+            indices.sort(key=lambda g: len(self._groups[g].vertices))
+            shape = tuple(len(self._groups[g].vertices) for g in indices)
+            if sum(shape) == sum(self._app_chips[app_vertex].values()):
+                self._app_groups[app_vertex] = indices
+                shapes[shape].append(app_vertex)
+        self._same_shape: Dict[ApplicationVertex, List[ApplicationVertex]] = {
+            app_vertex: [other for other in others if other != app_vertex]
+            for others in shapes.values() if len(others) > 1
+            for app_vertex in others}
+
+    def __add_virtual_chips(self, app_vertex: ApplicationVertex):
+        """
+        Add the chips that the virtual vertices of an application vertex
+        are connected to, as they aren't placed.
+        """
+        if app_vertex in self._virtual_added:
+            return
+        self._virtual_added.add(app_vertex)
+        counts = self._app_chips[app_vertex]
+        for vertex in app_vertex.machine_vertices:
+            if isinstance(vertex, AbstractVirtual):
+                link_data = vertex.get_link_data(self._machine)
+                xy = (link_data.connected_chip_x, link_data.connected_chip_y)
+                counts[xy] = counts.get(xy, 0) + 1
+
+    def __distance(self, source: XY, target: XY) -> int:
+        key = (source, target)
+        distance = self._distances.get(key)
+        if distance is None:
+            distance = self._machine.get_vector_length(source, target)
+            self._distances[key] = distance
+        return distance
+
+    def __edge_cost(self, index: int, app_chips: _AppChips) -> float:
+        """
+        The estimated length of an edge.
+
+        :param int index: The index of the edge
+        :param app_chips:
+            The chips of any application vertices that are to be taken as
+            being somewhere other than where they are now
+        :rtype: float
+        """
+        pre_vertex, post_vertex = self._edges[index]
+        pre_xys = app_chips.get(pre_vertex) or self._app_chips[pre_vertex]
+        post_xys = app_chips.get(post_vertex) or self._app_chips[post_vertex]
+        if pre_vertex == post_vertex:
+            return len(pre_xys)
+        # The router goes between any chips of the two, so take the
+        # average distance between them
+        distance = sum(
+            self.__distance(pre_xy, post_xy)
+            for pre_xy in pre_xys for post_xy in post_xys) / max(
+                1, len(pre_xys) * len(post_xys))
+        return distance + len(pre_xys) + len(post_xys)
+
+    def __try_step(self, temperature: float) -> Optional[float]:
+        """
+        Propose a random move or swap and make it if accepted.
+
+        :param float temperature:
+        :return: The change of cost of the move proposed, whether made or
+            not, or `None` if no move was proposed
+        :rtype: float or None
+        """
+        if self._same_shape and self._random.random() < 0.5:
+            return self.__try_app_swap(temperature)
+        return self.__try_group_move(temperature)
+
+    def __accept(self, delta: float, temperature: float) -> bool:
+        return delta <= 0 or (temperature > 0 and self._random.random() <
+                              math.exp(-delta / temperature))
+
+    def __new_costs(
+            self, app_chips: _AppChips) -> Tuple[Dict[int, float], float]:
+        """
+        Work out the costs of the edges changed by a move.
+
+        :return: The new cost of each edge changed, and the total change
+        """
+        new_costs = {
+            index: self.__edge_cost(index, app_chips)
+            for app_vertex in app_chips
+            for index in self._edges_of.get(app_vertex, ())}
+        return new_costs, sum(
+            cost - self._costs[index] for index, cost in new_costs.items())
+
+    def __try_app_swap(self, temperature: float) -> Optional[float]:
+        """
+        Propose swapping all the groups of two application vertices with
+        groups of the same sizes, and make the swap if accepted.  The chips
+        of each stay connected, and each chip keeps the same number of
+        cores used.
+        """
+        app_vertex = self._random.choice(list(self._same_shape))
+        other = self._random.choice(self._same_shape[app_vertex])
+        pairs = list(zip(self._app_groups[app_vertex],
+                         self._app_groups[other]))
+        sdram_change: Dict[XY, int] = defaultdict(int)
+        for g, o in pairs:
+            group = self._groups[g]
+            other_group = self._groups[o]
+            change = group.sdram - other_group.sdram
+            sdram_change[group.xy] -= change
+            sdram_change[other_group.xy] += change
+        if any(self._sdram_free[xy] < change
+               for xy, change in sdram_change.items()):
+            return None
+
+        app_chips: _AppChips = {
+            app_vertex: self._app_chips[other],
+            other: self._app_chips[app_vertex]}
+        new_costs, delta = self.__new_costs(app_chips)
+        if not self.__accept(delta, temperature):
+            return delta
+
+        for index, cost in new_costs.items():
+            self._costs[index] = cost
+        self._app_chips.update(app_chips)
+        for xy, change in sdram_change.items():
+            self._sdram_free[xy] -= change
+        for g, o in pairs:
+            group = self._groups[g]
+            other_group = self._groups[o]
+            on_chip = self._groups_on_chip[group.xy]
+            on_chip[on_chip.index(g)] = o
+            on_chip = self._groups_on_chip[other_group.xy]
+            on_chip[on_chip.index(o)] = g
+            group.xy, other_group.xy = other_group.xy, group.xy
+            for vertex, other_vertex in zip(
+                    group.vertices, other_group.vertices):
+                self._cores[vertex], self._cores[other_vertex] = \
+                    self._cores[other_vertex], self._cores[vertex]
+        return delta
+
+    def __try_group_move(self, temperature: float) -> Optional[float]:
+        """
+        Propose moving a group to another chip, or swapping it with a group
+        on that chip, and make the move if accepted.
+
+        :param float temperature:
+        :return: The change of cost of the move proposed, whether made or
+            not, or `None` if no move was proposed
+        :rtype: float or None
+        """
+        g = self._random.randrange(len(self._groups))
+        group = self._groups[g]
+        neighbours = self._neighbours.get(group.app_vertex)
+        if not neighbours:
+            return None
+        # Try moving next to or onto a chip of a connected vertex
+        xys = list(self._app_chips[self._random.choice(neighbours)])
+        if not xys:
+            return None
+        xy = self._random.choice(xys)
+        if self._random.random() < 0.5:
+            over = self._topology.neighbour(
+                self._topology.chip_id(xy), self._random.randrange(6))
+            if over != NO_CHIP:
+                xy = self._topology.xy(over)
+        old_xy = group.xy
+        if xy == old_xy:
+            return None
+
+        # If there isn't space on the chip, swap with a group there
+        n_cores = len(group.vertices)
+        o = -1
+        other: Optional[_Group] = None
+        if (len(self._free_cores[xy]) < n_cores or
+                self._sdram_free[xy] < group.sdram):
+            on_chip = self._groups_on_chip.get(xy)
+            if not on_chip:
+                return None
+            o = self._random.choice(on_chip)
+            other = self._groups[o]
+            if (len(self._free_cores[xy]) + len(other.vertices) < n_cores or
+                    len(self._free_cores[old_xy]) + n_cores <
+                    len(other.vertices) or
+                    self._sdram_free[xy] + other.sdram < group.sdram or
+                    self._sdram_free[old_xy] + group.sdram < other.sdram):
+                return None
+
+        app_chips = self.__app_chips_after(group, old_xy, xy, other)
+        if app_chips is None:
+            return None
+        new_costs, delta = self.__new_costs(app_chips)
+        if not self.__accept(delta, temperature):
+            return delta
+
+        for index, cost in new_costs.items():
+            self._costs[index] = cost
+        self._app_chips.update(app_chips)
+        self.__take_resources(g, group, old_xy, xy, o, other)
+        return delta
+
+    def __app_chips_after(
+            self, group: _Group, old_xy: XY, xy: XY,
+            other: Optional[_Group]) -> Optional[_AppChips]:
+        """
+        Work out the chips of the application vertices after a move.
+
+        :return: The new chip counts of the application vertices moved, or
+            `None` if the chips of any of them would not be connected
+        """
+        moves = [(group, old_xy, xy)]
+        if other is not None:
+            moves.append((other, xy, old_xy))
+        app_chips: _AppChips = dict()
+        for moved, from_xy, to_xy in moves:
+            counts = app_chips.get(moved.app_vertex)
+            if counts is None:
+                counts = dict(self._app_chips[moved.app_vertex])
+                app_chips[moved.app_vertex] = counts
+            n_vertices = len(moved.vertices)
+            counts[from_xy] -= n_vertices
+            if not counts[from_xy]:
+                del counts[from_xy]
+            counts[to_xy] = counts.get(to_xy, 0) + n_vertices
+        for app_vertex, counts in app_chips.items():
+            if (counts.keys() != self._app_chips[app_vertex].keys() and
+                    not self.__is_connected(counts)):
+                return None
+        return app_chips
+
+    def __is_connected(self, xys: Iterable[XY]) -> bool:
+        chip_ids = self._topology.chip_ids
+        adjacency = self._topology.adjacency
+        to_reach = {chip_ids[xy] for xy in xys}
+        to_visit = [to_reach.pop()]
+        while to_visit and to_reach:
+            for next_id in adjacency[to_visit.pop()]:
+                if next_id in to_reach:
+                    to_reach.remove(next_id)
+                    to_visit.append(next_id)
+        return not to_reach
+
+    def __take_resources(
+            self, g: int, group: _Group, old_xy: XY, xy: XY,
+            o: int, other: Optional[_Group]):
+        """
+        Move groups in the resources of the chips and give them cores.
+        """
+        group.xy = xy
+        free_old = self._free_cores[old_xy]
+        free_new = self._free_cores[xy]
+        free_old.extend(self._cores[vertex] for vertex in group.vertices)
+        self._sdram_free[old_xy] += group.sdram
+        self._groups_on_chip[old_xy].remove(g)
+        if other is not None:
+            other.xy = old_xy
+            free_new.extend(self._cores[vertex] for vertex in other.vertices)
+            self._sdram_free[xy] += other.sdram
+            self._groups_on_chip[xy].remove(o)
+        free_old.sort()
+        free_new.sort()
+        for vertex in group.vertices:
+            self._cores[vertex] = free_new.pop(0)
+        self._sdram_free[xy] -= group.sdram
+        self._groups_on_chip[xy].append(g)
+        if other is not None:
+            for vertex in other.vertices:
+                self._cores[vertex] = free_old.pop(0)
+            self._sdram_free[old_xy] -= other.sdram
+            self._groups_on_chip[old_xy].append(o)
+
+    def refine(self, time_budget: float,
+               max_steps: Optional[int]) -> Placements:
+        """
+        Run the annealing.
+
+        :param float time_budget:
+        :param max_steps:
+        :type max_steps: int or None
+        :rtype: Placements
+        """
+        if not self._groups or not self._edges or time_budget <= 0:
+            return self._placements
+        start_time = time.perf_counter()
+        start_cost = sum(self._costs)
+
+        # Start hot enough to accept some of the moves that make things
+        # worse, by the typical amount they do
+        deltas: List[float] = list()
+        for _ in range(_N_WARM_UP_STEPS):
+            delta = self.__try_step(0)
+            if delta is not None and delta > 0:
+                deltas.append(delta)
+        start_temperature = max(1, sum(deltas)) / max(1, len(deltas)) / \
+            -math.log(_START_ACCEPTANCE)
+
+        step = 0
+        progress = 0.0
+        while progress < 1.0:
+            temperature = start_temperature * (
+                _FINAL_TEMPERATURE ** progress)
+            self.__try_step(temperature)
+            step += 1
+            if max_steps is not None:
+                progress = max(progress, step / max_steps)
+            if step % _CHECK_TIME_EVERY == 0:
+                progress = max(
+                    progress,
+                    (time.perf_counter() - start_time) / time_budget)
+
+        end_cost = sum(self._costs)
+        logger.info(
+            "Refined the estimated wire length of the placements from "
+            "{:.1f} to {:.1f} in {} steps", start_cost, end_cost, step)
+        if end_cost >= start_cost:
+            return self._placements
+        xys = {vertex: group.xy
+               for group in self._groups for vertex in group.vertices}
+        refined = Placements()
+        for placement in self._placements:
+            vertex = placement.vertex
+            if vertex in xys:
+                x, y = xys[vertex]
+                placement = Placement(vertex, x, y, self._cores[vertex])
+            refined.add_placement(placement)
+        return refined
@@ -0,0 +1,85 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List
+
+from pacman.exceptions import PacmanConfigurationException
+from pacman.model.graphs.application import (
+    ApplicationEdgePartition, ApplicationVertex)
+
+#: The vertices in the order they were added to the graph
+INSERTION = "Insertion"
+#: The vertices in breadth first order over the edges of the graph
+BREADTH_FIRST = "BreadthFirst"
+
+
+def vertex_order(
+        vertices: Iterable[ApplicationVertex],
+        partitions: Iterable[ApplicationEdgePartition],
+        order: str) -> List[ApplicationVertex]:
+    """
+    Get the application vertices in the order to place them in.
+
+    With :py:data:`BREADTH_FIRST` the graph is searched breadth first,
+    ignoring the direction of the edges, starting from each vertex not yet
+    reached in the order they were added.  The neighbours of each vertex
+    are visited most connected first (by the number of edges between
+    them), so that vertices that are connected are placed one after the
+    other and so near each other.
+
+    :param iterable(ApplicationVertex) vertices:
+        The vertices in the order they were added to the graph
+    :param iterable(ApplicationEdgePartition) partitions:
+        The partitions of the edges between the vertices
+    :param str order: One of :py:data:`INSERTION` or :py:data:`BREADTH_FIRST`
+    :rtype: list(ApplicationVertex)
+    :raises PacmanConfigurationException: If the order is not known
+    """
+    vertices = list(vertices)
+    if order == INSERTION:
+        return vertices
+    if order != BREADTH_FIRST:
+        raise PacmanConfigurationException(
+            f"Unknown vertex order {order}; expected one of "
+            f"{[INSERTION, BREADTH_FIRST]}")
+
+    index = {vertex: i for i, vertex in enumerate(vertices)}
+    # vertex index -> neighbour index -> number of edges between them
+    weights: Dict[int, Dict[int, int]] = defaultdict(
+        lambda: defaultdict(int))
+    for partition in partitions:
+        pre = index[partition.pre_vertex]
+        for edge in partition.edges:
+            post = index[edge.post_vertex]
+            if post != pre:
+                weights[pre][post] += 1
+                weights[post][pre] += 1
+
+    ordered: List[ApplicationVertex] = list()
+    seen = [False] * len(vertices)
+    for first in range(len(vertices)):
+        if seen[first]:
+            continue
+        seen[first] = True
+        to_visit = deque([first])
+        while to_visit:
+            current = to_visit.popleft()
+            ordered.append(vertices[current])
+            for neighbour, _ in sorted(
+                    weights[current].items(),
+                    key=lambda item: (-item[1], item[0])):
+                if not seen[neighbour]:
+                    seen[neighbour] = True
+                    to_visit.append(neighbour)
+    return ordered
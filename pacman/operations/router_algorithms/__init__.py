@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .application_router import route_application_graph
+from .application_router import (
+    reroute_around_faults, route_application_graph)
 
-__all__ = ['route_application_graph']
+__all__ = ['reroute_around_faults', 'route_application_graph']
@@ -13,28 +13,53 @@
 # limitations under the License.
 
 from collections import deque, defaultdict
+import logging
+from multiprocessing.context import BaseContext
 from typing import (
-    Deque, Dict, Iterable, List, Optional, Set, Tuple, Union)
+    Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple,
+    Union)
 from typing_extensions import TypeAlias
+import numpy
+from spinn_utilities.config_holder import (
+    get_config_bool, get_config_float, get_config_int, get_config_str)
+from spinn_utilities.log import FormatAdapter
 from spinn_utilities.progress_bar import ProgressBar
 from spinn_utilities.typing.coords import XY
-from spinn_machine import Machine
 from pacman.data import PacmanDataView
-from pacman.exceptions import PacmanRoutingException
+from pacman.exceptions import (
+    PacmanConfigurationException, PacmanRoutingException)
 from pacman.model.routing_table_by_partition import (
-    MulticastRoutingTableByPartition, MulticastRoutingTableByPartitionEntry)
+    MulticastRoutingTableByPartition, MulticastRoutingTableByPartitionEntry,
+    PartitionRoutes, PartitionRoutesCache)
+from pacman.model.routing_table_by_partition.partition_routes import (
+    RouteEntry)
 from pacman.utilities.algorithm_utilities.routing_algorithm_utilities import (
-    longest_dimension_first, get_app_partitions, vertex_xy,
-    vertex_xy_and_route)
+    get_app_partitions, vertex_xy, vertex_xy_and_route)
 from pacman.utilities.algorithm_utilities.routing_tree import RoutingTree
-from pacman.model.graphs.application import ApplicationVertex
+from pacman.utilities.algorithm_utilities.machine_topology import (
+    MachineTopology, NO_CHIP)
+from pacman.utilities.algorithm_utilities.ner_routing import (
+    route_to_nearest_in_tree)
+from pacman.utilities.algorithm_utilities.partition_fingerprints import (
+    find_shared_partitions, partition_fingerprint)
+from pacman.utilities.algorithm_utilities.path_search import (
+    next_level, print_path, route_pre_to_post)
+from pacman.utilities.algorithm_utilities.table_pressure import (
+    TablePressure)
+from pacman.utilities.utility_calls import (
+    get_fork_context, map_in_fork, split_into_shards)
+from pacman.model.graphs.application import (
+    ApplicationEdgePartition, ApplicationVertex)
 from pacman.model.graphs.machine import MachineVertex, MulticastEdgePartition
-from pacman.model.graphs import AbstractEdgePartition
+from pacman.model.graphs import AbstractEdgePartition, AbstractVertex
+
+logger = FormatAdapter(logging.getLogger(__name__))
 
 _AnyVertex: TypeAlias = Union[ApplicationVertex, MachineVertex]
-_Node: TypeAlias = Tuple[int, XY]
 _OptInt: TypeAlias = Optional[int]
 _MappedSrc: TypeAlias = Tuple[_AnyVertex, _OptInt, _OptInt]
+_PartitionEntry: TypeAlias = Tuple[
+    XY, AbstractVertex, str, MulticastRoutingTableByPartitionEntry]
 
 
 class _Targets(object):
@@ -178,99 +203,611 @@ class _Targets(object):
         return vertex, self.__targets_by_source[vertex]
 
 
+#: Build the tree to the chips of each target by a longest dimension first
+#: route to one chip and then a breadth first search of the target's chips
+ENGINE_DEFAULT = "default"
+
+#: Build the tree by connecting each target chip, nearest first, to the
+#: nearest chip already in the tree, in the style of Neighbour Exploring
+#: Routing
+ENGINE_NER = "ner"
+
+
+class _RouterOptions(object):
+    """
+    The configured options that change the routes made.
+    """
+    __slots__ = ("engine", "prefer_straight")
+
+    def __init__(self) -> None:
+        engine = (get_config_str("Mapping", "router_engine") or
+                  ENGINE_DEFAULT).lower()
+        if engine not in (ENGINE_DEFAULT, ENGINE_NER):
+            raise PacmanConfigurationException(
+                f"Unknown [Mapping] router_engine {engine}; expected "
+                f"{ENGINE_DEFAULT} or {ENGINE_NER}")
+        self.engine = engine
+        self.prefer_straight = bool(
+            get_config_bool("Mapping", "router_prefer_straight"))
+
+    @property
+    def signature(self) -> Hashable:
+        """
+        Something that compares equal only for options that make the same
+        routes.
+        """
+        return (self.engine, self.prefer_straight)
+
+
 def route_application_graph() -> MulticastRoutingTableByPartition:
     """
     Route the current application graph.
+
+    ``[Mapping] router_engine`` selects how the tree of each partition is
+    built; see :py:data:`ENGINE_DEFAULT` and :py:data:`ENGINE_NER`.
+    If ``[Mapping] router_prefer_straight`` is set, of the shortest paths
+    the ones that go straight through chips are preferred, so that more
+    entries can be left to default routing.
+    If ``[Mapping] router_n_processes`` is more than 1 (and processes can be
+    forked), the partitions are routed in that many processes.  If
+    ``[Mapping] router_incremental`` is set, the routes of each partition
+    are kept, and used again in later runs if nothing they depend on has
+    changed.  Either way, the result is the same as routing all the
+    partitions in turn in this process.
+
+    If ``[Mapping] router_max_detour_hops`` is more than 0, paths are
+    steered around chips with at least ``[Mapping] router_table_pressure``
+    of their multicast entries used, if that makes them at most that many
+    links longer.  As the routes of each partition then depend on those of
+    the partitions before it, they are all made in turn in this process.
+    """
+    partitions = get_app_partitions()
+    topology = PacmanDataView.get_machine_topology()
+    options = _RouterOptions()
+    path_cache = topology.get_path_cache(
+        get_config_int("Mapping", "router_path_cache_size") or 0,
+        options.signature)
+    hits, misses = path_cache.hits, path_cache.misses
+
+    pressure: Optional[TablePressure] = None
+    max_detour_hops = get_config_int("Mapping", "router_max_detour_hops")
+    if max_detour_hops:
+        pressure = TablePressure(
+            topology, get_config_float("Mapping", "router_table_pressure"),
+            max_detour_hops)
+
+    routes_cache: Optional[PartitionRoutesCache] = None
+    if pressure is None and get_config_bool("Mapping", "router_incremental"):
+        routes_cache = PacmanDataView.get_partition_routes_cache()
+        routes_cache.start((topology.signature, options.signature))
+
+    context: Optional[BaseContext] = None
+    n_processes = get_config_int("Mapping", "router_n_processes") or 1
+    if pressure is None and n_processes > 1 and len(partitions) > 1:
+        context = get_fork_context()
+
+    if routes_cache is None and context is None:
+        routing_tables = _route_in_turn(
+            partitions, topology, options, pressure)
+    else:
+        routing_tables = _route_partitions(
+            partitions, topology, options, routes_cache, context,
+            n_processes)
+
+    logger.info(
+        "Route path cache of size {}: {} hits, {} misses",
+        path_cache.max_size, path_cache.hits - hits,
+        path_cache.misses - misses)
+    if pressure is not None:
+        logger.info(
+            "Steered {} paths around {} chips with nearly full tables",
+            pressure.n_detours, pressure.n_hot)
+
+    # Return the routing tables
+    return routing_tables
+
+
+def _route_in_turn(
+        partitions: Sequence[ApplicationEdgePartition],
+        topology: MachineTopology, options: _RouterOptions,
+        pressure: Optional[TablePressure]) -> \
+        MulticastRoutingTableByPartition:
+    """
+    Route the partitions in turn directly into the routing tables, copying
+    the routes of partitions with the same shape as an earlier one.
+
+    :param list(ApplicationEdgePartition) partitions:
+    :param MachineTopology topology:
+    :param _RouterOptions options:
+    :param pressure: The chips to steer paths around, if any
+    :type pressure: TablePressure or None
+    :rtype: MulticastRoutingTableByPartition
     """
     routing_tables = MulticastRoutingTableByPartition()
+    shared = find_shared_partitions(partitions, range(len(partitions)))
+    firsts = set(shared.values())
+    first_routes: Dict[int, Tuple[
+        List[_PartitionEntry], Dict[XY, RoutingTree]]] = dict()
 
-    partitions = get_app_partitions()
-    machine = PacmanDataView.get_machine()
     # Now go through the app edges and route app vertex by app vertex
     progress = ProgressBar(len(partitions), "Routing")
-    for partition in progress.over(partitions):
-        # Store the source vertex of the partition
-        source: ApplicationVertex = partition.pre_vertex
+    for index, partition in progress.over(enumerate(partitions)):
+        first = shared.get(index)
+        if first is not None:
+            entries, routes = first_routes[first]
+            _add_entries(routing_tables, entries, partition.identifier)
+        elif index in firsts:
+            partition_tables = MulticastRoutingTableByPartition()
+            routes = _route_partition(
+                partition, topology, partition_tables, options, pressure)
+            entries = _partition_entries(partition_tables)
+            first_routes[index] = (entries, routes)
+            _add_entries(routing_tables, entries)
+        else:
+            routes = _route_partition(
+                partition, topology, routing_tables, options, pressure)
+        if pressure is not None:
+            pressure.update(routing_tables, routes, topology)
+    if shared:
+        logger.info(
+            "Copied the routes of {} of {} partitions", len(shared),
+            len(partitions))
+    return routing_tables
 
-        # Pick a place within the source that we can route from.  Note that
-        # this might not end up being the actual source in the end.
-        source_mappings = _get_outgoing_mapping(source, partition.identifier)
 
-        # No source mappings?  Nothing to route then!
-        if not source_mappings:
-            continue
+def reroute_around_faults(
+        routing_tables: MulticastRoutingTableByPartition,
+        failed_chips: Iterable[XY] = (),
+        failed_links: Iterable[Tuple[int, int, int]] = (),
+        routes_cache: Optional[PartitionRoutesCache] = None) -> List[
+            ApplicationEdgePartition]:
+    """
+    Update routing tables made by :py:func:`route_application_graph` so
+    that they avoid chips and links that have failed since, routing again
+    only the partitions whose routes use them.  The chips and links
+    avoided by earlier calls are still avoided.
 
-        source_xy = next(iter(source_mappings.keys()))
-        # Get all source chips coordinates
-        all_source_xys = _get_all_xys(source)
+    This needs the routes kept when routing with
+    ``[Mapping] router_incremental`` set; these are updated too.
 
-        # Keep track of the source edge chips
-        source_edge_xys: Set[XY] = set()
+    :param MulticastRoutingTableByPartition routing_tables:
+        The tables to update in place
+    :param iterable(tuple(int, int)) failed_chips:
+        The coordinates of chips that have failed
+    :param iterable(tuple(int, int, int)) failed_links:
+        The (x, y, link) of links that have failed, in either direction
+    :param routes_cache:
+        The routes kept from the routing; by default those of the data view
+    :type routes_cache: PartitionRoutesCache or None
+    :return: The partitions that were routed again
+    :rtype: list(ApplicationEdgePartition)
+    :raises PacmanRoutingException:
+        If routes were not kept for a partition, or a partition can't be
+        routed without the failed chips and links (for example, as
+        something is placed on a failed chip)
+    """
+    if routes_cache is None:
+        routes_cache = PacmanDataView.get_partition_routes_cache()
+    failed_xys = set(failed_chips)
+
+    # Start from the faults already avoided, if any, so that they are
+    # still avoided
+    last_topology = routes_cache.topology
+    full_topology = PacmanDataView.get_machine_topology()
+    if last_topology is None or last_topology.machine is not \
+            full_topology.machine:
+        last_topology = full_topology
+    topology = last_topology.without(failed_xys, failed_links)
+    options = _RouterOptions()
+
+    # Find the (x, y, link) that can no longer be used
+    lost_links: Set[Tuple[int, int, int]] = set()
+    for chip_id, link in numpy.argwhere(
+            (last_topology.neighbours != NO_CHIP) &
+            (topology.neighbours == NO_CHIP)):
+        x, y = topology.xy(int(chip_id))
+        lost_links.add((x, y, int(link)))
+
+    rerouted: List[ApplicationEdgePartition] = list()
+    for partition in get_app_partitions():
+        source = partition.pre_vertex
+        routes = routes_cache.get_routes(source, partition.identifier)
+        if routes is None:
+            raise PacmanRoutingException(
+                f"No routes kept for {partition}; route with "
+                "[Mapping] router_incremental set to reroute around faults")
+        if not any(
+                xy in failed_xys or any(
+                    (xy[0], xy[1], link) in lost_links
+                    for link in entry.link_ids)
+                for xy, _index, _partition_id, entry in routes.entries):
+            continue
 
-        # Keep track of which chips (xys) we have visited with routes for this
-        # partition to ensure no looping
-        routes: Dict[XY, RoutingTree] = dict()
+        # Take out the old entries and add the new ones
+        m_vertices = list(source.machine_vertices)
+        for (x, y), index, partition_id, _entry in routes.entries:
+            vertex = source if index is None else m_vertices[index]
+            routing_tables.remove_path_entry(x, y, vertex, partition_id)
+        partition_tables = MulticastRoutingTableByPartition()
+        trees = _route_partition(
+            partition, topology, partition_tables, options)
+        entries = _partition_entries(partition_tables)
+        for (x, y), vertex, partition_id, entry in entries:
+            routing_tables.add_path_entry(entry, x, y, vertex, partition_id)
+
+        new_routes = _make_partition_routes(
+            source, routes.fingerprint, entries, trees)
+        if new_routes is not None:
+            routes_cache.add_routes(source, partition.identifier, new_routes)
+        rerouted.append(partition)
+
+    routes_cache.set_signature(
+        (topology.signature, options.signature), topology)
+    logger.info(
+        "Routed {} partitions again to avoid {} chips and {} links",
+        len(rerouted), len(failed_xys), len(lost_links))
+    return rerouted
+
+
+def _route_partition(
+        partition: ApplicationEdgePartition, topology: MachineTopology,
+        routing_tables: MulticastRoutingTableByPartition,
+        options: _RouterOptions,
+        pressure: Optional[TablePressure] = None) -> Dict[XY, RoutingTree]:
+    """
+    Route a single application partition, adding the entries to the
+    routing tables.
 
-        # Keep track of cores or links to target on specific chips (xys)
-        targets: Dict[XY, _Targets] = defaultdict(_Targets)
+    :param ApplicationEdgePartition partition: The partition to route
+    :param MachineTopology topology: The machine to route on
+    :param MulticastRoutingTableByPartition routing_tables:
+        The routing tables to add the entries to
+    :param _RouterOptions options: How to route
+    :param pressure: The chips to steer paths around, if any
+    :type pressure: TablePressure or None
+    :return: The routing trees from the source to the targets by chip
+    :rtype: dict(tuple(int, int), RoutingTree)
+    """
+    # Store the source vertex of the partition
+    source: ApplicationVertex = partition.pre_vertex
+
+    # Pick a place within the source that we can route from.  Note that
+    # this might not end up being the actual source in the end.
+    source_mappings = _get_outgoing_mapping(source, partition.identifier)
+
+    # No source mappings?  Nothing to route then!
+    if not source_mappings:
+        return dict()
+
+    source_xy = next(iter(source_mappings.keys()))
+    # Get all source chips coordinates
+    all_source_xys = _get_all_xys(source)
+
+    # Keep track of the source edge chips
+    source_edge_xys: Set[XY] = set()
+
+    # Keep track of which chips (xys) we have visited with routes for this
+    # partition to ensure no looping
+    routes: Dict[XY, RoutingTree] = dict()
+
+    # Keep track of cores or links to target on specific chips (xys)
+    targets: Dict[XY, _Targets] = defaultdict(_Targets)
+
+    # Remember if we see a self-connection
+    self_connected = False
+    self_xys: Set[XY] = set()
+
+    for edge in partition.edges:
+        # Store the target vertex
+        target = edge.post_vertex
+
+        # If not self-connected
+        if source != target:
+            _route_source_to_target(
+                topology, source, source_xy, all_source_xys,
+                source_mappings, source_edge_xys, target, targets,
+                partition, routes, options, pressure)
+        # If self-connected
+        else:
+            self_connected = True
+            _route_source_to_source(source, partition, targets, self_xys)
+
+    # Deal with internal multicast partitions
+    internal = source.splitter.get_internal_multicast_partitions()
+    if internal:
+        self_connected = True
+        _route_internal(internal, targets, self_xys)
+
+    # Make the real routes from source edges to targets
+    _make_source_to_target_routes(
+        source, partition, source_edge_xys, source_mappings, targets,
+        routing_tables, routes)
+
+    # Now make the routes from actual sources to source edges
+    if self_connected:
+        _make_source_to_source_routes(
+            all_source_xys, source_edge_xys, self_xys, source_mappings,
+            topology, partition, routing_tables, targets,
+            options.prefer_straight)
+    else:
+        _make_source_to_source_edge_routes(
+            all_source_xys, source_edge_xys, source_mappings, topology,
+            partition, routing_tables, options.prefer_straight)
 
-        # Remember if we see a self-connection
-        self_connected = False
-        self_xys: Set[XY] = set()
+    return routes
 
-        for edge in partition.edges:
-            # Store the target vertex
-            target = edge.post_vertex
 
-            # If not self-connected
-            if source != target:
-                _route_source_to_target(
-                    machine, source, source_xy, all_source_xys,
-                    source_mappings, source_edge_xys, target, targets,
-                    partition, routes)
-            # If self-connected
-            else:
-                self_connected = True
-                _route_source_to_source(source, partition, targets, self_xys)
+def _partition_entries(
+        routing_tables: MulticastRoutingTableByPartition) -> List[
+            _PartitionEntry]:
+    """
+    Get the entries of routing tables in the order they were added.
 
-        # Deal with internal multicast partitions
-        internal = source.splitter.get_internal_multicast_partitions()
-        if internal:
-            self_connected = True
-            _route_internal(internal, targets, self_xys)
-
-        # Make the real routes from source edges to targets
-        _make_source_to_target_routes(
-            source, partition, source_edge_xys, source_mappings, targets,
-            routing_tables, routes)
-
-        # Now make the routes from actual sources to source edges
-        if self_connected:
-            _make_source_to_source_routes(
-                all_source_xys, source_edge_xys, self_xys, source_mappings,
-                machine, partition, routing_tables, targets)
-        else:
-            _make_source_to_source_edge_routes(
-                all_source_xys, source_edge_xys, source_mappings, machine,
-                partition, routing_tables)
+    :param MulticastRoutingTableByPartition routing_tables:
+    :rtype: list(tuple(tuple(int, int), AbstractVertex, str,
+        MulticastRoutingTableByPartitionEntry))
+    """
+    entries: List[_PartitionEntry] = list()
+    for (x, y) in routing_tables.get_routers():
+        router_entries = routing_tables.get_entries_for_router(x, y)
+        assert router_entries is not None
+        for (source, partition_id), entry in router_entries.items():
+            entries.append(((x, y), source, partition_id, entry))
+    return entries
+
+
+def _route_partitions(
+        partitions: Sequence[ApplicationEdgePartition],
+        topology: MachineTopology, options: _RouterOptions,
+        routes_cache: Optional[PartitionRoutesCache],
+        context: Optional[BaseContext],
+        n_processes: int) -> MulticastRoutingTableByPartition:
+    """
+    Route the partitions separately, reusing kept routes where possible,
+    and then add the entries to the routing tables in partition order.
+
+    Adding the entries of each partition in turn gives the same tables
+    (including their ordering) as routing the partitions in turn directly
+    into the tables, as no two partitions share a source and identifier.
+
+    :param list(ApplicationEdgePartition) partitions:
+    :param MachineTopology topology:
+    :param _RouterOptions options:
+    :param routes_cache: Where routes are kept between runs, if anywhere
+    :type routes_cache: PartitionRoutesCache or None
+    :param context: How to start processes to route in, if any
+    :type context: ~multiprocessing.context.BaseContext or None
+    :param int n_processes:
+    :rtype: MulticastRoutingTableByPartition
+    """
+    kept: Dict[int, PartitionRoutes] = dict()
+    fingerprints: List[Hashable] = list()
+    if routes_cache is not None:
+        for index, partition in enumerate(partitions):
+            fingerprint = partition_fingerprint(partition)
+            fingerprints.append(fingerprint)
+            cached = routes_cache.get_routes(
+                partition.pre_vertex, partition.identifier)
+            if cached is not None and cached.fingerprint == fingerprint:
+                kept[index] = cached
+
+    not_kept = [index for index in range(len(partitions))
+                if index not in kept]
+    shared = find_shared_partitions(partitions, not_kept)
+    to_route = [index for index in not_kept if index not in shared]
+    routed: Dict[int, Tuple[
+        List[_PartitionEntry], Optional[Dict[XY, RoutingTree]]]]
+    if context is not None and len(to_route) > 1:
+        routed = _route_in_parallel(
+            partitions, to_route, topology, options, n_processes)
+    else:
+        routed = dict()
+        progress = ProgressBar(len(to_route), "Routing")
+        for index in progress.over(to_route):
+            partition_tables = MulticastRoutingTableByPartition()
+            partition_trees = _route_partition(
+                partitions[index], topology, partition_tables, options)
+            routed[index] = (
+                _partition_entries(partition_tables), partition_trees)
+    for index, first in shared.items():
+        first_entries, first_trees = routed[first]
+        partition_id = partitions[index].identifier
+        routed[index] = ([
+            (xy, vertex, partition_id, entry)
+            for xy, vertex, _partition_id, entry in first_entries],
+            first_trees)
 
-    # Return the routing tables
+    routing_tables = MulticastRoutingTableByPartition()
+    new_routes: Dict[Tuple[ApplicationVertex, str], PartitionRoutes] = dict()
+    for index, partition in enumerate(partitions):
+        source = partition.pre_vertex
+        routes: Optional[PartitionRoutes] = kept.get(index)
+        if routes is not None:
+            routes.add_to(routing_tables, source)
+        else:
+            entries, trees = routed[index]
+            _add_entries(routing_tables, entries)
+            if routes_cache is not None:
+                routes = _make_partition_routes(
+                    source, fingerprints[index], entries, trees)
+        if routes is not None:
+            new_routes[source, partition.identifier] = routes
+
+    if routes_cache is not None:
+        routes_cache.set_routes(new_routes)
+        logger.info(
+            "Reused the routes of {} of {} partitions",
+            len(kept), len(partitions))
+    if shared:
+        logger.info(
+            "Copied the routes of {} of {} partitions", len(shared),
+            len(partitions))
     return routing_tables
 
 
+def _add_entries(
+        routing_tables: MulticastRoutingTableByPartition,
+        entries: Iterable[_PartitionEntry],
+        partition_id: Optional[str] = None):
+    """
+    Add the entries of a partition to routing tables.
+
+    :param MulticastRoutingTableByPartition routing_tables:
+    :param list(tuple) entries:
+    :param partition_id:
+        The identifier to add the entries with in place of their own, if
+        they are copied from a partition with the same shape
+    :type partition_id: str or None
+    """
+    for (x, y), vertex, entry_partition_id, entry in entries:
+        routing_tables.add_path_entry(
+            entry, x, y, vertex, partition_id or entry_partition_id)
+
+
+def _make_partition_routes(
+        source: ApplicationVertex, fingerprint: Hashable,
+        entries: List[_PartitionEntry],
+        trees: Optional[Dict[XY, RoutingTree]]) -> Optional[PartitionRoutes]:
+    """
+    Make the routes of a partition to keep, if all the sources are the
+    application vertex or one of its machine vertices.
+
+    :param ApplicationVertex source:
+    :param fingerprint:
+    :param list(tuple) entries:
+    :param trees:
+    :rtype: PartitionRoutes or None
+    """
+    m_vertices = list(source.machine_vertices)
+    route_entries: List[RouteEntry] = list()
+    for xy, vertex, partition_id, entry in entries:
+        index: Optional[int] = None
+        if vertex is not source:
+            if not isinstance(vertex, MachineVertex):
+                return None
+            index = vertex.index
+            if index >= len(m_vertices) or m_vertices[index] is not vertex:
+                return None
+        route_entries.append((xy, index, partition_id, entry))
+    return PartitionRoutes(fingerprint, route_entries, trees)
+
+
+#: Number of shards of partitions to give each process when routing in
+#: parallel, so that the work is spread when partitions differ in cost
+_SHARDS_PER_PROCESS = 4
+
+#: The partitions, indices of those to route, vertices, topology and
+#: options shared with forked routing processes
+_ShardState: TypeAlias = Tuple[
+    Sequence[ApplicationEdgePartition], Sequence[int],
+    Dict[AbstractVertex, int], MachineTopology, _RouterOptions]
+
+
+def _route_in_parallel(
+        partitions: Sequence[ApplicationEdgePartition],
+        to_route: Sequence[int], topology: MachineTopology,
+        options: _RouterOptions, n_processes: int) -> Dict[int, Tuple[
+            List[_PartitionEntry], Optional[Dict[XY, RoutingTree]]]]:
+    """
+    Route some of the partitions in contiguous shards in forked processes.
+
+    The routing trees are not sent back from the processes.
+
+    :param list(ApplicationEdgePartition) partitions:
+    :param list(int) to_route: The indices of the partitions to route
+    :param MachineTopology topology:
+    :param _RouterOptions options:
+    :param int n_processes:
+    :return: The entries of each partition routed, by partition index
+    """
+    # Vertices are sent back from the workers as indices into this list
+    vertices: List[AbstractVertex] = list()
+    vertex_refs: Dict[AbstractVertex, int] = dict()
+    for index in to_route:
+        source = partitions[index].pre_vertex
+        sources: List[AbstractVertex] = [source]
+        sources.extend(source.machine_vertices)
+        sources.extend(
+            internal.pre_vertex for internal in
+            source.splitter.get_internal_multicast_partitions())
+        for vertex in sources:
+            if vertex not in vertex_refs:
+                vertex_refs[vertex] = len(vertices)
+                vertices.append(vertex)
+
+    shards = split_into_shards(
+        len(to_route), n_processes * _SHARDS_PER_PROCESS)
+    routed: Dict[int, Tuple[
+        List[_PartitionEntry], Optional[Dict[XY, RoutingTree]]]] = dict()
+    progress = ProgressBar(len(to_route), "Routing")
+    path_cache = topology.path_cache
+    state: _ShardState = (
+        partitions, to_route, vertex_refs, topology, options)
+    try:
+        for shard, (shard_entries, hits, misses) in zip(shards, map_in_fork(
+                state, _route_shard, shards, n_processes)):
+            if path_cache is not None:
+                path_cache.add_counts(hits, misses)
+            for position, entries in zip(shard, shard_entries):
+                routed[to_route[position]] = ([
+                    (xy, vertices[vertex_ref], partition_id, entry)
+                    for xy, vertex_ref, partition_id, entry in entries],
+                    None)
+            progress.update(len(shard))
+    finally:
+        progress.end()
+    return routed
+
+
+def _route_shard(state: _ShardState, shard: range) -> Tuple[List[List[Tuple[
+        XY, int, str, MulticastRoutingTableByPartitionEntry]]], int, int]:
+    """
+    Route a shard of the partitions in a worker process.
+
+    :param tuple state:
+        The partitions, the indices of those to route, the indices of the
+        vertices, the topology and the options
+    :param range shard:
+        The positions in the list of partitions to route of the partitions
+        to route in this shard
+    :return: The entries of each partition, in the order added, with the
+        source vertex replaced by its index, and the number of path cache
+        hits and misses while routing the shard
+    """
+    partitions, to_route, vertex_refs, topology, options = state
+    path_cache = topology.path_cache
+    hits = path_cache.hits if path_cache is not None else 0
+    misses = path_cache.misses if path_cache is not None else 0
+    shard_entries = list()
+    for position in shard:
+        routing_tables = MulticastRoutingTableByPartition()
+        _route_partition(
+            partitions[to_route[position]], topology, routing_tables,
+            options)
+        shard_entries.append([
+            (xy, vertex_refs[source], partition_id, entry)
+            for xy, source, partition_id, entry in
+            _partition_entries(routing_tables)])
+    if path_cache is not None:
+        hits = path_cache.hits - hits
+        misses = path_cache.misses - misses
+    return shard_entries, hits, misses
+
+
 def _route_source_to_target(
-        machine: Machine, source: ApplicationVertex,
+        topology: MachineTopology, source: ApplicationVertex,
         source_xy: XY, all_source_xys: Set[XY],
         source_mappings: Dict[XY, List[_MappedSrc]],
         source_edge_xys: Set[XY], target: ApplicationVertex,
         targets: Dict[XY, _Targets],
         partition: AbstractEdgePartition,
-        routes: Dict[XY, RoutingTree]):
+        routes: Dict[XY, RoutingTree], options: _RouterOptions,
+        pressure: Optional[TablePressure]):
     """
     Route from a source to a single application vertex target that is not
     the same as the source.
 
-    :param Machine machine: The machine to route on
+    :param MachineTopology topology: The machine to route on
     :param ApplicationVertex source: The source application vertex
     :param tuple(int,int) source_xy: A chip chosen in the source to route from
     :param set(tuple(int,int) all_source_xys: All source chips
@@ -287,6 +824,9 @@ def _route_source_to_target(
     :param AbstractEdgePartition partition: The partition being routed
     :param dict(tuple(int,int), RoutingTree) routes:
         The routes made by chip (updated here)
+    :param _RouterOptions options: How to route
+    :param pressure: The chips to steer paths around, if any
+    :type pressure: TablePressure or None
     """
     # Get which vertices are targeted by the source
     target_vertices = target.splitter.get_source_specific_in_coming_vertices(
@@ -305,6 +845,13 @@ def _route_source_to_target(
 
         real_target_xys.add(xy)
 
+    if options.engine == ENGINE_NER:
+        route_to_nearest_in_tree(
+            topology, source_xy, all_source_xys, source_edge_xys,
+            real_target_xys, routes, f"Source to Target ({target.label})",
+            options.prefer_straight, pressure)
+        return
+
     target_xys: Set[XY]
     # If there is just one real target, use that directly
     if len(real_target_xys) == 1:
@@ -321,31 +868,33 @@ def _route_source_to_target(
 
     # Make a route between source and target, without any source
     # or target chips in it
-    source_edge_xy, target_edge_xy = _route_pre_to_post(
-        source_xy, target_xy, routes, machine,
+    source_edge_xy, target_edge_xy = route_pre_to_post(
+        source_xy, target_xy, routes, topology,
         f"Source to Target ({target.label})", all_source_xys,
-        target_xys)
+        target_xys, options.prefer_straight, pressure)
 
     if not overlaps:
         _route_single_source_to_target(
-            machine, source_edge_xys, source_edge_xy, source_mappings,
-            target_edge_xy, target_xys, real_target_xys, routes)
+            topology, source_edge_xys, source_edge_xy, source_mappings,
+            target_edge_xy, target_xys, real_target_xys, routes,
+            options.prefer_straight)
     else:
         _route_multiple_source_to_target(
-            machine, source_edge_xys, target_edge_xy, target_xys,
-            real_target_xys, routes, overlaps)
+            topology, source_edge_xys, target_edge_xy, target_xys,
+            real_target_xys, routes, overlaps, options.prefer_straight)
 
 
 def _route_single_source_to_target(
-        machine: Machine, source_edge_xys: Set[XY], source_edge_xy: XY,
+        topology: MachineTopology, source_edge_xys: Set[XY],
+        source_edge_xy: XY,
         source_mappings: Dict[XY, List[_MappedSrc]], target_edge_xy: XY,
         target_xys: Set[XY], real_target_xys: Set[XY],
-        routes: Dict[XY, RoutingTree]):
+        routes: Dict[XY, RoutingTree], prefer_straight: bool):
     """
     Route from a single source connection point to all targets from the
     target edge chip.
 
-    :param Machine machine: The machine to route on
+    :param MachineTopology topology: The machine to route on
     :param set(tuple(int,int)) source_edge_xys:
         Set of chips that routes are currently going outward from the source
         (updated here)
@@ -362,11 +911,13 @@ def _route_single_source_to_target(
         The chips in the target that something in the source actually targets
     :param dict(tuple(int,int), RoutingTree) routes:
         The routes already made and to add to (updated here)
+    :param bool prefer_straight:
+        Whether to prefer paths that go straight through chips
     """
     # Route from target edge chip to all the targets
     _route_to_xys(
-        target_edge_xy, target_xys, machine, routes,
-        real_target_xys, "Target to Targets")
+        target_edge_xy, target_xys, topology, routes,
+        real_target_xys, "Target to Targets", prefer_straight)
 
     # If the start of the route is still part of the source vertex
     # chips, add it
@@ -375,13 +926,15 @@ def _route_single_source_to_target(
 
 
 def _route_multiple_source_to_target(
-        machine: Machine, source_edge_xys: Set[XY], target_edge_xy: XY,
+        topology: MachineTopology, source_edge_xys: Set[XY],
+        target_edge_xy: XY,
         target_xys: Set[XY], real_target_xys: Set[XY],
-        routes: Dict[XY, RoutingTree], overlaps: Set[XY]):
+        routes: Dict[XY, RoutingTree], overlaps: Set[XY],
+        prefer_straight: bool):
     """
     Route from multiple source connection points to all target chips.
 
-    :param Machine machine: The machine to route on
+    :param MachineTopology topology: The machine to route on
     :param set(tuple(int,int)) source_edge_xys:
         Set of chips that routes are currently going outward from the source
         (updated here)
@@ -394,17 +947,20 @@ def _route_multiple_source_to_target(
         The routes already made and to add to (updated here)
     :param set(tuple(int,int)) overlaps:
         Chips which overlap between source and target
+    :param bool prefer_straight:
+        Whether to prefer paths that go straight through chips
     """
     # Deal with the overlaps first by finding the set of all things that can
     # be reached in the target from each of them, without hitting any other
     # overlaps, and routing the source from there directly
     reached_xys = set(overlaps)
     for overlap_xy in overlaps:
-        targets = _find_reachable(overlap_xy, machine, target_xys, reached_xys)
+        targets = _find_reachable(
+            overlap_xy, topology, target_xys, reached_xys)
         this_target_xys = {xy for xy in real_target_xys if xy in targets}
         _route_to_xys(
-            overlap_xy, targets, machine, routes, this_target_xys,
-            f"Overlap {overlap_xy} to Targets")
+            overlap_xy, targets, topology, routes, this_target_xys,
+            f"Overlap {overlap_xy} to Targets", prefer_straight)
 
         # We now need to make sure the source edges go here too
         source_edge_xys.add(overlap_xy)
@@ -420,8 +976,8 @@ def _route_multiple_source_to_target(
 
     # Now do the last bit, which is getting to the rest of the chips
     _route_to_xys(
-        target_edge_xy, target_xys, machine, routes,
-        real_target_xys, "Target to Targets")
+        target_edge_xy, target_xys, topology, routes,
+        real_target_xys, "Target to Targets", prefer_straight)
 
 
 def _route_source_to_source(
@@ -509,9 +1065,9 @@ def _make_source_to_source_routes(
         all_source_xys: Set[XY], source_edge_xys: Set[XY],
         self_xys: Set[XY],
         source_mappings: Dict[XY, List[_MappedSrc]],
-        machine: Machine, partition: AbstractEdgePartition,
+        topology: MachineTopology, partition: AbstractEdgePartition,
         routing_tables: MulticastRoutingTableByPartition,
-        targets: Dict[XY, _Targets]):
+        targets: Dict[XY, _Targets], prefer_straight: bool):
     """
     Convert the routes from the source vertices themselves when the source
     is self-connected.
@@ -524,18 +1080,20 @@ def _make_source_to_source_routes(
     :type source_mappings: dict(tuple(int, int),
         list(tuple(MachineVertex, int,  None) or
         tuple(MachineVertex, None, int)))
-    :param Machine machine: The machine to route on
+    :param MachineTopology topology: The machine to route on
     :param AbstractEdgePartition partition: The partition to route
     :param MulticastRoutingTableByPartition routing_tables: The tables to write
     :param dict(tuple(int,int),_Targets) targets:
         The target end-points of the routes
+    :param bool prefer_straight:
+        Whether to prefer paths that go straight through chips
     """
     for xy in source_mappings:
         source_routes: Dict[XY, RoutingTree] = dict()
         _route_to_xys(
-            xy, all_source_xys, machine, source_routes,
+            xy, all_source_xys, topology, source_routes,
             source_edge_xys.union(self_xys),
-            "Sources to Source (self)")
+            "Sources to Source (self)", prefer_straight)
         for vertex, processor, link in source_mappings[xy]:
             _convert_a_route(
                 routing_tables, vertex, partition.identifier,
@@ -546,8 +1104,9 @@ def _make_source_to_source_routes(
 def _make_source_to_source_edge_routes(
         all_source_xys: Set[XY], source_edge_xys: Iterable[XY],
         source_mappings: Dict[XY, List[_MappedSrc]],
-        machine: Machine, partition: AbstractEdgePartition,
-        routing_tables: MulticastRoutingTableByPartition):
+        topology: MachineTopology, partition: AbstractEdgePartition,
+        routing_tables: MulticastRoutingTableByPartition,
+        prefer_straight: bool):
     """
     Convert the routes from the source vertices to the edge vertices when
     the source is not self-connected.
@@ -559,15 +1118,17 @@ def _make_source_to_source_edge_routes(
     :type source_mappings: dict(tuple(int, int),
         list(tuple(MachineVertex, int,  None) or
         tuple(MachineVertex, None, int)))
-    :param Machine machine: The machine to route on
+    :param MachineTopology topology: The machine to route on
     :param AbstractEdgePartition partition: The partition to route
     :param MulticastRoutingTableByPartition routing_tables: The tables to write
+    :param bool prefer_straight:
+        Whether to prefer paths that go straight through chips
     """
     for xy in source_mappings:
         source_routes: Dict[XY, RoutingTree] = dict()
         _route_to_xys(
-            xy, all_source_xys, machine, source_routes,
-            source_edge_xys, "Sources to source")
+            xy, all_source_xys, topology, source_routes,
+            source_edge_xys, "Sources to source", prefer_straight)
         for vertex, processor, link in source_mappings[xy]:
             _convert_a_route(
                 routing_tables, vertex, partition.identifier,
@@ -648,55 +1209,56 @@ def _get_all_xys(app_vertex: ApplicationVertex) -> Set[XY]:
 
 
 def _route_to_xys(
-        first_xy: XY, all_xys: Set[XY], machine: Machine,
-        routes: Dict[XY, RoutingTree], targets: Iterable[XY], label: str):
+        first_xy: XY, all_xys: Set[XY], topology: MachineTopology,
+        routes: Dict[XY, RoutingTree], targets: Iterable[XY], label: str,
+        prefer_straight: bool = False):
     """
     :param tuple(int, int) first_xy:
     :param list(tuple(int, int)) all_xys:
-    :param ~spinn_machine.Machine machine:
+    :param MachineTopology topology:
     :param routes:
     :param targets:
     :param str label:
+    :param bool prefer_straight:
     """
-    # Keep a queue of xy to visit, list of (parent xy, link from parent)
-    xys_to_explore: Deque[Tuple[XY, List[Tuple[XY, int]]]] = deque(
-        [(first_xy, list())])
-    visited = set()
+    chip_ids = topology.chip_ids
+    xys = topology.xys
+    adjacency = topology.adjacency
+    open_ids = {chip_ids[xy] for xy in all_xys if xy in chip_ids}
+    target_ids = {chip_ids[xy] for xy in targets if xy in chip_ids}
+
+    # Visit the chips a level at a time, and for each chip seen keep the
+    # (parent id, link from parent) it was first reached by
+    first_id = chip_ids[first_xy]
+    parents: Dict[int, Tuple[int, int]] = {first_id: (NO_CHIP, NO_CHIP)}
+    level = [first_id]
     targets_to_visit = set(targets)
-    while xys_to_explore:
-        xy, path = xys_to_explore.popleft()
-        if xy in targets_to_visit:
-            targets_to_visit.remove(xy)
-        if xy in visited:
-            continue
-        visited.add(xy)
-
-        # If we have reached a xy that has already been routed to,
-        # cut the path off here
-        if xy in routes:
-            path = list()
-
-        # If we have reached a target, add the path to the routes
-        elif xy in targets:
-            routes[xy] = RoutingTree(xy, label)
-            last_route = routes[xy]
-            for parent, link in reversed(path):
-                if parent not in routes:
-                    routes[parent] = RoutingTree(parent, label)
-                routes[parent].append_child((link, last_route))
-                last_route = routes[parent]
-
-            # The path can be reset from here as we have already routed here
-            path = list()
-
-        for link in range(6):
-            x, y = xy
-            if machine.is_link_at(x, y, link):
-                next_xy = machine.xy_over_link(x, y, link)
-                if _is_open_chip(next_xy, all_xys, visited, machine):
-                    new_path = list(path)
-                    new_path.append((xy, link))
-                    xys_to_explore.append((next_xy, new_path))
+    while level:
+        for chip_id in level:
+            xy = xys[chip_id]
+            targets_to_visit.discard(xy)
+
+            # If we have reached a target that hasn't already been routed
+            # to, follow the parents back until we get to a routed chip,
+            # adding the path to the routes
+            if xy not in routes and chip_id in target_ids:
+                last_route = RoutingTree(xy, label)
+                routes[xy] = last_route
+                parent_id, link = parents[chip_id]
+                while parent_id != NO_CHIP:
+                    parent = xys[parent_id]
+                    parent_route = routes.get(parent)
+                    if parent_route is not None:
+                        parent_route.append_child((link, last_route))
+                        break
+                    parent_route = RoutingTree(parent, label)
+                    routes[parent] = parent_route
+                    parent_route.append_child((link, last_route))
+                    last_route = parent_route
+                    parent_id, link = parents[parent_id]
+
+        level = next_level(level, parents, adjacency, open_ids,
+                           prefer_straight)
     # Sanity check
     if targets_to_visit:
         raise PacmanRoutingException(
@@ -705,7 +1267,7 @@ def _route_to_xys(
 
 
 def _find_reachable(
-        source_xy: XY, machine: Machine, allowed_xys: Set[XY],
+        source_xy: XY, topology: MachineTopology, allowed_xys: Set[XY],
         disallowed_xys: Set[XY]) -> Set[XY]:
     """
     Find a set of chips that can be reached from a source only via the
@@ -714,209 +1276,27 @@ def _find_reachable(
     allowed chips!
 
     :param tuple(int,int) source_xy:
-    :param Machine machine:
+    :param MachineTopology topology:
     :param set(tuple(int,int)) allowed_xys:
     :param set(tuple(int,int)) disallowed_xys:
     :rtype: set(tuple(int,int))
     """
-    xys_to_explore = deque([source_xy])
-    visited = set()
-    while xys_to_explore:
-        xy = xys_to_explore.pop()
-        if xy in visited:
+    chip_ids = topology.chip_ids
+    adjacency = topology.adjacency
+    open_ids = {chip_ids[xy] for xy in allowed_xys
+                if xy in chip_ids and xy not in disallowed_xys}
+    ids_to_explore = deque([chip_ids[source_xy]])
+    visited: Set[int] = set()
+    while ids_to_explore:
+        chip_id = ids_to_explore.pop()
+        if chip_id in visited:
             continue
-        visited.add(xy)
-        for link in range(6):
-            x, y = xy
-            if machine.is_link_at(x, y, link):
-                next_xy = machine.xy_over_link(x, y, link)
-                if (_is_open_chip(next_xy, allowed_xys, visited, machine) and
-                        next_xy not in disallowed_xys):
-                    xys_to_explore.append(next_xy)
-    return visited
-
-
-def _is_open_chip(
-        xy: XY, xy_set: Set[XY], visited: Set[XY],
-        machine: Machine) -> bool:
-    """
-    :param tuple(int, int) xy: Coordinates
-    :param set(tuple(int, int) xy_set: List of legal coordinates
-    :param set(tuple(int, int) visited:
-    :param ~spinn_machine.Machine machine:
-    :return: True if the coordinates point to an existing Chip not yet visited
-    :rtype: bool
-    """
-    return xy in xy_set and xy not in visited and machine.is_chip_at(*xy)
-
-
-def _route_pre_to_post(
-        source_xy: XY, dest_xy: XY, routes: Dict[XY, RoutingTree],
-        machine: Machine, label: str, all_source_xy: Set[XY],
-        target_xys: Set[XY]) -> Tuple[XY, XY]:
-    """
-    :param tuple(int, int) source_xy:
-    :param tuple(int, int) dest_xy:
-    :param dict(tuple(int,int), RoutingTree) routes:
-    :param ~spinn_machine.Machine machine:
-    :param str label:
-    :param set(tuple(int, int)) all_source_xy:
-    :param set(tuple(int, int)) target_xys:
-    :return: the pre- and post-vertex coordinates
-    :rtype: tuple(tuple(int,int), tuple(int, int))
-    """
-    # Find a route from source to target
-    vector = machine.get_vector(source_xy, dest_xy)
-    nodes_direct = longest_dimension_first(vector, source_xy)
-
-    # Route around broken links and chips
-    nodes_fixed = _path_without_errors(source_xy, nodes_direct, machine)
-
-    # Start from the end and move backwards until we find a chip
-    # in the source group, or a already in the route
-    nodes = nodes_fixed
-    route_pre = source_xy
-    for i, (_direction, xy) in reversed(list(enumerate(nodes))):
-        if xy in all_source_xy or xy in routes:
-            nodes = nodes[i + 1:]
-            route_pre = xy
-            break
-
-    # If we found one not in the route, create a new entry for it
-    if route_pre not in routes:
-        routes[route_pre] = RoutingTree(route_pre, label)
-
-    # Start from the start and move forwards until we find a chip in
-    # the target group
-    route_post = dest_xy
-    for i, (_direction, xy) in enumerate(nodes):
-        if xy in target_xys:
-            nodes = nodes[:i + 1]
-            route_post = xy
-            break
-
-    # Convert nodes to routes and add to existing routes
-    source_route = routes[route_pre]
-    for direction, dest_node in nodes:
-        if dest_node in routes:
-            _print_path(routes[source_xy])
-            print(f"Direct path from {source_xy} to {dest_xy}: {nodes_direct}")
-            print(f"Avoiding down chips: {nodes_fixed}")
-            print(f"Trimmed path is from {route_pre} to {route_post}: {nodes}")
-            raise PacmanRoutingException(
-                f"Somehow node {dest_node} already in routes with label"
-                f" {routes[dest_node].label}")
-        dest_route = RoutingTree(dest_node, label)
-        routes[dest_node] = dest_route
-        source_route.append_child((direction, dest_route))
-        source_route = dest_route
-
-    return route_pre, route_post
-
-
-def _path_without_errors(
-        source_xy: XY, nodes: List[_Node],
-        machine: Machine) -> List[_Node]:
-    """
-    :param tuple(int, int) source_xy:
-    :param  list(tuple(int,tuple(int, int))) nodes:
-    :param ~spinn_machine.Machine machine:
-    :rtype: list(tuple(int,int))
-    """
-    c_xy = source_xy
-    pos = 0
-    new_nodes = list()
-    while pos < len(nodes):
-        # While the route is working, move forwards and copy
-        while (pos < len(nodes) and _is_ok(c_xy, nodes[pos], machine)):
-            new_nodes.append(nodes[pos])
-            c_xy = _xy(nodes[pos])
-            pos += 1
-
-        # While the route is broken, find the next working bit
-        next_pos = pos
-        n_xy = c_xy
-        while (next_pos < len(nodes) and not _is_ok(
-                n_xy, nodes[next_pos], machine)):
-            n_xy = _xy(nodes[next_pos])
-            next_pos += 1
-
-        # If there is a broken bit, fix it
-        if next_pos != pos:
-            new_nodes.extend(_find_path(c_xy, n_xy, machine))
-        c_xy = n_xy
-        pos = next_pos
-    return _path_without_loops(source_xy, new_nodes)
-
-
-def _path_without_loops(start_xy: XY, nodes: List[_Node]) -> List[_Node]:
-    """
-    :param tuple(int, int) start_xy:
-    :param list(tuple(int,tuple(int,int))) nodes:
-    :rtype: list(tuple(int,int))
-    """
-    seen_nodes = {start_xy: 0}
-    i = 0
-    while i < len(nodes):
-        _, nxt = nodes[i]
-        if nxt in seen_nodes:
-            last_seen = seen_nodes[nxt]
-            del nodes[last_seen:i + 1]
-            i = last_seen
-        else:
-            i += 1
-            seen_nodes[nxt] = i
-    return nodes
-
-
-def _is_ok(xy: XY, node: _Node, machine: Machine):
-    """
-    :param tuple(int, int) xy:
-    :param tuple(int,tuple(int, int)) node:
-    :param ~spinn_machine.Machine machine:
-    :rtype: bool
-    """
-    c_x, c_y = xy
-    direction, (n_x, n_y) = node
-    return machine.is_link_at(c_x, c_y, direction) \
-        and machine.is_chip_at(n_x, n_y)
-
-
-def _xy(node: _Node) -> XY:
-    _, xy = node
-    return xy
-
-
-def _find_path(
-        source_xy: XY, target_xy: XY, machine: Machine) -> List[_Node]:
-    """
-    :param tuple(int,int) source_xy:
-    :param tuple(int,int) target_xy:
-    :param Machine machine:
-    :rtype: list(tuple(int,tuple(int,int)))
-    """
-    xys_to_explore: Deque[Tuple[XY, List[_Node]]] = deque(
-        [(source_xy, list())])
-    visited = set()
-    while xys_to_explore:
-        xy, path = xys_to_explore.popleft()
-        if xy in visited:
-            continue
-        visited.add(xy)
-
-        # If we have reached a target, add the path to the routes
-        if xy == target_xy:
-            return path
-
-        for link in range(6):
-            x, y = xy
-            if machine.is_link_at(x, y, link):
-                next_xy: XY = machine.xy_over_link(x, y, link)
-                if _is_open_chip(next_xy, set((next_xy,)), visited, machine):
-                    new_path = list(path)
-                    new_path.append((link, next_xy))
-                    xys_to_explore.append((next_xy, new_path))
-    raise PacmanRoutingException(f"No path from {source_xy} to {target_xy}")
+        visited.add(chip_id)
+        for next_id in adjacency[chip_id]:
+            if next_id in open_ids and next_id not in visited:
+                ids_to_explore.append(next_id)
+    xys = topology.xys
+    return {xys[chip_id] for chip_id in visited}
 
 
 def _convert_a_route(
@@ -1020,42 +1400,5 @@ def _add_routing_entry(
         routing_tables.add_path_entry(entry, x, y, source, partition_id)
     except Exception as e:
         print(f"Error adding route: {e}")
-        _print_path(first_route)
+        print_path(first_route)
         raise e
-
-
-def _print_path(first_route: RoutingTree):
-    to_process: List[Tuple[str, _OptInt, RoutingTree]] = [
-        ("", None, first_route)]
-    last_is_leaf = False
-    line = ""
-    visited = set()
-    while to_process:
-        prefix, link, route = to_process.pop()
-
-        if last_is_leaf:
-            line += prefix
-
-        to_add = ""
-        if link is not None:
-            to_add += f" -> {link} -> "
-        to_add += f"{route.chip} ({route.label})"
-        line += to_add
-        prefix += " " * len(to_add)
-
-        if route.chip in visited:
-            print(line, "Loop!")
-            line = ""
-            last_is_leaf = True
-        elif route.is_leaf:
-            # This is a leaf
-            last_is_leaf = True
-            print(line)
-            line = ""
-        else:
-            last_is_leaf = False
-            for direction, next_route in route.children:
-                assert isinstance(next_route, RoutingTree)
-                to_process.append((prefix, direction, next_route))
-
-        visited.add(route.chip)
@@ -24,9 +24,11 @@ from spinn_utilities.log import FormatAdapter
 from spinn_utilities.progress_bar import ProgressBar
 from pacman.data import PacmanDataView
 from pacman.model.routing_tables import (
-    CompressedMulticastRoutingTable, MulticastRoutingTables)
+    AbstractMulticastRoutingTable, CompressedMulticastRoutingTable,
+    MulticastRoutingTables)
 from pacman.exceptions import MinimisationFailedError
 from pacman.model.routing_tables import UnCompressedMulticastRoutingTable
+from .compressed_table_cache import compress_with_cache
 from .rt_entry import RTEntry
 
 logger = FormatAdapter(logging.getLogger(__name__))
@@ -78,6 +80,32 @@ class AbstractCompressor(object):
         """
         raise NotImplementedError
 
+    def _compress(self, table: AbstractMulticastRoutingTable
+                  ) -> AbstractMulticastRoutingTable:
+        """
+        Compress a table into a new table.
+
+        :param AbstractMulticastRoutingTable table: The table to compress
+        :rtype: CompressedMulticastRoutingTable
+        """
+        new_table = CompressedMulticastRoutingTable(table.x, table.y)
+        for entry in self.compress_table(cast(
+                UnCompressedMulticastRoutingTable, table)):
+            new_table.add_multicast_routing_entry(
+                entry.to_multicast_routing_entry())
+        return new_table
+
+    def _cache_settings(self, table: AbstractMulticastRoutingTable) -> str:
+        """
+        The compressor and the settings that it would compress a table with,
+        so that a compressed table is only used again if they are the same.
+
+        :param AbstractMulticastRoutingTable table: The table to compress
+        :rtype: str
+        """
+        # pylint: disable=unused-argument
+        return f"{self.__class__.__name__}(ordered={self._ordered})"
+
     def compress_tables(
             self, router_tables: MulticastRoutingTables,
             progress: ProgressBar) -> MulticastRoutingTables:
@@ -96,25 +124,26 @@ class AbstractCompressor(object):
         compressed_tables = MulticastRoutingTables()
         as_needed = not (get_config_bool(
             "Mapping", "router_table_compress_as_far_as_possible"))
-        for table in progress.over(router_tables.routing_tables):
+        tables = list(router_tables.routing_tables)
+        to_compress = list()
+        for index, table in enumerate(tables):
             chip = PacmanDataView.get_chip_at(table.x, table.y)
             target = chip.router.n_available_multicast_entries
-            if as_needed and table.number_of_entries <= target:
-                new_table = table
-            else:
-                compressed_table = self.compress_table(cast(
-                    UnCompressedMulticastRoutingTable, table))
-
-                new_table = CompressedMulticastRoutingTable(table.x, table.y)
-
-                for entry in compressed_table:
-                    new_table.add_multicast_routing_entry(
-                        entry.to_multicast_routing_entry())
+            if not as_needed or table.number_of_entries > target:
+                to_compress.append(index)
+        new_tables = list(tables)
+        for index, new_table in zip(to_compress, compress_with_cache(
+                [tables[index] for index in to_compress], self._compress,
+                self._cache_settings, progress)):
+            new_tables[index] = new_table
+        for table, new_table in zip(tables, new_tables):
+            if new_table is not table:
+                chip = PacmanDataView.get_chip_at(table.x, table.y)
+                target = chip.router.n_available_multicast_entries
                 if new_table.number_of_entries > target:
                     self._problems += (
                         f"(x:{new_table.x},y:{new_table.y})="
                         f"{new_table.number_of_entries} ")
-
             compressed_tables.add_routing_table(new_table)
 
         if len(self._problems) > 0:
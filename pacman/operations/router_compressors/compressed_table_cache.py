@@ -0,0 +1,222 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy
+
+from spinn_utilities.config_holder import (
+    get_config_int, get_config_str_or_none)
+from spinn_utilities.log import FormatAdapter
+from spinn_utilities.progress_bar import ProgressBar
+
+from pacman.model.routing_tables import AbstractMulticastRoutingTable
+from .parallel_compression import (
+    compress_in_parallel, entries_to_table, table_to_entries)
+
+logger = FormatAdapter(logging.getLogger(__name__))
+
+#: The ending of the names of the files the tables are kept in
+_SUFFIX = ".npy"
+
+
+class CompressedTableCache(object):
+    """
+    Compressed routing tables kept by a hash of the entries of the table
+    they were compressed from and of the compressor and its settings, so
+    that the same table is only compressed once; in memory for a run, and
+    optionally in a directory from one run to the next.
+
+    The entries are sorted before being hashed, as the tables are sets of
+    entries that do not overlap, so a table with the same entries in another
+    order gets the same compressed table back.
+
+    The directory is kept to a size by deleting the tables used least
+    recently, going by the modification time of their files, which is
+    updated when one is used.
+    """
+
+    __slots__ = (
+        # The directory to keep the tables in, or None if only in memory
+        "_directory",
+        # The most bytes to keep in the directory
+        "_max_bytes",
+        # hash -> entries of the compressed table, for the tables used in
+        # this run
+        "_tables")
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_bytes: int = 0):
+        """
+        :param directory:
+            The directory to keep the tables in, or `None` to keep them only
+            in memory
+        :type directory: str or None
+        :param int max_bytes: The most bytes to keep in the directory
+        """
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._tables: Dict[str, numpy.ndarray] = dict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(table: AbstractMulticastRoutingTable, settings: str) -> str:
+        """
+        The hash of a table to be compressed and how it is compressed.
+
+        :param AbstractMulticastRoutingTable table: The table to compress
+        :param str settings:
+            The compressor and the settings it would compress the table with
+        :rtype: str
+        """
+        entries = numpy.sort(table_to_entries(table))
+        md5 = hashlib.md5(settings.encode())
+        md5.update(entries.tobytes())
+        return md5.hexdigest()
+
+    def __path(self, key: str) -> str:
+        assert self._directory is not None
+        return os.path.join(self._directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[numpy.ndarray]:
+        """
+        Get the entries of the compressed table kept for a hash.
+
+        :param str key: The hash from :py:meth:`key`
+        :return: The entries made by
+            :py:func:`~.parallel_compression.table_to_entries`, or `None`
+            if none are kept
+        :rtype: ~numpy.ndarray or None
+        """
+        entries = self._tables.get(key)
+        if entries is None and self._directory is not None:
+            path = self.__path(key)
+            if os.path.exists(path):
+                try:
+                    entries = numpy.load(path, allow_pickle=False)
+                    os.utime(path)
+                    self._tables[key] = entries
+                except (OSError, ValueError) as ex:
+                    logger.warning(
+                        "Ignoring compressed table {}: {}", path, ex)
+        return entries
+
+    def put(self, key: str, entries: numpy.ndarray):
+        """
+        Keep the entries of a compressed table.
+
+        :param str key: The hash from :py:meth:`key`
+        :param ~numpy.ndarray entries:
+            The entries made by
+            :py:func:`~.parallel_compression.table_to_entries`
+        """
+        self._tables[key] = entries
+        if self._directory is not None:
+            path = self.__path(key)
+            # Write to one side first so a failed run leaves no part file
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                numpy.save(f, entries, allow_pickle=False)
+            os.replace(temp_path, path)
+
+    def trim(self) -> None:
+        """
+        Delete the tables used least recently from the directory until
+        what is left fits in the size allowed.
+        """
+        if self._directory is None:
+            return
+        files = list()
+        for entry in os.scandir(self._directory):
+            if entry.is_file() and entry.name.endswith(_SUFFIX):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = 0
+        for _, size, path in sorted(files, reverse=True):
+            total += size
+            if total > self._max_bytes:
+                os.remove(path)
+
+
+def compress_with_cache(
+        tables: Sequence[AbstractMulticastRoutingTable],
+        compress: Callable[[AbstractMulticastRoutingTable],
+                           AbstractMulticastRoutingTable],
+        settings: Callable[[AbstractMulticastRoutingTable], str],
+        progress: ProgressBar) -> List[AbstractMulticastRoutingTable]:
+    """
+    Compress each of the tables, only compressing each different table
+    once, and not at all if it is in
+    ``[Mapping] compressor_cache_directory``; in parallel if
+    ``[Mapping] compressor_n_processes`` says so.
+
+    :param list(AbstractMulticastRoutingTable) tables: The tables to compress
+    :param callable compress:
+        Compresses a table, returning the table itself if it is not to be
+        compressed
+    :param callable settings:
+        Gets the compressor and the settings it would compress a table with
+    :param ~spinn_utilities.progress_bar.ProgressBar progress:
+        Updated as the tables are compressed, and ended
+    :return: The compressed tables in the same order
+    :rtype: list(AbstractMulticastRoutingTable)
+    """
+    directory = get_config_str_or_none(
+        "Mapping", "compressor_cache_directory")
+    max_mb = get_config_int("Mapping", "compressor_cache_max_mb") or 0
+    cache = CompressedTableCache(directory, max_mb * 1024 * 1024)
+
+    keys = [cache.key(table, settings(table)) for table in tables]
+    compressed: List[Optional[AbstractMulticastRoutingTable]] = list()
+    # The first index of each table to compress by its hash
+    to_compress: Dict[str, int] = dict()
+    for index, (table, key) in enumerate(zip(tables, keys)):
+        entries = cache.get(key)
+        if entries is not None:
+            compressed.append(entries_to_table(table.x, table.y, entries))
+        else:
+            compressed.append(None)
+            to_compress.setdefault(key, index)
+
+    firsts = list(to_compress.values())
+    new_tables = compress_in_parallel(
+        [tables[index] for index in firsts], compress, progress)
+    if new_tables is None:
+        new_tables = [compress(tables[index])
+                      for index in progress.over(firsts)]
+    for index, new_table in zip(firsts, new_tables):
+        compressed[index] = new_table
+        if new_table is not tables[index]:
+            cache.put(keys[index], table_to_entries(new_table))
+
+    # The other copies of each table, which are compressed again only if
+    # the first copy was not compressed
+    results: List[AbstractMulticastRoutingTable] = list()
+    for table, key, compressed_table in zip(tables, keys, compressed):
+        if compressed_table is None:
+            entries = cache.get(key)
+            if entries is None:
+                compressed_table = compress(table)
+            else:
+                compressed_table = entries_to_table(table.x, table.y, entries)
+        results.append(compressed_table)
+    cache.trim()
+    logger.info(
+        "Compressed {} of {} routing tables; the others were the same as "
+        "tables already compressed", len(firsts), len(tables))
+    return results
@@ -12,11 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from __future__ import annotations
+from bisect import bisect_left
 from typing import (
     Collection, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple,
     Union, cast)
 
 
+import numpy
+from numpy.typing import NDArray
 from typing_extensions import TypeAlias
 
 from spinn_utilities.config_holder import get_config_bool
@@ -24,7 +27,8 @@ from spinn_utilities.timer import Timer
 
 from pacman.exceptions import MinimisationFailedError
 from pacman.utilities.constants import FULL_MASK
-from pacman.model.routing_tables import UnCompressedMulticastRoutingTable
+from pacman.model.routing_tables import (
+    AbstractMulticastRoutingTable, UnCompressedMulticastRoutingTable)
 from pacman.operations.router_compressors import (AbstractCompressor, RTEntry)
 from pacman.model.routing_tables import MulticastRoutingTables
 from pacman.data.pacman_data_view import PacmanDataView
@@ -37,6 +41,11 @@ _KeyMask: TypeAlias = Tuple[int, int]
 _Aliases: TypeAlias = Dict[_KeyMask, FrozenSet[_KeyMask]]
 #: A read-only mapping from a key,mask pair to the things it aliases
 _ROAliases: TypeAlias = Mapping[_KeyMask, FrozenSet[_KeyMask]]
+#: The keys and masks of a routing table, as arrays
+_KeysMasks: TypeAlias = Tuple[NDArray[numpy.uint32], NDArray[numpy.uint32]]
+#: The fewest entries to check against at once in arrays; fewer are
+#: quicker to check one at a time
+_MIN_ARRAY = 32
 #: Sequence of all bit positions in a 32-bit word
 _all_bits = tuple(1 << i for i in range(32))
 # pylint: disable=wrong-spelling-in-comment
@@ -61,6 +70,33 @@ class _OrderedCoveringCompressor(AbstractCompressor):
     def __init__(self) -> None:
         super().__init__(True)
 
+    def _target_length(
+            self, router_table: AbstractMulticastRoutingTable
+            ) -> Optional[int]:
+        """
+        The number of entries to compress a table to, or `None` to
+        compress as much as possible.
+
+        :param AbstractMulticastRoutingTable router_table:
+        :rtype: int or None
+        """
+        if get_config_bool(
+                "Mapping", "router_table_compress_as_far_as_possible"):
+            return None
+        chip = PacmanDataView.get_chip_at(router_table.x, router_table.y)
+        return chip.router.n_available_multicast_entries
+
+    def _cache_settings(
+            self, table: AbstractMulticastRoutingTable) -> str:
+        """
+        The compressor with the number of entries to compress the table to.
+
+        :param AbstractMulticastRoutingTable table: The table to compress
+        :rtype: str
+        """
+        return (f"{self.__class__.__name__}("
+                f"target_length={self._target_length(table)})")
+
     def compress_table(
             self, router_table: UnCompressedMulticastRoutingTable
             ) -> List[RTEntry]:
@@ -79,13 +115,7 @@ class _OrderedCoveringCompressor(AbstractCompressor):
             If the smallest table that can be produced is larger than
             the space usually available in a hardware router table.
         """
-        if get_config_bool(
-                "Mapping", "router_table_compress_as_far_as_possible"):
-            # Compress as much as possible
-            target_length: Optional[int] = None
-        else:
-            chip = PacmanDataView.get_chip_at(router_table.x, router_table.y)
-            target_length = chip.router.n_available_multicast_entries
+        target_length = self._target_length(router_table)
         # Convert into a list of entries
         routing_table = list(map(
             RTEntry.from_multicast_routing_entry,
@@ -93,7 +123,9 @@ class _OrderedCoveringCompressor(AbstractCompressor):
         # Compress the router entries
         table, _ = ordered_covering(
             routing_table=routing_table, target_length=target_length,
-            aliases={}, no_raise=True, time_to_run_for=None)
+            aliases={}, no_raise=True, time_to_run_for=None,
+            incremental=get_config_bool(
+                "Mapping", "ordered_covering_incremental"))
         # Strip the defaultable routes
         return remove_default_routes(table, target_length)
 
@@ -101,7 +133,7 @@ class _OrderedCoveringCompressor(AbstractCompressor):
 def ordered_covering(
         routing_table: List[RTEntry], target_length: Optional[int],
         aliases: _Aliases, *, no_raise: bool = False,
-        time_to_run_for: Optional[float] = None
+        time_to_run_for: Optional[float] = None, incremental: bool = False
         ) -> Tuple[List[RTEntry], _Aliases]:
     """
     Reduce the size of a routing table by merging together entries where
@@ -145,6 +177,10 @@ def ordered_covering(
     :param float time_to_run_for:
         If supplied, a maximum number of seconds to run for before giving an
         error. May only be obeyed approximately.
+    :param bool incremental:
+        If True, keep the refined merge of each route from one step to the
+        next, only refining again those the last merge could have changed;
+        see :py:class:`_IncrementalMergeSearch`.  The table made is the same.
     :return: new routing table, A new _aliases dictionary.
     :rtype: tuple(list(RTEntry), dict(tuple(int,int), set(tuple(int,int))))
     :raises MinimisationFailedError:
@@ -160,10 +196,14 @@ def ordered_covering(
     # Perform an initial sort of the routing table in order of increasing
     # generality.
     routing_table = sorted(routing_table, key=_get_entry_generality)
+    search = _IncrementalMergeSearch(routing_table) if incremental else None
 
     while target_length is None or len(routing_table) > target_length:
         # Get the best merge
-        merge = _get_best_merge(routing_table, aliases)
+        if search is None:
+            merge = _get_best_merge(routing_table, aliases)
+        else:
+            merge = search.get_best_merge(routing_table, aliases)
 
         # If there is no merge then stop
         if merge.goodness <= 0:
@@ -172,6 +212,8 @@ def ordered_covering(
         # Otherwise apply the merge; this returns a new routing table and
         # updates the aliases dictionary.
         routing_table = merge.apply(aliases)
+        if search is not None:
+            search.applied(merge)
 
         # control for limiting the search
         if time_to_run_for is not None:
@@ -268,6 +310,148 @@ def _get_best_merge(
     return best_merge
 
 
+class _IncrementalMergeSearch(object):
+    """
+    Finds the same best merge as :py:func:`_get_best_merge`, keeping the
+    entries of each route and the refined merge of each route from one step
+    to the next.
+
+    The best merge is the first route, in order of its first entry in the
+    table, whose merge of all its entries refines (with a minimum goodness
+    of 0) to the best goodness; refining with a higher minimum goodness
+    only gives up earlier on merges that would not be better.
+
+    Refining a merge only depends on entries (and their aliases) that
+    intersect it, and every merge refining passes through is covered by
+    the merge of all the entries of the route.  Applying a merge removes
+    entries that are covered by the new entry and adds the new entry, so
+    the refined merge of a route can only change if the new entry
+    intersects the merge of all the entries of the route, or it is the
+    route merged.
+
+    The keys, masks and routes of the table are held in arrays which are
+    updated from the entries each merge removes and adds, so that the
+    up-check and the invalidation of refined merges can be done on the
+    arrays instead of on the table.
+    """
+
+    __slots__ = (
+        # Key, mask and index of the route of each entry in the table, with
+        # the routes indexed in order of their numbers
+        "_keys", "_masks", "_entry_routes",
+        # Number of entries and index of the first entry of each route
+        "_counts", "_firsts",
+        # Whether the refined merge of each route is known
+        "_known",
+        # Key and mask of the merge of all the entries of each route
+        "_full_keys", "_full_masks",
+        # Positions among the entries of each route of its refined merge
+        "_refined")
+
+    def __init__(self, routing_table: List[RTEntry]):
+        """
+        :param list(RTEntry) routing_table:
+            The table, already sorted by generality.
+        """
+        self._keys: NDArray[numpy.uint32] = numpy.array(
+            [entry.key for entry in routing_table], dtype=numpy.uint32)
+        self._masks: NDArray[numpy.uint32] = numpy.array(
+            [entry.mask for entry in routing_table], dtype=numpy.uint32)
+        _, firsts, entry_routes, counts = numpy.unique(
+            numpy.array([entry.spinnaker_route for entry in routing_table],
+                        dtype=numpy.uint32),
+            return_index=True, return_inverse=True, return_counts=True)
+        self._entry_routes: NDArray[numpy.intp] = entry_routes
+        self._counts: NDArray[numpy.intp] = counts
+        self._firsts: NDArray[numpy.intp] = firsts
+        n_routes = len(counts)
+        self._known = numpy.zeros(n_routes, dtype=bool)
+        self._full_keys = numpy.zeros(n_routes, dtype=numpy.uint32)
+        self._full_masks = numpy.zeros(n_routes, dtype=numpy.uint32)
+        self._refined: List[List[int]] = [[] for _ in range(n_routes)]
+
+    def get_best_merge(
+            self, routing_table: List[RTEntry], aliases: _ROAliases
+            ) -> '_Merge':
+        """
+        Get the merge which would combine the greatest number of entries.
+
+        :param list(RTEntry) routing_table: Routing entries to be merged.
+        :param aliases:
+        :type aliases: dict((int, int): set((int, int))
+        :rtype: _Merge
+        """
+        best_route = -1
+        best_goodness = 0
+        for route in numpy.argsort(self._firsts).tolist():
+            if self._counts[route] - 1 <= best_goodness:
+                continue
+            if not self._known[route]:
+                self._refine(route, routing_table, aliases)
+            if len(self._refined[route]) - 1 > best_goodness:
+                best_route = route
+                best_goodness = len(self._refined[route]) - 1
+
+        if best_route < 0:
+            return _Merge(routing_table)
+        indices = numpy.flatnonzero(self._entry_routes == best_route)
+        return _Merge(
+            routing_table, indices[self._refined[best_route]].tolist())
+
+    def _refine(self, route: int, routing_table: List[RTEntry],
+                aliases: _ROAliases):
+        """
+        Refine the merge of all the entries of a route.
+
+        :param int route: The index of the route
+        :param list(RTEntry) routing_table:
+        :param aliases:
+        :type aliases: dict((int, int): set((int, int))
+        """
+        indices = numpy.flatnonzero(self._entry_routes == route).tolist()
+        full = _Merge(routing_table, indices)
+        merge = _refine_merge(
+            full, aliases, min_goodness=0, arrays=(self._keys, self._masks))
+        self._refined[route] = [
+            n for n, i in enumerate(indices) if i in merge.entries]
+        self._full_keys[route] = full.key
+        self._full_masks[route] = full.mask
+        self._known[route] = True
+
+    def applied(self, merge: '_Merge'):
+        """
+        Update the table held from the entries removed and added by applying
+        a merge, and forget the refined merges it could have changed.
+
+        :param _Merge merge: The merge that has been applied
+        """
+        removed = sorted(merge.entries)
+        route = self._entry_routes[removed[0]]
+        # The new entry goes before the entry at the insertion index
+        # of the table the merge was made against
+        index = merge.insertion_index - bisect_left(
+            removed, merge.insertion_index)
+        self._keys = numpy.insert(
+            numpy.delete(self._keys, removed), index, merge.key)
+        self._masks = numpy.insert(
+            numpy.delete(self._masks, removed), index, merge.mask)
+        self._entry_routes = numpy.insert(
+            numpy.delete(self._entry_routes, removed), index, route)
+        self._counts[route] -= len(removed) - 1
+
+        # No other route loses its first entry, so they only move by the
+        # entries removed before them and the entry added
+        firsts = self._firsts
+        self._firsts = firsts + (firsts >= merge.insertion_index) - (
+            numpy.searchsorted(removed, firsts))
+        self._firsts[route] = numpy.argmax(self._entry_routes == route)
+
+        # Forget the refined merges of the routes merged and intersected
+        self._known &= (self._full_keys & numpy.uint32(merge.mask)) != (
+            self._full_masks & numpy.uint32(merge.key))
+        self._known[route] = False
+
+
 def _get_all_merges(routing_table: List[RTEntry]) -> Iterable['_Merge']:
     """
     Get possible sets of entries to merge.
@@ -450,7 +634,8 @@ class _Merge(object):
 
 
 def _refine_merge(
-        merge: _Merge, aliases: _ROAliases, min_goodness: int) -> _Merge:
+        merge: _Merge, aliases: _ROAliases, min_goodness: int,
+        arrays: Optional[_KeysMasks] = None) -> _Merge:
     """
     Remove entries from a merge to generate a valid merge which may be
     applied to the routing table.
@@ -466,6 +651,10 @@ def _refine_merge(
     :type aliases: dict(tuple(int, int), set(tuple(int, int))
     :param int min_goodness:
         Reject merges which are worse than the minimum goodness.
+    :param arrays:
+        The keys and masks of the routing table, if held in arrays;
+        see :py:func:`_refine_upcheck`.
+    :type arrays: tuple(~numpy.ndarray, ~numpy.ndarray) or None
     :return: Valid merge which may be applied to the routing table
     :rtype: _Merge
     """
@@ -475,7 +664,7 @@ def _refine_merge(
     # If the merge is still sufficiently good then continue to refine it.
     if merge.goodness > min_goodness:
         # Perform the up-check
-        merge, changed = _refine_upcheck(merge, min_goodness)
+        merge, changed = _refine_upcheck(merge, min_goodness, arrays)
 
         if changed and merge.goodness > min_goodness:
             # If the up-check removed any entries we need to re-perform the
@@ -487,7 +676,9 @@ def _refine_merge(
     return merge
 
 
-def _refine_upcheck(merge: _Merge, min_goodness: int) -> Tuple[_Merge, bool]:
+def _refine_upcheck(
+        merge: _Merge, min_goodness: int,
+        arrays: Optional[_KeysMasks] = None) -> Tuple[_Merge, bool]:
     """
     Remove from the merge any entries which would be covered by entries
     between their current position and the merge insertion position.
@@ -505,6 +696,10 @@ def _refine_upcheck(merge: _Merge, min_goodness: int) -> Tuple[_Merge, bool]:
 
     :param _Merge merge:
     :param int min_goodness:
+    :param arrays:
+        The keys and masks of the routing table, if held in arrays, in which
+        case many entries between are checked all at once.
+    :type arrays: tuple(~numpy.ndarray, ~numpy.ndarray) or None
     :return:
         New merge with entries possibly removed. If the goodness of the merge
         ever drops below `min_goodness` then an empty merge will be returned.
@@ -520,8 +715,16 @@ def _refine_upcheck(merge: _Merge, min_goodness: int) -> Tuple[_Merge, bool]:
         # covered up by any of them then we remove it from the merge.
         entry = merge.routing_table[i]
         key, mask = entry.key, entry.mask
-        if any(intersect(key, mask, other.key, other.mask) for other in
-               merge.routing_table[i+1:merge.insertion_index]):
+        if arrays is not None and merge.insertion_index - i > _MIN_ARRAY:
+            keys, masks = arrays
+            covered = bool(numpy.any(
+                (keys[i+1:merge.insertion_index] & numpy.uint32(mask)) ==
+                (masks[i+1:merge.insertion_index] & numpy.uint32(key))))
+        else:
+            covered = any(
+                intersect(key, mask, other.key, other.mask) for other in
+                merge.routing_table[i+1:merge.insertion_index])
+        if covered:
             # The entry would be partially or wholly covered by another entry,
             # remove it from the merge and return a new merge.
             merge = _Merge(merge.routing_table, merge.entries - {i})
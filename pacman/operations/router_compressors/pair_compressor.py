@@ -16,16 +16,18 @@ import functools
 from typing import List, Tuple, cast
 from spinn_machine import MulticastRoutingEntry
 from pacman.data import PacmanDataView
-from pacman.exceptions import PacmanElementAllocationException
+from pacman.exceptions import (
+    PacmanConfigurationException, PacmanElementAllocationException)
 from pacman.model.routing_tables import (
     MulticastRoutingTables, AbstractMulticastRoutingTable)
 from .abstract_compressor import AbstractCompressor
 from .rt_entry import RTEntry
+from .vectorised_pair_compressor import VectorisedPairCompressor
 
 
 def pair_compressor(
         ordered: bool = True, accept_overflow: bool = False,
-        verify: bool = False, c_sort=False):
+        verify: bool = False, c_sort=False, vectorised: bool = False):
     """
     :param bool accept_overflow:
         A flag which should only be used in testing to stop raising an
@@ -33,9 +35,21 @@ def pair_compressor(
     :param bool verify: If set to true will verify the length before returning
     :param bool c_sort: If set will use the slower quick sort as it is
         implemented in c/ on cores
+    :param bool vectorised:
+        If set will use the faster numpy version, which makes the same
+        tables but does not mirror the c/ code; not with `c_sort`
     :rtype: MulticastRoutingTables
+    :raises PacmanConfigurationException:
+        If both `c_sort` and `vectorised` are set
     """
-    compressor = _PairCompressor(ordered, accept_overflow, c_sort)
+    compressor: AbstractCompressor
+    if vectorised:
+        if c_sort:
+            raise PacmanConfigurationException(
+                "The c_sort is only done by the non-vectorised compressor")
+        compressor = VectorisedPairCompressor(ordered, accept_overflow)
+    else:
+        compressor = _PairCompressor(ordered, accept_overflow, c_sort)
     compressed = compressor.compress_all_tables()
     # TODO currently normal pair compressor does not verify lengths
     if verify:
@@ -181,6 +195,17 @@ class _PairCompressor(AbstractCompressor):
         self._routes_frequency: List[int] = []
         self._routes_count = 0
 
+    def _cache_settings(self, table: AbstractMulticastRoutingTable) -> str:
+        """
+        The compressor with whether it is ordered and uses the C sort.
+
+        :param AbstractMulticastRoutingTable table: The table to compress
+        :rtype: str
+        """
+        # pylint: disable=unused-argument
+        return (f"{self.__class__.__name__}(ordered={self._ordered}, "
+                f"c_sort={self._c_sort})")
+
     def _compare_entries(
             self, route_a_entry: RTEntry, route_b_entry: RTEntry) -> int:
         """
@@ -0,0 +1,144 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy
+
+from spinn_utilities.config_holder import get_config_int
+from spinn_utilities.progress_bar import ProgressBar
+from spinn_machine import MulticastRoutingEntry
+
+from pacman.model.routing_tables import (
+    AbstractMulticastRoutingTable, CompressedMulticastRoutingTable)
+from pacman.utilities.utility_calls import (
+    get_fork_context, map_in_fork, split_into_shards)
+
+#: Number of shards of tables to give each process, so that the work is
+#: spread when tables differ in how long they take to compress
+_SHARDS_PER_PROCESS = 4
+
+#: The form the entries of a compressed table are sent back from the
+#: processes in, and kept in
+ENTRY_DTYPE = numpy.dtype([
+    ("key", numpy.uint32), ("mask", numpy.uint32),
+    ("route", numpy.uint32), ("defaultable", numpy.bool_)])
+
+
+def compress_in_parallel(
+        tables: Sequence[AbstractMulticastRoutingTable],
+        compress: Callable[[AbstractMulticastRoutingTable],
+                           AbstractMulticastRoutingTable],
+        progress: ProgressBar) -> Optional[
+            List[AbstractMulticastRoutingTable]]:
+    """
+    Compress each of the tables in forked processes, if
+    ``[Mapping] compressor_n_processes`` is more than 1 and processes can be
+    forked here.
+
+    The processes send back the entries of each compressed table as arrays
+    of keys, masks, routes and defaultable flags, from which the tables are
+    made again, so the compression must not depend on anything the calling
+    process changes while it runs.
+
+    :param list(AbstractMulticastRoutingTable) tables: The tables to compress
+    :param callable compress:
+        Compresses a table, returning the table itself if it is not to be
+        compressed
+    :param ~spinn_utilities.progress_bar.ProgressBar progress:
+        Updated as the tables are compressed, and ended
+    :return: The compressed tables in the same order, or `None` if not
+        compressed in parallel
+    :rtype: list(AbstractMulticastRoutingTable) or None
+    """
+    n_processes = get_config_int("Mapping", "compressor_n_processes") or 1
+    if n_processes < 2 or len(tables) < 2:
+        return None
+    if get_fork_context() is None:
+        return None
+
+    shards = split_into_shards(
+        len(tables), n_processes * _SHARDS_PER_PROCESS)
+    compressed: List[AbstractMulticastRoutingTable] = list()
+    try:
+        for shard, shard_entries in zip(shards, map_in_fork(
+                (tables, compress), _compress_shard, shards, n_processes)):
+            for index, entries in zip(shard, shard_entries):
+                table = tables[index]
+                if entries is None:
+                    compressed.append(table)
+                else:
+                    compressed.append(
+                        entries_to_table(table.x, table.y, entries))
+            progress.update(len(shard))
+    finally:
+        progress.end()
+    return compressed
+
+
+def _compress_shard(
+        state: Tuple[Sequence[AbstractMulticastRoutingTable], Callable[
+            [AbstractMulticastRoutingTable], AbstractMulticastRoutingTable]],
+        shard: range) -> List[Optional[numpy.ndarray]]:
+    """
+    Compress a shard of the tables in a worker process.
+
+    :param tuple state: The tables and how to compress each
+    :param range shard: The indices of the tables to compress
+    :return: The entries of each compressed table, or `None` for a table
+        that was not compressed
+    """
+    tables, compress = state
+    shard_entries: List[Optional[numpy.ndarray]] = list()
+    for index in shard:
+        table = tables[index]
+        new_table = compress(table)
+        if new_table is table:
+            shard_entries.append(None)
+            continue
+        shard_entries.append(table_to_entries(new_table))
+    return shard_entries
+
+
+def table_to_entries(table: AbstractMulticastRoutingTable) -> numpy.ndarray:
+    """
+    Get the entries of a table as an array with fields ``key``, ``mask``,
+    ``route`` and ``defaultable``, in the order of the table.
+
+    :param AbstractMulticastRoutingTable table:
+    :rtype: ~numpy.ndarray
+    """
+    return numpy.array(
+        [(entry.routing_entry_key, entry.mask, entry.spinnaker_route,
+          entry.defaultable)
+         for entry in table.multicast_routing_entries],
+        dtype=ENTRY_DTYPE)
+
+
+def entries_to_table(x: int, y: int, entries: numpy.ndarray
+                     ) -> CompressedMulticastRoutingTable:
+    """
+    Make a compressed table from an array made by
+    :py:func:`table_to_entries`.
+
+    :param int x: The x coordinate of the chip of the table
+    :param int y: The y coordinate of the chip of the table
+    :param ~numpy.ndarray entries:
+    :rtype: CompressedMulticastRoutingTable
+    """
+    table = CompressedMulticastRoutingTable(x, y)
+    for key, mask, route, defaultable in entries.tolist():
+        table.add_multicast_routing_entry(MulticastRoutingEntry(
+            key, mask, defaultable=defaultable, spinnaker_route=route))
+    return table
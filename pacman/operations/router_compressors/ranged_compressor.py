@@ -14,7 +14,7 @@
 
 import logging
 import sys
-from typing import cast
+from typing import Optional, cast
 from spinn_utilities.config_holder import get_config_bool
 from spinn_utilities.log import FormatAdapter
 from spinn_utilities.progress_bar import ProgressBar
@@ -24,6 +24,7 @@ from pacman.model.routing_tables import (
     CompressedMulticastRoutingTable, MulticastRoutingTables,
     AbstractMulticastRoutingTable, UnCompressedMulticastRoutingTable)
 from pacman.exceptions import MinimisationFailedError
+from .compressed_table_cache import compress_with_cache
 
 logger = FormatAdapter(logging.getLogger(__name__))
 
@@ -44,9 +45,12 @@ def range_compressor(accept_overflow: bool = True) -> MulticastRoutingTables:
     progress = ProgressBar(len(router_tables.routing_tables), message)
     compressor = RangeCompressor()
     compressed_tables = MulticastRoutingTables()
-    for table in progress.over(router_tables.routing_tables):
-        new_table = compressor.compress_table(cast(
-            UnCompressedMulticastRoutingTable, table))
+    tables = list(router_tables.routing_tables)
+    new_tables = compress_with_cache(
+        tables, lambda table: compressor.compress_table(
+            cast(UnCompressedMulticastRoutingTable, table)),
+        compressor.cache_settings, progress)
+    for table, new_table in zip(tables, new_tables):
         chip = PacmanDataView.get_chip_at(table.x, table.y)
         target = chip.router.n_available_multicast_entries
         if new_table.number_of_entries > target and not accept_overflow:
@@ -72,6 +76,34 @@ class RangeCompressor(object):
         # List of entries to be merged
         "_entries")
 
+    def _target_length(
+            self, router_table: AbstractMulticastRoutingTable
+            ) -> Optional[int]:
+        """
+        The number of entries below which a table is not compressed, or
+        `None` to compress every table as much as possible.
+
+        :param AbstractMulticastRoutingTable router_table:
+        :rtype: int or None
+        """
+        if get_config_bool(
+                "Mapping", "router_table_compress_as_far_as_possible"):
+            return None
+        chip = PacmanDataView.get_chip_at(router_table.x, router_table.y)
+        return chip.router.n_available_multicast_entries
+
+    def cache_settings(self, table: AbstractMulticastRoutingTable) -> str:
+        """
+        The compressor with the number of entries below which the table
+        would not be compressed, so that a compressed table is only used
+        again if they are the same.
+
+        :param AbstractMulticastRoutingTable table: The table to compress
+        :rtype: str
+        """
+        return (f"{self.__class__.__name__}("
+                f"target_length={self._target_length(table)})")
+
     def compress_table(
             self, uncompressed: UnCompressedMulticastRoutingTable
             ) -> AbstractMulticastRoutingTable:
@@ -87,12 +119,9 @@ class RangeCompressor(object):
         :rtype: AbstractMulticastRoutingTable
         """
         # Check you need to compress
-        if not get_config_bool(
-                "Mapping", "router_table_compress_as_far_as_possible"):
-            chip = PacmanDataView.get_chip_at(uncompressed.x, uncompressed.y)
-            target = chip.router.n_available_multicast_entries
-            if uncompressed.number_of_entries < target:
-                return uncompressed
+        target = self._target_length(uncompressed)
+        if target is not None and uncompressed.number_of_entries < target:
+            return uncompressed
 
         # Step 1 get the entries and make sure they are sorted by key
         self._entries = list(uncompressed.multicast_routing_entries)
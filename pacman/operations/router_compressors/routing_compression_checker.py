@@ -13,7 +13,10 @@
 # limitations under the License.
 
 import logging
-from typing import Dict, List, Optional, TextIO
+from typing import Dict, List, Optional, TextIO, Tuple
+
+import numpy
+
 from spinn_utilities.log import FormatAdapter
 from spinn_machine import MulticastRoutingEntry
 from pacman.exceptions import PacmanRoutingException
@@ -25,19 +28,14 @@ WILDCARD = "*"
 LINE_FORMAT = "0x{:08X} 0x{:08X} 0x{:08X} {: <7s} {}\n"
 
 
-def codify(route: MulticastRoutingEntry, length: int = 32) -> str:
+def _key_mask(route: MulticastRoutingEntry) -> Tuple[int, int]:
     """
-    This method discovers all the routing keys covered by this route.
-
-    Starts of with the assumption that the key is always covered.
-
-    Whenever a mask bit is zero the list of covered keys is doubled to
-    include both the key with a zero and a one at that place.
+    Get the key and mask of a route, with the key bits the mask does not
+    cover cleared, logging an error if there are any.
 
     :param ~spinn_machine.MulticastRoutingEntry route: single routing entry
-    :param int length: length in bits of the key and mask (defaults to 32)
-    :return: set of routing_keys covered by this route
-    :rtype: str
+    :return: key, mask
+    :rtype: tuple(int, int)
     """
     mask = route.mask
     key = route.routing_entry_key
@@ -49,7 +47,24 @@ def codify(route: MulticastRoutingEntry, length: int = 32) -> str:
             # Magic to find first set bit: See
             # https://stackoverflow.com/a/36059264/301832
             (bad & -bad).bit_length(), bin(mask), bin(key))
+    return key & mask, mask
+
 
+def codify(route: MulticastRoutingEntry, length: int = 32) -> str:
+    """
+    This method discovers all the routing keys covered by this route.
+
+    Starts of with the assumption that the key is always covered.
+
+    Whenever a mask bit is zero the list of covered keys is doubled to
+    include both the key with a zero and a one at that place.
+
+    :param ~spinn_machine.MulticastRoutingEntry route: single routing entry
+    :param int length: length in bits of the key and mask (defaults to 32)
+    :return: set of routing_keys covered by this route
+    :rtype: str
+    """
+    key, mask = _key_mask(route)
     # Check each bit in the mask; use bit from key if so, else WILDCARD
     return "".join(
         str(int(key & bit != 0) if (mask & bit) else WILDCARD)
@@ -72,40 +87,98 @@ def codify_table(
         for route in table.multicast_routing_entries}
 
 
-def covers(o_code: str, c_code: str) -> bool:
-    """
-    :param str o_code:
-    :param str c_code:
-    :rtype: bool
-    """
-    if o_code == c_code:
-        return True
-    for o_char, c_char in zip(o_code, c_code):
-        if o_char == "1" and c_char == "0":
-            return False
-        if o_char == "0" and c_char == "1":
-            return False
-        # o_char = c_char or either wildcard is some cover
-    return True
-
-
-def calc_remainders(o_code: str, c_code: str) -> List[str]:
-    """
-    :param str o_code: Codified original route
-    :param str c_code: Codified compressed route
-    :rtype: list(str)
-    """
-    if o_code == c_code:
-        # "" = "" so also the terminator case
-        return []
-    remainders = []
-    for tail in calc_remainders(o_code[1:], c_code[1:]):
-        remainders.append(o_code[0] + tail)
-    if o_code[0] == WILDCARD:
-        if c_code[0] == "0":
-            remainders.append("1" + o_code[1:])
-        if c_code[0] == "1":
-            remainders.append("0" + o_code[1:])
+def _decode(code: str) -> Tuple[int, int]:
+    """
+    Get the key and mask of a route codified by :py:func:`codify`.
+
+    :param str code:
+    :return: key, mask
+    :rtype: tuple(int, int)
+    """
+    key = int(code.replace(WILDCARD, "0"), 2)
+    mask = int("".join("0" if char == WILDCARD else "1" for char in code), 2)
+    return key, mask
+
+
+class _CompressedRoutes(object):
+    """
+    The entries of a compressed table in order, with their keys and masks
+    held in arrays so that an original route can be checked against all of
+    them at once.
+    """
+
+    __slots__ = (
+        # The keys of the entries, with bits the masks do not cover cleared
+        "keys",
+        # The masks of the entries
+        "masks",
+        # The entries themselves
+        "routes")
+
+    def __init__(
+            self, key_masks: Dict[Tuple[int, int], MulticastRoutingEntry]):
+        """
+        :param dict(tuple(int, int), ~spinn_machine.MulticastRoutingEntry) \
+                key_masks:
+            The entries by their key and mask, in order
+        """
+        self.keys = numpy.array(
+            [key for key, _ in key_masks], dtype=numpy.uint32)
+        self.masks = numpy.array(
+            [mask for _, mask in key_masks], dtype=numpy.uint32)
+        self.routes = list(key_masks.values())
+
+    @classmethod
+    def from_table(cls, table: AbstractMulticastRoutingTable
+                   ) -> "_CompressedRoutes":
+        """
+        :param AbstractMulticastRoutingTable table:
+        :rtype: _CompressedRoutes
+        """
+        # A dict so that an entry with the same key and mask as an earlier
+        # one is dropped, as with codify_table
+        return cls({
+            _key_mask(route): route
+            for route in table.multicast_routing_entries})
+
+    def first_cover(self, key: int, mask: int, start: int) -> int:
+        """
+        Find the first entry from the start that matches any key matched
+        by the key and mask.
+
+        :param int key: The key, with bits the mask does not cover cleared
+        :param int mask:
+        :param int start: The index of the first entry to check
+        :return: The index of the entry, or -1 if none
+        :rtype: int
+        """
+        found = numpy.flatnonzero(
+            ((self.keys[start:] ^ key) & self.masks[start:] & mask) == 0)
+        if len(found):
+            return start + int(found[0])
+        return -1
+
+
+def _remainders(o_key: int, o_mask: int, c_key: int, c_mask: int
+                ) -> List[Tuple[int, int]]:
+    """
+    Get the parts of an original route that a compressed route covering
+    it may not match: for each bit the compressed mask covers and the
+    original does not, from the lowest, the original with that bit set to
+    the other value to the compressed key.
+
+    :param int o_key: Key of the original route
+    :param int o_mask: Mask of the original route
+    :param int c_key: Key of the compressed route
+    :param int c_mask: Mask of the compressed route
+    :rtype: list(tuple(int, int))
+    """
+    remainders = list()
+    extra = c_mask & ~o_mask
+    while extra:
+        bit = extra & -extra
+        remainders.append((o_key | (bit & ~c_key), o_mask | bit))
+        extra ^= bit
     return remainders
 
 
@@ -123,38 +196,53 @@ def compare_route(
     :param ~io.FileIO f: Where to write (part of) the route report
     """
     if o_code is None:
-        o_code = codify(o_route)
-    keys = list(compressed_dict.keys())
-    for i in range(start, len(keys)):
-        c_code = keys[i]
-        if covers(o_code, c_code):
-            c_route = compressed_dict[c_code]
-            if f is not None:
-                f.write(f"\t\t{format_route(c_route)}\n")
-            if o_route.processor_ids != c_route.processor_ids:
-                raise PacmanRoutingException(
-                    f"Compressed route {c_route} covers original route "
-                    f"{o_route} but has a different processor_ids.")
-            if o_route.link_ids != c_route.link_ids:
-                raise PacmanRoutingException(
-                    f"Compressed route {c_route} covers original route "
-                    f"{o_route} but has a different link_ids.")
-            if not o_route.defaultable and c_route.defaultable:
-                if o_route == c_route:
-                    raise PacmanRoutingException(
-                        f"Compressed route {c_route} while original route "
-                        f"{o_route} but has a different defaultable value.")
-                compare_route(o_route, compressed_dict, o_code=o_code,
-                              start=i + 1, f=f)
-            else:
-                remainders = calc_remainders(o_code, c_code)
-                for remainder in remainders:
-                    compare_route(o_route, compressed_dict, o_code=remainder,
-                                  start=i + 1, f=f)
-            return
-    if not o_route.defaultable:
-        # print(f"No route found {o_route}")
-        raise PacmanRoutingException(f"No route found {o_route}")
+        o_key, o_mask = _key_mask(o_route)
+    else:
+        o_key, o_mask = _decode(o_code)
+    compressed = _CompressedRoutes({
+        _decode(c_code): c_route
+        for c_code, c_route in compressed_dict.items()})
+    _compare_route(o_route, compressed, o_key, o_mask, start, f)
+
+
+def _compare_route(
+        o_route: MulticastRoutingEntry, compressed: _CompressedRoutes,
+        o_key: int, o_mask: int, start: int, f: Optional[TextIO]):
+    """
+    :param ~spinn_machine.MulticastRoutingEntry o_route: the original route
+    :param _CompressedRoutes compressed: Compressed routes
+    :param int o_key: Key of the (part of the) original route to check
+    :param int o_mask: Mask of the (part of the) original route to check
+    :param int start: Starting index in compressed routes
+    :param ~io.FileIO f: Where to write (part of) the route report
+    """
+    i = compressed.first_cover(o_key, o_mask, start)
+    if i < 0:
+        if not o_route.defaultable:
+            raise PacmanRoutingException(f"No route found {o_route}")
+        return
+    c_route = compressed.routes[i]
+    if f is not None:
+        f.write(f"\t\t{format_route(c_route)}\n")
+    if o_route.processor_ids != c_route.processor_ids:
+        raise PacmanRoutingException(
+            f"Compressed route {c_route} covers original route "
+            f"{o_route} but has a different processor_ids.")
+    if o_route.link_ids != c_route.link_ids:
+        raise PacmanRoutingException(
+            f"Compressed route {c_route} covers original route "
+            f"{o_route} but has a different link_ids.")
+    if not o_route.defaultable and c_route.defaultable:
+        if o_route == c_route:
+            raise PacmanRoutingException(
+                f"Compressed route {c_route} while original route "
+                f"{o_route} but has a different defaultable value.")
+        _compare_route(o_route, compressed, o_key, o_mask, i + 1, f)
+    else:
+        c_key = int(compressed.keys[i])
+        c_mask = int(compressed.masks[i])
+        for r_key, r_mask in _remainders(o_key, o_mask, c_key, c_mask):
+            _compare_route(o_route, compressed, r_key, r_mask, i + 1, f)
 
 
 def compare_tables(
@@ -170,6 +258,7 @@ def compare_tables(
         Which will be considered in order.
     :raises: PacmanRoutingException if there is any error
     """
-    compressed_dict = codify_table(compressed)
+    compressed_routes = _CompressedRoutes.from_table(compressed)
     for o_route in original.multicast_routing_entries:
-        compare_route(o_route, compressed_dict)
+        o_key, o_mask = _key_mask(o_route)
+        _compare_route(o_route, compressed_routes, o_key, o_mask, 0, None)
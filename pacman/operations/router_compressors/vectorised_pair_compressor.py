@@ -0,0 +1,190 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List, Tuple
+
+import numpy
+from numpy.typing import NDArray
+
+from pacman.model.routing_tables import AbstractMulticastRoutingTable
+from .abstract_compressor import AbstractCompressor
+from .rt_entry import RTEntry
+
+#: The most (merge, clashing entry) pairs to check at once
+_MAX_CHECKS = 1 << 20
+
+#: The number of merges to check first, doubling each time none is found,
+#: so that when an early merge works the rest are not checked
+_FIRST_CHECKS = 8
+
+
+class VectorisedPairCompressor(AbstractCompressor):
+    """
+    The same algorithm as the pair compressor, making the same table, but
+    done on the host with numpy instead of mirroring the C code.
+
+    The keys, masks, defaultable flags and routes of the entries are held
+    in numpy arrays, sorted by route frequency with the same tie breaks as
+    the pair compressor's Python sort.  When looking for an entry to merge
+    with, the merges with all the other entries of the bucket are made at
+    once and each is checked against all the entries it could clash with
+    at once, taking the first merge in bucket order that does not clash.
+    """
+
+    __slots__ = ()
+
+    def compress_table(
+            self, router_table: AbstractMulticastRoutingTable
+            ) -> List[RTEntry]:
+        """
+        Compresses all the entries for a single table.
+
+        :param UnCompressedMulticastRoutingTable router_table:
+            Original Routing table for a single chip
+        :return: Compressed routing table for the same chip
+        :rtype: list(RTEntry)
+        """
+        entries = [RTEntry.from_multicast_routing_entry(entry)
+                   for entry in router_table.multicast_routing_entries]
+        if not entries:
+            return []
+        order = self._route_frequency_order(numpy.array(
+            [entry.spinnaker_route for entry in entries], dtype=numpy.uint32))
+        keys = numpy.array([entries[i].key for i in order], dtype=numpy.uint32)
+        masks = numpy.array(
+            [entries[i].mask for i in order], dtype=numpy.uint32)
+        defaultables = numpy.array(
+            [entries[i].defaultable for i in order], dtype=bool)
+        routes = [entries[i].spinnaker_route for i in order]
+
+        write_index = 0
+        previous_index = 0
+        left = 0
+        while left < len(routes):
+            right = left
+            while (right < len(routes) - 1 and
+                   routes[right + 1] == routes[left]):
+                right += 1
+            remaining_index = right + 1
+            if self._ordered:
+                clash_keys = keys[remaining_index:]
+                clash_masks = masks[remaining_index:]
+            else:
+                clash_keys = numpy.concatenate(
+                    (keys[:previous_index], keys[remaining_index:]))
+                clash_masks = numpy.concatenate(
+                    (masks[:previous_index], masks[remaining_index:]))
+
+            while left < right:
+                index, m_key, m_mask = self._find_merge(
+                    keys, masks, left, right, clash_keys, clash_masks)
+                if index >= 0:
+                    keys[left] = m_key
+                    masks[left] = m_mask
+                    defaultables[left] &= defaultables[index]
+                    keys[index] = keys[right]
+                    masks[index] = masks[right]
+                    defaultables[index] = defaultables[right]
+                    right -= 1
+                else:
+                    keys[write_index] = keys[left]
+                    masks[write_index] = masks[left]
+                    defaultables[write_index] = defaultables[left]
+                    routes[write_index] = routes[left]
+                    write_index += 1
+                    left += 1
+            if left == right:
+                keys[write_index] = keys[left]
+                masks[write_index] = masks[left]
+                defaultables[write_index] = defaultables[left]
+                routes[write_index] = routes[left]
+                write_index += 1
+            left = remaining_index
+            previous_index = write_index
+
+        return [RTEntry(key, mask, defaultable, route)
+                for key, mask, defaultable, route in zip(
+                    keys[:write_index].tolist(), masks[:write_index].tolist(),
+                    defaultables[:write_index].tolist(),
+                    routes[:write_index])]
+
+    @staticmethod
+    def _route_frequency_order(routes: NDArray[numpy.uint32]) -> List[int]:
+        """
+        Get the order to put the entries in: by the frequency of their
+        route from low to high, with routes of the same frequency in
+        reverse order of their first entry, and the entries of each route
+        in their original order.
+
+        :param ~numpy.ndarray routes: The route of each entry
+        :return: The indices of the entries in order
+        :rtype: list(int)
+        """
+        _, first, inverse, counts = numpy.unique(
+            routes, return_index=True, return_inverse=True,
+            return_counts=True)
+        by_appearance = numpy.argsort(first, kind="stable")
+        by_frequency = by_appearance[
+            numpy.argsort(-counts[by_appearance], kind="stable")]
+        rank = numpy.empty(len(by_frequency), dtype=numpy.int64)
+        rank[by_frequency] = numpy.arange(len(by_frequency))
+        return numpy.argsort(
+            -rank[inverse.reshape(-1)], kind="stable").tolist()
+
+    @staticmethod
+    def _find_merge(
+            keys: NDArray[numpy.uint32], masks: NDArray[numpy.uint32],
+            left: int, right: int, clash_keys: NDArray[numpy.uint32],
+            clash_masks: NDArray[numpy.uint32]) -> Tuple[int, int, int]:
+        """
+        Find the first entry after the left one, up to the right one, that
+        the left one can be merged with without the merge intersecting any
+        of the entries it could clash with.
+
+        :param ~numpy.ndarray keys: The keys of all the entries
+        :param ~numpy.ndarray masks: The masks of all the entries
+        :param int left: Index of entry to merge
+        :param int right: Inclusive index of last entry to merge with
+        :param ~numpy.ndarray clash_keys:
+            The keys of the entries with other routes to check against
+        :param ~numpy.ndarray clash_masks: The masks of those entries
+        :return: The index of the entry to merge with, or -1 if none, and
+            the key and mask of the merge
+        :rtype: tuple(int, int, int)
+        """
+        key = keys[left]
+        mask = masks[left]
+        all_ones = keys[left + 1:right + 1] & key
+        any_ones = keys[left + 1:right + 1] | key
+        m_masks = masks[left + 1:right + 1] & mask & ~(any_ones ^ all_ones)
+        m_keys = all_ones & m_masks
+
+        n_rows = max(_MAX_CHECKS // max(len(clash_keys), 1), 1)
+        start = 0
+        step = _FIRST_CHECKS
+        while start < len(m_keys):
+            end = start + min(step, n_rows)
+            rows_keys = m_keys[start:end, numpy.newaxis]
+            rows_masks = m_masks[start:end, numpy.newaxis]
+            clashes = numpy.any(
+                (clash_keys & rows_masks) == (rows_keys & clash_masks),
+                axis=1)
+            free = numpy.flatnonzero(~clashes)
+            if len(free):
+                found = start + int(free[0])
+                return (left + 1 + found, int(m_keys[found]),
+                        int(m_masks[found]))
+            start = end
+            step *= 2
+        return -1, 0, 0
@@ -0,0 +1,279 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A dense, integer-indexed view of the chips and links of a machine.
+
+Graph searches over the machine (for example those done by the routers) are
+dominated by calls such as ``machine.is_link_at``, ``machine.xy_over_link``
+and ``machine.is_chip_at``.  This module builds the answers to all of those
+once, so that the searches can work on plain integer chip identifiers.
+"""
+
+from __future__ import annotations
+import hashlib
+from typing import (
+    Dict, Hashable, Iterable, List, Optional, Sequence, Tuple)
+
+import numpy
+from numpy.typing import NDArray
+
+from spinn_utilities.typing.coords import XY
+from spinn_machine import Machine
+from .path_cache import PathCache
+
+#: The number of links out of each chip
+N_LINKS = 6
+
+#: The value used in the neighbour table for a link that can't be used
+NO_CHIP = -1
+
+
+class MachineTopology(object):
+    """
+    The chips of a machine numbered densely from 0, and a table of which
+    chip (if any) can be reached over each link of each chip.
+
+    A link is considered usable only if it exists in the machine and the
+    chip at the far end also exists.
+    """
+
+    __slots__ = (
+        # The machine this topology was built from
+        "_machine",
+        # Chip id -> (x, y)
+        "_xys",
+        # (x, y) -> chip id
+        "_ids",
+        # numpy array of shape (n_chips, 6) of chip id over each link, or -1
+        "_neighbours",
+        # The same as _neighbours but as Python lists for fast scalar access
+        "_adjacency",
+        # Cache of repaired paths between chips of this topology
+        "_path_cache",
+        # The options the paths in the cache were made with
+        "_path_options",
+        # Hash of the chips and links, made when first needed
+        "_signature")
+
+    def __init__(self, machine: Machine,
+                 neighbours: Optional[NDArray[numpy.int32]] = None):
+        """
+        :param ~spinn_machine.Machine machine:
+            The machine to build the topology of
+        :param ~numpy.ndarray neighbours:
+            The chip id over each link of each chip, if not to be worked out
+            from the machine; used to make copies with chips or links
+            removed
+        """
+        self._machine = machine
+        self._xys: List[XY] = sorted(machine.chip_coordinates)
+        self._ids: Dict[XY, int] = {
+            xy: chip_id for chip_id, xy in enumerate(self._xys)}
+        if neighbours is None:
+            neighbours = numpy.full(
+                (len(self._xys), N_LINKS), NO_CHIP, dtype=numpy.int32)
+            for chip_id, (x, y) in enumerate(self._xys):
+                for link in range(N_LINKS):
+                    if machine.is_link_at(x, y, link):
+                        neighbours[chip_id, link] = self._ids.get(
+                            machine.xy_over_link(x, y, link), NO_CHIP)
+        self._neighbours = neighbours
+        self._adjacency: List[List[int]] = neighbours.tolist()
+        self._path_cache: Optional[PathCache] = None
+        self._path_options: Hashable = None
+        self._signature: Optional[str] = None
+
+    def without(
+            self, failed_chips: Iterable[XY] = (),
+            failed_links: Iterable[Tuple[int, int, int]] = ()) -> \
+            MachineTopology:
+        """
+        Make a copy of this topology in which some chips and links can't
+        be used.  The chips keep their ids, but no usable link goes to or
+        from a failed chip.  A failed link can't be used in either
+        direction.
+
+        :param iterable(tuple(int, int)) failed_chips:
+            The coordinates of the chips that have failed
+        :param iterable(tuple(int, int, int)) failed_links:
+            The (x, y, link) of the links that have failed
+        :rtype: MachineTopology
+        """
+        neighbours = self._neighbours.copy()
+        for xy in failed_chips:
+            chip_id = self._ids.get(xy, NO_CHIP)
+            if chip_id != NO_CHIP:
+                neighbours[chip_id, :] = NO_CHIP
+                neighbours[neighbours == chip_id] = NO_CHIP
+        for x, y, link in failed_links:
+            chip_id = self._ids.get((x, y), NO_CHIP)
+            if chip_id == NO_CHIP:
+                continue
+            other_id = int(neighbours[chip_id, link])
+            neighbours[chip_id, link] = NO_CHIP
+            back_link = (link + N_LINKS // 2) % N_LINKS
+            if (other_id != NO_CHIP and
+                    neighbours[other_id, back_link] == chip_id):
+                neighbours[other_id, back_link] = NO_CHIP
+
+        return MachineTopology(self._machine, neighbours)
+
+    @property
+    def machine(self) -> Machine:
+        """
+        The machine this topology describes.
+
+        :rtype: ~spinn_machine.Machine
+        """
+        return self._machine
+
+    @property
+    def n_chips(self) -> int:
+        """
+        The number of chips, and so one more than the highest chip id.
+
+        :rtype: int
+        """
+        return len(self._xys)
+
+    @property
+    def xys(self) -> Sequence[XY]:
+        """
+        The coordinates of each chip, indexed by chip id.
+
+        :rtype: list(tuple(int, int))
+        """
+        return self._xys
+
+    @property
+    def chip_ids(self) -> Dict[XY, int]:
+        """
+        The chip id of each chip, keyed by coordinates.
+
+        .. note::
+            This is the underlying dictionary and must not be changed.
+
+        :rtype: dict(tuple(int, int), int)
+        """
+        return self._ids
+
+    @property
+    def neighbours(self) -> NDArray[numpy.int32]:
+        """
+        An array of shape (n_chips, 6) giving the id of the chip reached
+        over each link of each chip, or -1 if the link can't be used.
+
+        :rtype: ~numpy.ndarray
+        """
+        return self._neighbours
+
+    @property
+    def adjacency(self) -> Sequence[Sequence[int]]:
+        """
+        The same data as :py:attr:`neighbours` but as nested Python lists,
+        which are faster to index one value at a time.
+
+        :rtype: list(list(int))
+        """
+        return self._adjacency
+
+    @property
+    def signature(self) -> str:
+        """
+        A hash of the chips and usable links, which is the same for any
+        machines with the same chips and links, even if the machine objects
+        differ.
+
+        :rtype: str
+        """
+        if self._signature is None:
+            digest = hashlib.md5(
+                numpy.array(self._xys, dtype=numpy.int32).tobytes())
+            digest.update(self._neighbours.tobytes())
+            self._signature = digest.hexdigest()
+        return self._signature
+
+    def chip_id(self, xy: XY) -> int:
+        """
+        Get the id of the chip at the given coordinates.
+
+        :param tuple(int, int) xy: The coordinates of the chip
+        :return: The chip id or -1 if there is no chip at the coordinates
+        :rtype: int
+        """
+        return self._ids.get(xy, NO_CHIP)
+
+    def xy(self, chip_id: int) -> XY:
+        """
+        Get the coordinates of the chip with the given id.
+
+        :param int chip_id: The id of the chip
+        :rtype: tuple(int, int)
+        """
+        return self._xys[chip_id]
+
+    def neighbour(self, chip_id: int, link: int) -> int:
+        """
+        Get the id of the chip reached over a link.
+
+        :param int chip_id: The id of the chip the link leaves from
+        :param int link: The link to follow
+        :return: The chip id or -1 if the link can't be used
+        :rtype: int
+        """
+        return self._adjacency[chip_id][link]
+
+    def is_usable_link(self, xy: XY, link: int) -> bool:
+        """
+        Determine if a packet can be sent over a link to a working chip.
+
+        :param tuple(int, int) xy: The coordinates of the chip
+        :param int link: The link to follow
+        :rtype: bool
+        """
+        chip_id = self._ids.get(xy, NO_CHIP)
+        return chip_id != NO_CHIP and self._adjacency[chip_id][link] != NO_CHIP
+
+    @property
+    def path_cache(self) -> Optional[PathCache]:
+        """
+        The cache of paths last made by :py:meth:`get_path_cache`, if any.
+
+        :rtype: PathCache or None
+        """
+        return self._path_cache
+
+    def get_path_cache(
+            self, max_size: int, options: Hashable = None) -> PathCache:
+        """
+        Get the cache of paths between chips of this machine.  As the
+        topology is rebuilt when the machine changes, the paths always
+        avoid the faults of the current machine.
+
+        :param int max_size:
+            The maximum number of paths to keep; if this differs from the
+            size of the existing cache, a new empty cache is made
+        :param options:
+            Something that compares equal only for options that make the
+            same paths; if this differs from the options of the existing
+            cache, a new empty cache is made
+        :rtype: PathCache
+        """
+        if (self._path_cache is None or
+                self._path_cache.max_size != max_size or
+                self._path_options != options):
+            self._path_cache = PathCache(max_size)
+            self._path_options = options
+        return self._path_cache
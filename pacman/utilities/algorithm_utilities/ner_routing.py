@@ -0,0 +1,120 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Building routing trees in the style of Neighbour Exploring Routing, by
+connecting each target chip, nearest first, to the nearest chip already in
+the tree.
+"""
+
+from typing import Dict, Optional, Set, Tuple
+from spinn_utilities.typing.coords import XY
+from pacman.utilities.algorithm_utilities.routing_tree import RoutingTree
+from pacman.utilities.algorithm_utilities.machine_topology import (
+    MachineTopology, NO_CHIP)
+from pacman.utilities.algorithm_utilities.path_search import (
+    route_pre_to_post)
+from pacman.utilities.algorithm_utilities.table_pressure import (
+    TablePressure)
+
+
+#: How far from a target chip to look for a chip already in the tree when
+#: using Neighbour Exploring Routing
+_NER_RADIUS = 20
+
+
+def route_to_nearest_in_tree(
+        topology: MachineTopology, source_xy: XY, all_source_xys: Set[XY],
+        source_edge_xys: Set[XY], real_target_xys: Set[XY],
+        routes: Dict[XY, RoutingTree], label: str, prefer_straight: bool,
+        pressure: Optional[TablePressure]):
+    """
+    Route to each target chip in turn, nearest to the source first, from
+    the nearest chip that is already in the routes or in the source, in the
+    style of Neighbour Exploring Routing.
+
+    :param MachineTopology topology: The machine to route on
+    :param tuple(int,int) source_xy: A chip chosen in the source to route from
+    :param set(tuple(int,int) all_source_xys: All source chips
+    :param set(tuple(int,int)) source_edge_xys:
+        Set of chips that routes are currently going outward from the source
+        (updated here)
+    :param set(tuple(int,int)) real_target_xys:
+        The chips that something in the source actually targets
+    :param dict(tuple(int,int), RoutingTree) routes:
+        The routes made by chip (updated here)
+    :param str label: The label of the routes made
+    :param bool prefer_straight:
+        Whether to prefer paths that go straight through chips
+    :param pressure: The chips to steer paths around, if any
+    :type pressure: TablePressure or None
+    """
+    machine = topology.machine
+
+    def distance(xy: XY) -> Tuple[int, XY]:
+        return sum(map(abs, machine.get_vector(source_xy, xy))), xy
+
+    for target_xy in sorted(real_target_xys, key=distance):
+        if target_xy in routes:
+            continue
+
+        # A target in the source is reached by the routes within the source
+        if target_xy in all_source_xys:
+            routes[target_xy] = RoutingTree(target_xy, label)
+            source_edge_xys.add(target_xy)
+            continue
+
+        start_xy = find_nearest_in_tree(
+            target_xy, topology, routes, all_source_xys)
+        if start_xy is None:
+            start_xy = source_xy
+        route_pre, _ = route_pre_to_post(
+            start_xy, target_xy, routes, topology, label, all_source_xys,
+            {target_xy}, prefer_straight, pressure)
+        if route_pre in all_source_xys:
+            source_edge_xys.add(route_pre)
+
+
+def find_nearest_in_tree(
+        target_xy: XY, topology: MachineTopology,
+        routes: Dict[XY, RoutingTree], all_source_xys: Set[XY]) -> Optional[
+            XY]:
+    """
+    Search outwards from a chip for the nearest chip that is in the
+    routes or in the source, up to a limited distance.
+
+    :param tuple(int,int) target_xy: The chip to search from
+    :param MachineTopology topology: The machine to search
+    :param dict(tuple(int,int), RoutingTree) routes: The routes made so far
+    :param set(tuple(int,int) all_source_xys: All source chips
+    :return: The nearest chip found, or `None` if none is close enough
+    :rtype: tuple(int, int) or None
+    """
+    xys = topology.xys
+    adjacency = topology.adjacency
+    first_id = topology.chip_ids[target_xy]
+    seen = {first_id}
+    frontier = [first_id]
+    for _ in range(_NER_RADIUS):
+        next_frontier = list()
+        for chip_id in frontier:
+            for next_id in adjacency[chip_id]:
+                if next_id == NO_CHIP or next_id in seen:
+                    continue
+                xy = xys[next_id]
+                if xy in routes or xy in all_source_xys:
+                    return xy
+                seen.add(next_id)
+                next_frontier.append(next_id)
+        frontier = next_frontier
+    return None
@@ -0,0 +1,134 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Fingerprints of application partitions, to tell when their routes can be
+kept from an earlier routing run or copied from another partition.
+"""
+
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Sequence
+from pacman.model.graphs import AbstractVertex
+from pacman.model.graphs.application import (
+    ApplicationEdgePartition, ApplicationVertex)
+from pacman.model.graphs.machine import MachineVertex
+from pacman.utilities.algorithm_utilities.routing_algorithm_utilities import (
+    vertex_xy, vertex_xy_and_route)
+
+
+def _vertex_key(vertex: AbstractVertex) -> Hashable:
+    """
+    Get something that identifies a vertex and which stays the same if the
+    machine vertices of an application vertex are recreated.
+
+    :param AbstractVertex vertex:
+    """
+    if isinstance(vertex, MachineVertex) and vertex.app_vertex is not None:
+        return (vertex.app_vertex, vertex.index)
+    return vertex
+
+
+def _placed_key(vertex: MachineVertex) -> Hashable:
+    """
+    Get something that identifies a machine vertex and where it is.
+
+    :param MachineVertex vertex:
+    """
+    xy, (_vertex, core, link) = vertex_xy_and_route(vertex)
+    return (_vertex_key(vertex), xy, core, link)
+
+
+def partition_fingerprint(partition: ApplicationEdgePartition) -> Hashable:
+    """
+    Get a fingerprint of everything that routing a partition depends on,
+    apart from the machine: its identifier, the places of the sources
+    and targets, and which sources target what.
+
+    :param ApplicationEdgePartition partition:
+    """
+    source = partition.pre_vertex
+    identifier = partition.identifier
+    splitter = source.splitter
+    outgoing = tuple(
+        _placed_key(m_vertex)
+        for m_vertex in splitter.get_out_going_vertices(identifier))
+    internal = tuple(
+        (in_part.identifier, _placed_key(in_part.pre_vertex),
+         tuple(_placed_key(edge.post_vertex) for edge in in_part.edges))
+        for in_part in splitter.get_internal_multicast_partitions())
+    targets = tuple(
+        (edge.post_vertex,
+         tuple(vertex_xy(m_vertex)
+               for m_vertex in edge.post_vertex.machine_vertices),
+         tuple((_placed_key(tgt), tuple(_vertex_key(src) for src in srcs))
+               for tgt, srcs in edge.post_vertex.splitter.
+               get_source_specific_in_coming_vertices(source, identifier)))
+        for edge in partition.edges)
+    source_xys = tuple(
+        vertex_xy(m_vertex) for m_vertex in source.machine_vertices)
+    return (identifier, outgoing, source_xys, internal, targets)
+
+
+def partition_shape(partition: ApplicationEdgePartition) -> Hashable:
+    """
+    Get something that is the same for partitions from the same source
+    that have the same routes other than their identifiers: which machine
+    vertices send, and which sources target what.  As this is only
+    compared within one routing run, where the vertices are, which is the
+    same for all the partitions, is not included.
+
+    :param ApplicationEdgePartition partition:
+    """
+    source = partition.pre_vertex
+    identifier = partition.identifier
+    splitter = source.splitter
+    outgoing = tuple(splitter.get_out_going_vertices(identifier))
+    internal = tuple(
+        in_part.identifier == identifier
+        for in_part in splitter.get_internal_multicast_partitions())
+    targets = tuple(
+        (edge.post_vertex,
+         tuple((tgt, tuple(srcs)) for tgt, srcs in edge.post_vertex.splitter.
+               get_source_specific_in_coming_vertices(source, identifier)))
+        for edge in partition.edges)
+    return (outgoing, internal, targets)
+
+
+def find_shared_partitions(
+        partitions: Sequence[ApplicationEdgePartition],
+        indices: Iterable[int]) -> Dict[int, int]:
+    """
+    Find the partitions that have the same shape as an earlier partition
+    from the same source, so that their routes can be copied from that
+    partition instead of being made again.
+
+    :param list(ApplicationEdgePartition) partitions:
+    :param iterable(int) indices: The indices of the partitions to look at
+    :return: The index of the earlier partition with the same shape, by
+        index of the partitions that have one
+    :rtype: dict(int, int)
+    """
+    by_source: Dict[ApplicationVertex, List[int]] = defaultdict(list)
+    for index in indices:
+        by_source[partitions[index].pre_vertex].append(index)
+    shared: Dict[int, int] = dict()
+    for source_indices in by_source.values():
+        if len(source_indices) < 2:
+            continue
+        first_by_shape: Dict[Hashable, int] = dict()
+        for index in source_indices:
+            first = first_by_shape.setdefault(
+                partition_shape(partitions[index]), index)
+            if first != index:
+                shared[index] = first
+    return shared
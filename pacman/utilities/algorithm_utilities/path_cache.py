@@ -0,0 +1,126 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+from typing_extensions import TypeAlias
+from spinn_utilities.typing.coords import XY
+
+#: A path as a sequence of (link, (x, y)) steps
+Path: TypeAlias = Tuple[Tuple[int, XY], ...]
+
+
+class PathCache(object):
+    """
+    A least-recently-used cache of paths between pairs of chips, with
+    counters of how often it was (and wasn't) of use.
+
+    The paths depend on which chips and links of the machine are working,
+    so a cache must only be used with one machine.
+    """
+
+    __slots__ = (
+        # The maximum number of paths to keep
+        "_max_size",
+        # OrderedDict of (source xy, target xy) -> path, oldest use first
+        "_paths",
+        # The number of lookups that found a path
+        "_hits",
+        # The number of lookups that didn't find a path
+        "_misses")
+
+    def __init__(self, max_size: int):
+        """
+        :param int max_size:
+            The maximum number of paths to keep; 0 or less keeps none
+        """
+        self._max_size = max_size
+        self._paths: "OrderedDict[Tuple[XY, XY], Path]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def max_size(self) -> int:
+        """
+        The maximum number of paths kept.
+
+        :rtype: int
+        """
+        return self._max_size
+
+    @property
+    def hits(self) -> int:
+        """
+        The number of times :py:meth:`get_path` found a path.
+
+        :rtype: int
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        The number of times :py:meth:`get_path` didn't find a path.
+
+        :rtype: int
+        """
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def get_path(self, source_xy: XY, target_xy: XY) -> Optional[Path]:
+        """
+        Get the path between two chips, if it is in the cache.
+
+        :param tuple(int, int) source_xy: The chip the path starts at
+        :param tuple(int, int) target_xy: The chip the path ends at
+        :rtype: tuple(tuple(int, tuple(int, int))) or None
+        """
+        key = (source_xy, target_xy)
+        path = self._paths.get(key)
+        if path is None:
+            self._misses += 1
+            return None
+        self._paths.move_to_end(key)
+        self._hits += 1
+        return path
+
+    def add_path(self, source_xy: XY, target_xy: XY, path: Path):
+        """
+        Add a path between two chips, dropping the least recently used
+        path if the cache is full.
+
+        :param tuple(int, int) source_xy: The chip the path starts at
+        :param tuple(int, int) target_xy: The chip the path ends at
+        :param tuple(tuple(int, tuple(int, int))) path: The path
+        """
+        if self._max_size <= 0:
+            return
+        key = (source_xy, target_xy)
+        self._paths[key] = path
+        self._paths.move_to_end(key)
+        if len(self._paths) > self._max_size:
+            self._paths.popitem(last=False)
+
+    def add_counts(self, hits: int, misses: int):
+        """
+        Add to the counters, for example with the counts of a copy of this
+        cache used in another process.
+
+        :param int hits: The number of hits to add
+        :param int misses: The number of misses to add
+        """
+        self._hits += hits
+        self._misses += misses
@@ -0,0 +1,489 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Searches for paths between chips of a machine topology, and the adding of
+paths to the routing trees being built.
+
+The paths are found by breadth first searches, optionally preferring to go
+straight through chips so that more of each route can be left to default
+routing, or avoiding some chips.
+"""
+
+from __future__ import annotations
+from typing import (
+    Dict, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING)
+from typing_extensions import TypeAlias
+from spinn_utilities.typing.coords import XY
+from pacman.exceptions import PacmanRoutingException
+from pacman.utilities.algorithm_utilities.routing_algorithm_utilities import (
+    longest_dimension_first, vector_to_nodes)
+from pacman.utilities.algorithm_utilities.routing_tree import RoutingTree
+from pacman.utilities.algorithm_utilities.machine_topology import (
+    MachineTopology, NO_CHIP)
+from pacman.utilities.algorithm_utilities.path_cache import Path
+if TYPE_CHECKING:
+    from .table_pressure import TablePressure
+
+_Node: TypeAlias = Tuple[int, XY]
+
+
+def route_pre_to_post(
+        source_xy: XY, dest_xy: XY, routes: Dict[XY, RoutingTree],
+        topology: MachineTopology, label: str, all_source_xy: Set[XY],
+        target_xys: Set[XY], prefer_straight: bool,
+        pressure: Optional[TablePressure]) -> Tuple[XY, XY]:
+    """
+    :param tuple(int, int) source_xy:
+    :param tuple(int, int) dest_xy:
+    :param dict(tuple(int,int), RoutingTree) routes:
+    :param MachineTopology topology:
+    :param str label:
+    :param set(tuple(int, int)) all_source_xy:
+    :param set(tuple(int, int)) target_xys:
+    :param bool prefer_straight:
+    :param pressure:
+    :type pressure: TablePressure or None
+    :return: the pre- and post-vertex coordinates
+    :rtype: tuple(tuple(int,int), tuple(int, int))
+    """
+    # Find a route from source to target which avoids broken links and chips
+    nodes_fixed = repaired_path(
+        source_xy, dest_xy, topology, prefer_straight)
+    if prefer_straight:
+        nodes_fixed = straightest_path(
+            source_xy, dest_xy, nodes_fixed, routes, topology,
+            all_source_xy, target_xys)
+    if pressure is not None:
+        nodes_fixed = pressure.steer(
+            source_xy, dest_xy, nodes_fixed, topology, prefer_straight)
+
+    route_pre, route_post, nodes = trim_path(
+        source_xy, dest_xy, nodes_fixed, routes, all_source_xy, target_xys)
+
+    # If we found one not in the route, create a new entry for it
+    if route_pre not in routes:
+        routes[route_pre] = RoutingTree(route_pre, label)
+
+    # Convert nodes to routes and add to existing routes
+    source_route = routes[route_pre]
+    for direction, dest_node in nodes:
+        if dest_node in routes:
+            print_path(routes[source_xy])
+            nodes_direct = longest_dimension_first(
+                topology.machine.get_vector(source_xy, dest_xy), source_xy)
+            print(f"Direct path from {source_xy} to {dest_xy}: {nodes_direct}")
+            print(f"Avoiding down chips: {nodes_fixed}")
+            print(f"Trimmed path is from {route_pre} to {route_post}: {nodes}")
+            raise PacmanRoutingException(
+                f"Somehow node {dest_node} already in routes with label"
+                f" {routes[dest_node].label}")
+        dest_route = RoutingTree(dest_node, label)
+        routes[dest_node] = dest_route
+        source_route.append_child((direction, dest_route))
+        source_route = dest_route
+
+    return route_pre, route_post
+
+
+def trim_path(
+        source_xy: XY, dest_xy: XY, nodes: Sequence[_Node],
+        routes: Dict[XY, RoutingTree], all_source_xy: Set[XY],
+        target_xys: Set[XY]) -> Tuple[XY, XY, Sequence[_Node]]:
+    """
+    Cut a path from source to target down to the part that is not already
+    in the routes, the source or the target.
+
+    :param tuple(int, int) source_xy:
+    :param tuple(int, int) dest_xy:
+    :param list(tuple(int,tuple(int, int))) nodes: The path
+    :param dict(tuple(int,int), RoutingTree) routes:
+    :param set(tuple(int, int)) all_source_xy:
+    :param set(tuple(int, int)) target_xys:
+    :return: The chip to start from, the chip to end at and the path
+        between them
+    :rtype: tuple(tuple(int,int), tuple(int, int),
+        list(tuple(int,tuple(int, int))))
+    """
+    # Start from the end and move backwards until we find a chip
+    # in the source group, or a already in the route
+    route_pre = source_xy
+    for i, (_direction, xy) in reversed(list(enumerate(nodes))):
+        if xy in all_source_xy or xy in routes:
+            nodes = nodes[i + 1:]
+            route_pre = xy
+            break
+
+    # Start from the start and move forwards until we find a chip in
+    # the target group
+    route_post = dest_xy
+    for i, (_direction, xy) in enumerate(nodes):
+        if xy in target_xys:
+            nodes = nodes[:i + 1]
+            route_post = xy
+            break
+    return route_pre, route_post, nodes
+
+
+def straightest_path(
+        source_xy: XY, dest_xy: XY, nodes: Path,
+        routes: Dict[XY, RoutingTree], topology: MachineTopology,
+        all_source_xy: Set[XY], target_xys: Set[XY]) -> Path:
+    """
+    Choose between the longest dimension first path and the path going
+    along the same dimensions in the other order.  The other path is only
+    used if it adds more chips that the route goes straight through, and
+    so which can be left to default routing, without adding more chips at
+    which the route turns or branches.
+
+    :param tuple(int, int) source_xy:
+    :param tuple(int, int) dest_xy:
+    :param list(tuple(int,tuple(int, int))) nodes:
+        The longest dimension first path, repaired
+    :param dict(tuple(int,int), RoutingTree) routes:
+    :param MachineTopology topology:
+    :param set(tuple(int, int)) all_source_xy:
+    :param set(tuple(int, int)) target_xys:
+    :rtype: tuple(tuple(int,tuple(int, int)))
+    """
+    vector = topology.machine.get_vector(source_xy, dest_xy)
+    dimensions = sorted(
+        enumerate(vector), key=(lambda x: abs(x[1])), reverse=True)
+    if sum(1 for _, magnitude in dimensions if magnitude) < 2:
+        return nodes
+    other = tuple(path_without_errors(
+        source_xy, vector_to_nodes(list(reversed(dimensions)), source_xy),
+        topology, True))
+    n_straight, n_turns = count_straight(
+        source_xy, dest_xy, nodes, routes, all_source_xy, target_xys)
+    other_straight, other_turns = count_straight(
+        source_xy, dest_xy, other, routes, all_source_xy, target_xys)
+    if other_straight > n_straight and other_turns <= n_turns:
+        return other
+    return nodes
+
+
+def count_straight(
+        source_xy: XY, dest_xy: XY, nodes: Path,
+        routes: Dict[XY, RoutingTree], all_source_xy: Set[XY],
+        target_xys: Set[XY]) -> Tuple[int, int]:
+    """
+    Count how many more chips of the routes would be gone straight through
+    with a path added, and how many chips it would add or branch off from
+    that are not gone straight through.
+
+    :param tuple(int, int) source_xy:
+    :param tuple(int, int) dest_xy:
+    :param list(tuple(int,tuple(int, int))) nodes: The path
+    :param dict(tuple(int,int), RoutingTree) routes:
+    :param set(tuple(int, int)) all_source_xy:
+    :param set(tuple(int, int)) target_xys:
+    :return: The change in the number of chips gone straight through, and
+        the number turned or branched at
+    :rtype: tuple(int, int)
+    """
+    route_pre, _, new_nodes = trim_path(
+        source_xy, dest_xy, nodes, routes, all_source_xy, target_xys)
+    # A chip in the routes with one child may have gone straight through
+    # until now, and won't once the path branches off from it
+    pre_route = routes.get(route_pre)
+    n_branched = int(
+        pre_route is not None and route_pre not in all_source_xy and
+        len(list(pre_route.children)) == 1)
+    n_straight = -n_branched
+    n_turns = n_branched
+    for (in_link, _), (out_link, _) in zip(new_nodes, new_nodes[1:]):
+        if in_link == out_link:
+            n_straight += 1
+        else:
+            n_turns += 1
+    return n_straight, n_turns
+
+
+def repaired_path(
+        source_xy: XY, dest_xy: XY, topology: MachineTopology,
+        prefer_straight: bool) -> Path:
+    """
+    Get the longest dimension first path between two chips, repaired to
+    avoid broken links and chips, using the path cache of the topology
+    if there is one.
+
+    :param tuple(int, int) source_xy:
+    :param tuple(int, int) dest_xy:
+    :param MachineTopology topology:
+    :param bool prefer_straight:
+    :rtype: tuple(tuple(int,tuple(int, int)))
+    """
+    path_cache = topology.path_cache
+    if path_cache is not None:
+        path = path_cache.get_path(source_xy, dest_xy)
+        if path is not None:
+            return path
+    vector = topology.machine.get_vector(source_xy, dest_xy)
+    nodes_direct = longest_dimension_first(vector, source_xy)
+    path = tuple(path_without_errors(
+        source_xy, nodes_direct, topology, prefer_straight))
+    if path_cache is not None:
+        path_cache.add_path(source_xy, dest_xy, path)
+    return path
+
+
+def path_without_errors(
+        source_xy: XY, nodes: List[_Node], topology: MachineTopology,
+        prefer_straight: bool = False) -> List[_Node]:
+    """
+    :param tuple(int, int) source_xy:
+    :param  list(tuple(int,tuple(int, int))) nodes:
+    :param MachineTopology topology:
+    :param bool prefer_straight:
+    :rtype: list(tuple(int,int))
+    """
+    c_xy = source_xy
+    pos = 0
+    new_nodes = list()
+    while pos < len(nodes):
+        # While the route is working, move forwards and copy
+        while (pos < len(nodes) and _is_ok(c_xy, nodes[pos], topology)):
+            new_nodes.append(nodes[pos])
+            c_xy = _xy(nodes[pos])
+            pos += 1
+
+        # While the route is broken, find the next working bit
+        next_pos = pos
+        n_xy = c_xy
+        while (next_pos < len(nodes) and not _is_ok(
+                n_xy, nodes[next_pos], topology)):
+            n_xy = _xy(nodes[next_pos])
+            next_pos += 1
+
+        # If there is a broken bit, fix it
+        if next_pos != pos:
+            new_nodes.extend(find_path(
+                c_xy, n_xy, topology, prefer_straight))
+        c_xy = n_xy
+        pos = next_pos
+    return path_without_loops(source_xy, new_nodes)
+
+
+def path_without_loops(start_xy: XY, nodes: List[_Node]) -> List[_Node]:
+    """
+    :param tuple(int, int) start_xy:
+    :param list(tuple(int,tuple(int,int))) nodes:
+    :rtype: list(tuple(int,int))
+    """
+    seen_nodes = {start_xy: 0}
+    i = 0
+    while i < len(nodes):
+        _, nxt = nodes[i]
+        if nxt in seen_nodes:
+            last_seen = seen_nodes[nxt]
+            del nodes[last_seen:i + 1]
+            i = last_seen
+        else:
+            i += 1
+            seen_nodes[nxt] = i
+    return nodes
+
+
+def _is_ok(xy: XY, node: _Node, topology: MachineTopology):
+    """
+    :param tuple(int, int) xy:
+    :param tuple(int,tuple(int, int)) node:
+    :param MachineTopology topology:
+    :rtype: bool
+    """
+    direction, _ = node
+    return topology.is_usable_link(xy, direction)
+
+
+def _xy(node: _Node) -> XY:
+    _, xy = node
+    return xy
+
+
+def find_path(
+        source_xy: XY, target_xy: XY, topology: MachineTopology,
+        prefer_straight: bool = False) -> List[_Node]:
+    """
+    :param tuple(int,int) source_xy:
+    :param tuple(int,int) target_xy:
+    :param MachineTopology topology:
+    :param bool prefer_straight:
+    :rtype: list(tuple(int,tuple(int,int)))
+    """
+    if source_xy == target_xy:
+        return list()
+    xys = topology.xys
+    adjacency = topology.adjacency
+    target_id = topology.chip_id(target_xy)
+    source_id = topology.chip_id(source_xy)
+
+    # Visit the chips a level at a time, and for each chip seen keep the
+    # (parent id, link from parent) it was first reached by
+    parents: Dict[int, Tuple[int, int]] = {source_id: (NO_CHIP, NO_CHIP)}
+    level = [source_id]
+    while level:
+        level = next_level(level, parents, adjacency, None, prefer_straight)
+
+        # If we have reached the target, follow the parents back
+        if target_id in parents:
+            return _path_to(target_id, source_id, parents, xys)
+    raise PacmanRoutingException(f"No path from {source_xy} to {target_xy}")
+
+
+def find_detour(
+        source_xy: XY, target_xy: XY, topology: MachineTopology,
+        avoid_ids: Set[int], max_hops: int,
+        prefer_straight: bool) -> Optional[List[_Node]]:
+    """
+    Find a shortest path between two chips that doesn't go through some
+    chips, if there is one of at most a given length.
+
+    :param tuple(int,int) source_xy:
+    :param tuple(int,int) target_xy:
+    :param MachineTopology topology:
+    :param set(int) avoid_ids: The ids of the chips not to go through
+    :param int max_hops: The most links the path may use
+    :param bool prefer_straight:
+    :rtype: list(tuple(int,tuple(int,int))) or None
+    """
+    xys = topology.xys
+    target_id = topology.chip_id(target_xy)
+    source_id = topology.chip_id(source_xy)
+
+    # Mark the chips to avoid as seen so that they are never visited
+    parents: Dict[int, Tuple[int, int]] = {
+        chip_id: (NO_CHIP, NO_CHIP) for chip_id in avoid_ids
+        if chip_id != target_id}
+    parents[source_id] = (NO_CHIP, NO_CHIP)
+    level = [source_id]
+    for _ in range(max_hops):
+        level = next_level(
+            level, parents, topology.adjacency, None, prefer_straight)
+        if target_id in parents:
+            return _path_to(target_id, source_id, parents, xys)
+        if not level:
+            break
+    return None
+
+
+def _path_to(
+        target_id: int, source_id: int,
+        parents: Dict[int, Tuple[int, int]],
+        xys: Sequence[XY]) -> List[_Node]:
+    """
+    Follow the parents of a breadth first search back from a chip.
+
+    :param int target_id: The chip to follow back from
+    :param int source_id: The chip the search started at
+    :param dict(int, tuple(int, int)) parents:
+        The (parent id, link from parent) of each chip seen
+    :param list(tuple(int, int)) xys: The coordinates of each chip
+    :rtype: list(tuple(int,tuple(int,int)))
+    """
+    path: List[_Node] = list()
+    next_id = target_id
+    while next_id != source_id:
+        parent_id, parent_link = parents[next_id]
+        path.append((parent_link, xys[next_id]))
+        next_id = parent_id
+    path.reverse()
+    return path
+
+
+def next_level(
+        level: List[int], parents: Dict[int, Tuple[int, int]],
+        adjacency: Sequence[Sequence[int]], open_ids: Optional[Set[int]],
+        prefer_straight: bool) -> List[int]:
+    """
+    Find the chips one step on from a level of a breadth first search.
+
+    If preferring straight paths, each chip of the level is first continued
+    over the link it was entered by, so that a chip reached by both going
+    straight and turning is reached by going straight; the router of such a
+    chip then need not have an entry for the route.
+
+    :param list(int) level: The ids of the chips of this level
+    :param dict(int, tuple(int, int)) parents:
+        The (parent id, link from parent) of each chip seen (updated here)
+    :param list(list(int)) adjacency: The chip over each link of each chip
+    :param open_ids: The ids of the chips that can be used, or `None` to
+        allow any chip
+    :type open_ids: set(int) or None
+    :param bool prefer_straight: Whether to prefer going straight
+    :return: The ids of the chips of the next level
+    :rtype: list(int)
+    """
+    next_ids: List[int] = list()
+    if prefer_straight:
+        for chip_id in level:
+            link = parents[chip_id][1]
+            if link == NO_CHIP:
+                continue
+            next_id = adjacency[chip_id][link]
+            if next_id == NO_CHIP or next_id in parents or (
+                    open_ids is not None and next_id not in open_ids):
+                continue
+            parents[next_id] = (chip_id, link)
+            next_ids.append(next_id)
+    for chip_id in level:
+        for link, next_id in enumerate(adjacency[chip_id]):
+            if next_id == NO_CHIP or next_id in parents or (
+                    open_ids is not None and next_id not in open_ids):
+                continue
+            parents[next_id] = (chip_id, link)
+            next_ids.append(next_id)
+    return next_ids
+
+
+def print_path(first_route: RoutingTree):
+    """
+    Print a routing tree, one line for each path to a leaf, to help find
+    what went wrong with it.
+
+    :param RoutingTree first_route: The root of the tree
+    """
+    to_process: List[Tuple[str, Optional[int], RoutingTree]] = [
+        ("", None, first_route)]
+    last_is_leaf = False
+    line = ""
+    visited = set()
+    while to_process:
+        prefix, link, route = to_process.pop()
+
+        if last_is_leaf:
+            line += prefix
+
+        to_add = ""
+        if link is not None:
+            to_add += f" -> {link} -> "
+        to_add += f"{route.chip} ({route.label})"
+        line += to_add
+        prefix += " " * len(to_add)
+
+        if route.chip in visited:
+            print(line, "Loop!")
+            line = ""
+            last_is_leaf = True
+        elif route.is_leaf:
+            # This is a leaf
+            last_is_leaf = True
+            print(line)
+            line = ""
+        else:
+            last_is_leaf = False
+            for direction, next_route in route.children:
+                assert isinstance(next_route, RoutingTree)
+                to_process.append((prefix, direction, next_route))
+
+        visited.add(route.chip)
@@ -0,0 +1,124 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Counts of the routing table entries on each chip while routing, used to
+steer paths around the chips whose tables are nearly full.
+"""
+
+from typing import Iterable, Set
+from spinn_utilities.typing.coords import XY
+from pacman.model.routing_table_by_partition import (
+    MulticastRoutingTableByPartition)
+from pacman.utilities.algorithm_utilities.machine_topology import (
+    MachineTopology)
+from pacman.utilities.algorithm_utilities.path_cache import Path
+from pacman.utilities.algorithm_utilities.path_search import find_detour
+
+
+class TablePressure(object):
+    """
+    Live counts of the routing table entries on each chip, used to steer
+    routes around the chips whose tables are nearly full.
+    """
+    __slots__ = (
+        # The number of entries at which each chip (by id) is avoided
+        "_limits",
+        # The ids of the chips to avoid
+        "_hot_ids",
+        # The most extra links that a path may use to avoid chips
+        "_max_detour_hops",
+        # The number of paths changed to avoid chips
+        "_n_detours")
+
+    def __init__(self, topology: MachineTopology, pressure: float,
+                 max_detour_hops: int):
+        """
+        :param MachineTopology topology: The machine being routed on
+        :param float pressure:
+            The fraction of the multicast entries of a router at which the
+            chip is avoided
+        :param int max_detour_hops:
+            The most extra links that a path may use to avoid chips
+        """
+        machine = topology.machine
+        self._limits = [
+            int(pressure * machine[x, y].router.n_available_multicast_entries)
+            for (x, y) in topology.xys]
+        self._hot_ids: Set[int] = set()
+        self._max_detour_hops = max_detour_hops
+        self._n_detours = 0
+
+    @property
+    def n_hot(self) -> int:
+        """
+        The number of chips being avoided.
+
+        :rtype: int
+        """
+        return len(self._hot_ids)
+
+    @property
+    def n_detours(self) -> int:
+        """
+        The number of paths changed to avoid chips.
+
+        :rtype: int
+        """
+        return self._n_detours
+
+    def update(self, routing_tables: MulticastRoutingTableByPartition,
+               xys: Iterable[XY], topology: MachineTopology):
+        """
+        Update the counts of the chips that entries have been added to.
+
+        :param MulticastRoutingTableByPartition routing_tables:
+            The tables being made
+        :param iterable(tuple(int, int)) xys:
+            The chips that entries might have been added to
+        :param MachineTopology topology: The machine being routed on
+        """
+        for (x, y) in xys:
+            chip_id = topology.chip_id((x, y))
+            if chip_id in self._hot_ids:
+                continue
+            entries = routing_tables.get_entries_for_router(x, y)
+            if entries is not None and len(entries) >= self._limits[chip_id]:
+                self._hot_ids.add(chip_id)
+
+    def steer(self, source_xy: XY, dest_xy: XY, path: Path,
+              topology: MachineTopology, prefer_straight: bool) -> Path:
+        """
+        Get a path that avoids the chips with nearly full tables if the
+        given path goes through any of them and there is such a path that
+        isn't too much longer.
+
+        :param tuple(int, int) source_xy: The chip the path starts at
+        :param tuple(int, int) dest_xy: The chip the path ends at
+        :param tuple(tuple(int,tuple(int, int))) path: The path to check
+        :param MachineTopology topology: The machine being routed on
+        :param bool prefer_straight:
+            Whether to prefer paths that go straight through chips
+        :rtype: tuple(tuple(int,tuple(int, int)))
+        """
+        hot_ids = self._hot_ids
+        if not hot_ids or not any(
+                topology.chip_id(xy) in hot_ids for _, xy in path[:-1]):
+            return path
+        detour = find_detour(
+            source_xy, dest_xy, topology, hot_ids,
+            len(path) + self._max_detour_hops, prefer_straight)
+        if detour is None:
+            return path
+        self._n_detours += 1
+        return tuple(detour)
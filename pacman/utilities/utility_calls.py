@@ -14,10 +14,25 @@
 
 import hashlib
 import math
-from typing import Any, Iterable, Tuple
+import multiprocessing
+from multiprocessing.context import BaseContext
+from typing import (
+    Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple,
+    TypeVar)
 import numpy
 from pacman.model.graphs.common import Slice
 
+#: The type of the state shared with forked processes
+S = TypeVar("S")
+#: The type of the items given to forked processes
+T = TypeVar("T")
+#: The type of the results sent back from forked processes
+R = TypeVar("R")
+
+#: The function and state of the running :py:func:`map_in_fork`, shared
+#: with the processes it forks; only set while they run
+_FORK_STATE: List[Tuple[Callable[[Any, Any], Any], Any]] = []
+
 
 def expand_to_bit_array(value: int) -> numpy.ndarray:
     """
@@ -192,3 +207,81 @@ def is_power_of_2(v: int) -> bool:
     :rtype: bool
     """
     return (v & (v - 1) == 0) and (v != 0)
+
+
+def get_fork_context() -> Optional[BaseContext]:
+    """
+    Get a multiprocessing context that starts processes by forking, so that
+    the processes share the current state (including the data view) without
+    it having to be pickled.
+
+    :return: The context, or `None` if forking is not supported here
+    :rtype: ~multiprocessing.context.BaseContext or None
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def split_into_shards(n_items: int, n_shards: int) -> List[range]:
+    """
+    Split the indices of a number of items into contiguous shards of as
+    near equal size as possible.  No shard is empty, so there may be fewer
+    than requested.
+
+    :param int n_items: The number of items to split
+    :param int n_shards: The maximum number of shards to make
+    :rtype: list(range)
+    """
+    n_shards = max(1, min(n_shards, n_items))
+    size, extra = divmod(n_items, n_shards)
+    shards = list()
+    start = 0
+    for shard in range(n_shards):
+        end = start + size + (1 if shard < extra else 0)
+        if end > start:
+            shards.append(range(start, end))
+        start = end
+    return shards
+
+
+def map_in_fork(state: S, function: Callable[[S, T], R],
+                items: Sequence[T], n_processes: int) -> Iterator[R]:
+    """
+    Call a function on each of some items in processes forked from this
+    one, so that they share the state (and the data view) without it having
+    to be pickled; only the items and the results are.  If processes can't
+    be forked here, the function is called in this process instead.
+
+    :param state: Passed to every call of the function
+    :param callable function:
+        Called with the state and an item; it must not depend on anything
+        this process changes after the processes are forked
+    :param list items: The items to call the function on
+    :param int n_processes: The most processes to fork
+    :return: The results of the calls, in the order of the items, as each
+        is ready
+    :rtype: iterable
+    """
+    context = get_fork_context()
+    if context is None or n_processes < 2 or len(items) < 2:
+        for item in items:
+            yield function(state, item)
+        return
+    _FORK_STATE.append((function, state))
+    try:
+        with context.Pool(min(n_processes, len(items))) as pool:
+            yield from pool.imap(_call_in_fork, items)
+    finally:
+        _FORK_STATE.pop()
+
+
+def _call_in_fork(item: Any) -> Any:
+    """
+    Call the function of the running :py:func:`map_in_fork` on an item, in
+    a forked process.
+
+    :param item:
+    """
+    function, state = _FORK_STATE[-1]
+    return function(state, item)
@@ -12,7 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Optional, Sequence, Union
+
+import numpy
+from numpy.typing import NDArray
+
+from spinn_utilities.config_holder import get_config_bool
+
 from pacman.data import PacmanDataView
+from pacman.exceptions import PacmanConfigurationException
 from pacman.model.resources.abstract_sdram import AbstractSDRAM
 
 
@@ -22,6 +31,12 @@ class ChipCounter(object):
     This does not look at the fixed_locations of the vertices at all.
     The value produced will be a (hopefully) worst-case estimate and should
     not be used to decide failure in terms of space!
+
+    By default each core goes on the last chip counted if it fits, or
+    else on a new chip.  If ``[Mapping] chip_counter_best_fit_decreasing``
+    is set, the cores are instead put on chips in order of most SDRAM
+    first, each on the chip with the least SDRAM left that it fits on,
+    which gives a tighter count.
     """
 
     __slots__ = (
@@ -31,27 +46,39 @@ class ChipCounter(object):
         # How much SDRAM there is to be used on a chip
         "__sdram_per_chip",
 
+        # The number of time steps to work out the SDRAM of cores for
+        "__plan_n_timesteps",
+
         # The number of cores free on the "current" chip
         "__cores_free",
 
         # The SDRAM free on the "current" chip
         "__sdram_free",
 
-        # The number of chips used, including the current one
-        "__n_chips")
+        # The number of chips used, including the current one, or None if
+        # it needs to be worked out from the cores added
+        "__n_chips",
+
+        # The SDRAM of each core added if packing best fit decreasing;
+        # None if not
+        "__sdrams")
 
-    def __init__(self):
+    def __init__(self) -> None:
         version = PacmanDataView.get_machine_version()
+        self.__plan_n_timesteps = PacmanDataView.get_plan_n_timestep()
         self.__n_cores_per_chip = (
                 version.max_cores_per_chip - version.n_scamp_cores -
                 PacmanDataView.get_all_monitor_cores())
         self.__sdram_per_chip = (
                 version.max_sdram_per_chip -
                 PacmanDataView.get_all_monitor_sdram().get_total_sdram(
-                    PacmanDataView().get_plan_n_timestep()))
+                    self.__plan_n_timesteps))
         self.__cores_free = 0
         self.__sdram_free = 0
-        self.__n_chips = 0
+        self.__n_chips: Optional[int] = 0
+        self.__sdrams: Optional[List[int]] = None
+        if get_config_bool("Mapping", "chip_counter_best_fit_decreasing"):
+            self.__sdrams = list()
 
     def add_core(self, resources: AbstractSDRAM):
         """
@@ -59,18 +86,108 @@ class ChipCounter(object):
 
         :param AbstractSDRAM resources:
         """
-        sdram = resources.get_total_sdram(
-            PacmanDataView.get_plan_n_timestep())
+        sdram = resources.get_total_sdram(self.__plan_n_timesteps)
+        if self.__sdrams is not None:
+            self.__sdrams.append(sdram)
+            self.__n_chips = None
+            return
         if self.__cores_free == 0 or self.__sdram_free < sdram:
+            assert self.__n_chips is not None
             self.__n_chips += 1
             self.__cores_free = self.__n_cores_per_chip
             self.__sdram_free = self.__sdram_per_chip
         self.__cores_free -= 1
         self.__sdram_free -= sdram
 
+    def add_cores(
+            self, fixed_sdram: Union[Sequence[int], NDArray[numpy.integer]],
+            per_timestep_sdram: Optional[Union[
+                Sequence[float], NDArray[numpy.floating]]] = None):
+        """
+        Adds a core for each of an array of SDRAM costs, giving the same
+        count as calling :py:meth:`add_core` for each in turn.
+
+        :param fixed_sdram: The fixed SDRAM of each core
+        :type fixed_sdram: list(int) or ~numpy.ndarray
+        :param per_timestep_sdram:
+            The SDRAM of each core for each time step, if any
+        :type per_timestep_sdram: list(float) or ~numpy.ndarray or None
+        :raises PacmanConfigurationException:
+            If there is SDRAM for each time step when running forever
+        """
+        sdram = numpy.asarray(fixed_sdram, dtype=numpy.int64)
+        if per_timestep_sdram is not None:
+            per_timestep = numpy.asarray(per_timestep_sdram, dtype=float)
+            if self.__plan_n_timesteps is not None:
+                sdram = numpy.ceil(
+                    sdram + per_timestep * self.__plan_n_timesteps).astype(
+                        numpy.int64)
+            elif numpy.any(per_timestep):
+                raise PacmanConfigurationException(
+                    "Unable to run forever with a variable SDRAM cost")
+        if self.__sdrams is not None:
+            self.__sdrams.extend(sdram.tolist())
+            self.__n_chips = None
+            return
+
+        # sdram_before[i] is the total SDRAM of the cores before core i
+        sdram_before = [0] + numpy.cumsum(sdram).tolist()
+        sdram_list = sdram.tolist()
+        n_cores = len(sdram_list)
+        index = 0
+        while index < n_cores:
+            n_on_chip = 0
+            if self.__cores_free == 0 or self.__sdram_free < sdram_list[index]:
+                assert self.__n_chips is not None
+                self.__n_chips += 1
+                self.__cores_free = self.__n_cores_per_chip
+                self.__sdram_free = self.__sdram_per_chip
+                # The first core goes on the new chip even if too big
+                n_on_chip = 1
+            # The most cores from index on that fit in the SDRAM free
+            fits = bisect_right(
+                sdram_before, sdram_before[index] + self.__sdram_free,
+                index) - 1 - index
+            n_on_chip = max(n_on_chip, min(
+                fits, self.__cores_free, n_cores - index))
+            self.__cores_free -= n_on_chip
+            self.__sdram_free -= (
+                sdram_before[index + n_on_chip] - sdram_before[index])
+            index += n_on_chip
+
+    def __best_fit_decreasing(self) -> int:
+        """
+        The number of chips needed to put the cores added on, each in turn
+        from the most SDRAM to the least on the chip with the least SDRAM
+        left that it fits on.
+
+        :rtype: int
+        """
+        assert self.__sdrams is not None
+        sdrams = numpy.sort(numpy.array(self.__sdrams, dtype=numpy.int64))
+        n_chips = 0
+        # (SDRAM free, chip) of the chips with cores free, least SDRAM first
+        open_chips: List[List[int]] = list()
+        cores_free: List[int] = list()
+        for sdram in reversed(sdrams.tolist()):
+            position = bisect_left(open_chips, [sdram, -1])
+            if position == len(open_chips):
+                chip = n_chips
+                n_chips += 1
+                cores_free.append(self.__n_cores_per_chip)
+                sdram_free = self.__sdram_per_chip
+            else:
+                sdram_free, chip = open_chips.pop(position)
+            cores_free[chip] -= 1
+            if cores_free[chip] > 0 and sdram_free - sdram >= 0:
+                insort(open_chips, [sdram_free - sdram, chip])
+        return n_chips
+
     @property
     def n_chips(self) -> int:
         """
         :rtype: int
         """
+        if self.__n_chips is None:
+            self.__n_chips = self.__best_fit_decreasing()
         return self.__n_chips
@@ -0,0 +1,159 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+tests for the array backed placements
+"""
+import random
+import tracemalloc
+import unittest
+from pacman.config_setup import unittest_setup
+from pacman.exceptions import (
+    PacmanAlreadyPlacedError, PacmanNotPlacedError,
+    PacmanProcessorAlreadyOccupiedError, PacmanProcessorNotOccupiedError)
+from pacman.model.graphs.machine import SimpleMachineVertex
+from pacman.model.placements import ArrayPlacements, Placement, Placements
+
+
+def _random_placements(n_placements, width, height, n_processors, seed):
+    rng = random.Random(seed)
+    locations = rng.sample(
+        [(x, y, p) for x in range(width) for y in range(height)
+         for p in range(n_processors)], n_placements)
+    return [Placement(SimpleMachineVertex(None, f"{i}"), x, y, p)
+            for i, (x, y, p) in enumerate(locations)]
+
+
+class TestArrayPlacements(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+
+    def test_same_as_placements(self):
+        placements = _random_placements(500, 10, 9, 18, 1)
+        dict_placements = Placements(placements)
+        # Start small so that the arrays have to grow
+        array_placements = ArrayPlacements(placements[:10])
+        array_placements.add_placements(placements[10:])
+
+        self.assertEqual(len(dict_placements), len(array_placements))
+        self.assertEqual(
+            dict_placements.n_placements, array_placements.n_placements)
+        self.assertEqual(list(dict_placements), list(array_placements))
+        self.assertEqual(
+            list(dict_placements.placements),
+            list(array_placements.placements))
+        self.assertEqual(
+            sorted(dict_placements.chips_with_placements),
+            list(array_placements.chips_with_placements))
+        for placement in placements:
+            self.assertTrue(array_placements.is_vertex_placed(
+                placement.vertex))
+            self.assertEqual(placement, array_placements.
+                             get_placement_of_vertex(placement.vertex))
+            self.assertEqual(placement, array_placements.
+                             get_placement_on_processor(*placement.location))
+        for x in range(11):
+            for y in range(10):
+                self.assertEqual(
+                    dict_placements.n_placements_on_chip((x, y)),
+                    array_placements.n_placements_on_chip((x, y)))
+                self.assertEqual(
+                    sorted(dict_placements.placements_on_chip((x, y)),
+                           key=lambda placement: placement.p),
+                    list(array_placements.placements_on_chip((x, y))))
+                for p in range(19):
+                    self.assertEqual(
+                        dict_placements.is_processor_occupied(x, y, p),
+                        array_placements.is_processor_occupied(x, y, p))
+
+    def test_by_type(self):
+        vertex = SimpleMachineVertex(None, "simple")
+        pls = ArrayPlacements([Placement(vertex, 1, 2, 3)])
+        self.assertEqual(
+            [Placement(vertex, 1, 2, 3)],
+            list(pls.iterate_placements_by_vertex_type(SimpleMachineVertex)))
+        self.assertEqual([], list(pls.iterate_placements_by_vertex_type(int)))
+        self.assertEqual(
+            [Placement(vertex, 1, 2, 3)],
+            list(pls.iterate_placements_by_xy_and_type(
+                (1, 2), SimpleMachineVertex)))
+        self.assertEqual([], list(pls.iterate_placements_by_xy_and_type(
+            (2, 1), SimpleMachineVertex)))
+
+    def test_safety_code(self):
+        subv = SimpleMachineVertex(None, "1")
+        pl = Placement(subv, 0, 0, 1)
+        pls = ArrayPlacements([pl])
+        subv2 = SimpleMachineVertex(None, "2")
+        pl2 = Placement(subv2, 0, 0, 1)
+        with self.assertRaises(PacmanProcessorAlreadyOccupiedError):
+            pls.add_placement(pl2)
+        with self.assertRaises(PacmanAlreadyPlacedError):
+            pls.add_placement(Placement(subv, 0, 0, 2))
+        with self.assertRaises(PacmanProcessorNotOccupiedError):
+            pls.get_placement_on_processor(0, 0, 2)
+        with self.assertRaises(PacmanProcessorNotOccupiedError):
+            pls.get_placement_on_processor(1, 1, 2)
+        with self.assertRaises(PacmanNotPlacedError):
+            pls.get_placement_of_vertex(subv2)
+
+    def test_infos_code(self):
+        subv = SimpleMachineVertex(None, "1")
+        pl = Placement(subv, 0, 0, 1)
+        pls = ArrayPlacements([pl])
+        subv2 = SimpleMachineVertex(None, "2")
+        pl2 = Placement(subv2, 0, 0, 2)
+        pls.add_placement(pl2)
+
+        self.assertTrue(pls.is_processor_occupied(0, 0, 1))
+        self.assertFalse(pls.is_processor_occupied(0, 0, 3))
+        self.assertFalse(pls.is_processor_occupied(0, 1, 1))
+        self.assertFalse(pls.is_processor_occupied(100, 100, 100))
+        self.assertEqual(2, pls.n_placements_on_chip((0, 0)))
+        self.assertEqual(0, pls.n_placements_on_chip((0, 2)))
+        self.assertListEqual([(0, 0)], list(pls.chips_with_placements))
+        self.assertEqual("(0, 0)", repr(pls))
+        self.assertEqual(2, len(pls))
+
+
+def _measure_placements(placements_class, vertices, machine_width, **kwargs):
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    placements = placements_class(
+        (Placement(vertex, (i // 18) % machine_width,
+                   (i // 18) // machine_width, i % 18)
+         for i, vertex in enumerate(vertices)), **kwargs)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(placements) == len(vertices)
+    return end - start
+
+
+def test_placements_memory_benchmark():
+    unittest_setup()
+    # Every core of a 16 x 16 machine
+    width = height = 16
+    vertices = [SimpleMachineVertex(None) for _ in range(width * height * 18)]
+    dict_bytes = _measure_placements(Placements, vertices, width)
+    array_bytes = _measure_placements(
+        ArrayPlacements, vertices, width, width=width, height=height,
+        n_processors=18)
+    print(f"Placements: {dict_bytes / len(vertices):.1f} bytes per core")
+    print(f"ArrayPlacements: {array_bytes / len(vertices):.1f} bytes per core")
+    assert array_bytes < dict_bytes
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -209,6 +209,11 @@ class TestRoutingTable(unittest.TestCase):
             "{0, 1, 2, 3, 4, 5}:{0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11}")
         assert mre == mrt.get_entry_on_coords_for_edge(
             source_vertex, partition_id, 0, 0)
+        assert mrt.remove_path_entry(1, 1, source_vertex, partition_id) is None
+        assert mrt.remove_path_entry(0, 0, source_vertex, "bar") is None
+        assert mrt.remove_path_entry(
+            0, 0, source_vertex, partition_id) is mre
+        assert list(mrt.get_routers()) == []
 
     def test_multicast_routing_table_by_partition_entry(self):
         with self.assertRaises(PacmanInvalidParameterException):
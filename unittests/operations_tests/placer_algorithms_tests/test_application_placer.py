@@ -11,6 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
+import tempfile
+import time
 from spinn_utilities.config_holder import set_config
 from spinn_machine.virtual_machine import virtual_machine
 from pacman.data.pacman_data_writer import PacmanDataWriter
@@ -19,6 +22,8 @@ from pacman.model.partitioner_splitters import (
     SplitterFixedLegacy, AbstractSplitterCommon)
 from pacman.operations.placer_algorithms.application_placer import (
     place_application_graph, ApplicationPlacer)
+from pacman.operations.placer_algorithms.placement_cache import (
+    PlacementCache)
 from pacman.model.graphs.machine import SimpleMachineVertex
 from pacman.model.resources import ConstantSDRAM
 from pacman.model.graphs.application import ApplicationVertex
@@ -272,3 +277,110 @@ def test_could_fit():
     writer.add_sample_monitor_vertex(monitor, True)
     placer = ApplicationPlacer(Placements())
     placer._check_could_fit(16, 500000)
+
+
+def _average_hops(machine, placements, vertices):
+    total = 0
+    n_pairs = 0
+    for source, target in zip(vertices, vertices[1:]):
+        for m_source in source.machine_vertices:
+            s_place = placements.get_placement_of_vertex(m_source)
+            for m_target in target.machine_vertices:
+                t_place = placements.get_placement_of_vertex(m_target)
+                total += machine.get_vector_length(
+                    (s_place.x, s_place.y), (t_place.x, t_place.y))
+                n_pairs += 1
+    return total / n_pairs
+
+
+def test_chip_order_hop_count_benchmark():
+    hops = dict()
+    for order in ("Column", "Hilbert", "Morton"):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+        set_config("Mapping", "placer_chip_order", order)
+        writer = PacmanDataWriter.mock()
+        vertices = [_make_vertices(writer, 1000, 8, 9, f"app_vertex_{i}")
+                    for i in range(120)]
+        machine = virtual_machine(48, 24)
+        writer.set_machine(machine)
+        placements = place_application_graph(Placements())
+        hops[order] = _average_hops(machine, placements, vertices)
+        print(f"{order}: average of {hops[order]:.2f} hops between the "
+              "vertices of consecutive application vertices")
+    assert hops["Hilbert"] < hops["Column"]
+    assert hops["Morton"] < hops["Column"]
+
+
+def _place_with_cache(cache_file, labels, sdrams=None):
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    set_config("Mapping", "placer_cache_file", cache_file)
+    writer = PacmanDataWriter.mock()
+    vertices = [
+        _make_vertices(writer, 1000, 3, 4, label,
+                       sdram=(sdrams or {}).get(label, 0))
+        for label in labels]
+    writer.set_machine(virtual_machine(12, 12))
+    placements = place_application_graph(Placements())
+    return {
+        vertex.label: [
+            placements.get_placement_of_vertex(m_vertex).location
+            for m_vertex in vertex.machine_vertices]
+        for vertex in vertices}
+
+
+def test_placement_cache():
+    labels = [f"app_vertex_{i}" for i in range(10)]
+    with tempfile.TemporaryDirectory() as directory:
+        cache_file = os.path.join(directory, "placements.json.gz")
+        first = _place_with_cache(cache_file, labels)
+        assert os.path.exists(cache_file)
+
+        # The same graph made again is placed the same
+        again = _place_with_cache(cache_file, labels)
+        assert first == again
+
+        # A new vertex placed first and a changed vertex are placed around
+        # the unchanged ones, which stay where they were
+        changed = _place_with_cache(
+            cache_file, ["new"] + labels, {"app_vertex_3": 100})
+        for label in labels:
+            if label != "app_vertex_3":
+                assert changed[label] == first[label]
+        locations = [location for locations in changed.values()
+                     for location in locations]
+        assert len(locations) == len(set(locations))
+
+        # Nothing is kept for a different machine
+        assert len(PlacementCache(cache_file, "other")) == 0
+
+
+def test_parallel_placement():
+    for n_processes, assign in ((1, "False"), (3, "False"), (3, "True")):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+        set_config("Mapping", "placer_n_processes", n_processes)
+        set_config("Mapping", "placer_board_assignment", assign)
+        writer = PacmanDataWriter.mock()
+        fixed = SimpleTestVertex(10, "FIXED", max_atoms_per_core=1)
+        fixed.splitter = SplitterFixedLegacy()
+        fixed.set_fixed_location(0, 0)
+        writer.add_vertex(fixed)
+        fixed.splitter.create_machine_vertices(ChipCounter())
+        for i in range(50):
+            _make_vertices(writer, 1000, 14, 5, f"app_vertex_{i}")
+        writer.set_machine(virtual_machine(24, 12))
+        start = time.perf_counter()
+        placements = place_application_graph(Placements())
+        print(f"{n_processes} processes, board assignment {assign}: "
+              f"{time.perf_counter() - start:.2f}s")
+        locations = set()
+        for app_vertex in writer.iterate_vertices():
+            for m_vertex in app_vertex.machine_vertices:
+                locations.add(
+                    placements.get_placement_of_vertex(m_vertex).location)
+        assert len(locations) == writer.get_n_machine_vertices()
+        for m_vertex in fixed.machine_vertices:
+            placement = placements.get_placement_of_vertex(m_vertex)
+            assert (placement.x, placement.y) == (0, 0)
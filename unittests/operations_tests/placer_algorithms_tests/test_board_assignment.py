@@ -0,0 +1,100 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from spinn_utilities.config_holder import set_config
+from spinn_machine import virtual_machine
+from pacman.config_setup import unittest_setup
+from pacman.data import PacmanDataView
+from pacman.data.pacman_data_writer import PacmanDataWriter
+from pacman.model.graphs.application import ApplicationEdge
+from pacman.model.placements import Placements
+from pacman.operations.placer_algorithms.application_placer import (
+    place_application_graph)
+from pacman.operations.placer_algorithms.board_assignment import (
+    assign_boards, board_order)
+from pacman.operations.placer_algorithms.chip_resources import (
+    ChipResources)
+from .test_application_placer import _make_vertices
+
+
+def _boards_of(placements, app_vertex):
+    machine = PacmanDataView.get_machine()
+    boards = set()
+    for m_vertex in app_vertex.machine_vertices:
+        chip = machine[placements.get_placement_of_vertex(m_vertex).xy]
+        boards.add((chip.nearest_ethernet_x, chip.nearest_ethernet_y))
+    return boards
+
+
+class TestBoardAssignment(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+
+    def test_board_order(self):
+        machine = virtual_machine(24, 12)
+        chips = board_order(sorted(machine.chips))
+        self.assertEqual(set(machine.chips), set(chips))
+        boards = [(chip.nearest_ethernet_x, chip.nearest_ethernet_y)
+                  for chip in chips]
+        # Each board is together
+        changes = sum(1 for a, b in zip(boards, boards[1:]) if a != b)
+        self.assertEqual(len(set(boards)) - 1, changes)
+
+    def test_assign_boards(self):
+        writer = PacmanDataWriter.mock()
+        writer.set_machine(virtual_machine(24, 12))
+        # Pairs of connected vertices, mixed up, and a vertex too big for
+        # any board
+        vertices = [_make_vertices(writer, 1000, 20, 10, f"app_vertex_{i}")
+                    for i in range(8)]
+        too_big = _make_vertices(writer, 1000, 50, 16, "too_big")
+        for i in range(4):
+            writer.add_edge(
+                ApplicationEdge(vertices[i], vertices[i + 4]), "Test")
+        machine = PacmanDataView.get_machine()
+        resources = ChipResources(sorted(machine.chips), 100)
+        boards = assign_boards(
+            vertices + [too_big], PacmanDataView.iterate_partitions(),
+            resources, 100)
+        self.assertNotIn(too_big, boards)
+        for i in range(4):
+            self.assertEqual(boards[vertices[i]], boards[vertices[i + 4]])
+        # Balanced: each board has at most two of the pairs
+        for board in set(boards.values()):
+            self.assertLessEqual(list(boards.values()).count(board), 4)
+
+    def test_placer(self):
+        set_config("Mapping", "placer_board_assignment", "True")
+        writer = PacmanDataWriter.mock()
+        writer.set_machine(virtual_machine(24, 12))
+        vertices = [_make_vertices(writer, 1000, 20, 10, f"app_vertex_{i}")
+                    for i in range(8)]
+        too_big = _make_vertices(writer, 1000, 50, 16, "too_big")
+        for i in range(4):
+            writer.add_edge(
+                ApplicationEdge(vertices[i], vertices[i + 4]), "Test")
+        placements = place_application_graph(Placements())
+        for i in range(4):
+            boards = _boards_of(placements, vertices[i])
+            self.assertEqual(1, len(boards))
+            self.assertEqual(boards, _boards_of(placements, vertices[i + 4]))
+        # Placed anyway, across boards
+        self.assertGreater(len(_boards_of(placements, too_big)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
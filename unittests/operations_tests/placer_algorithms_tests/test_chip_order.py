@@ -0,0 +1,74 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from spinn_utilities.config_holder import set_config
+from spinn_machine import virtual_machine
+from pacman.config_setup import unittest_setup
+from pacman.exceptions import PacmanConfigurationException
+from pacman.operations.placer_algorithms.chip_order import (
+    chip_order, hilbert_index, morton_index, COLUMN, HILBERT, MORTON)
+
+
+class TestChipOrder(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+
+    def test_curves(self):
+        n_bits = 3
+        side = 1 << n_bits
+        points = [(x, y) for x in range(side) for y in range(side)]
+        for curve in (hilbert_index, morton_index):
+            indices = sorted(curve(x, y, n_bits) for x, y in points)
+            self.assertEqual(list(range(side * side)), indices)
+        # Each step along a Hilbert curve is to a neighbouring point
+        hilbert = sorted(points, key=lambda xy: hilbert_index(*xy, n_bits))
+        for (x1, y1), (x2, y2) in zip(hilbert, hilbert[1:]):
+            self.assertEqual(1, abs(x1 - x2) + abs(y1 - y2))
+        self.assertEqual(
+            [(0, 0), (1, 0), (0, 1), (1, 1)],
+            sorted(points, key=lambda xy: morton_index(*xy, n_bits))[:4])
+
+    def test_chip_order(self):
+        machine = virtual_machine(24, 12)
+        column = chip_order(machine, COLUMN)
+        self.assertEqual(
+            [(x, y) for x in range(machine.width)
+             for y in range(machine.height) if machine.is_chip_at(x, y)],
+            [(chip.x, chip.y) for chip in column])
+        for order in (HILBERT, MORTON):
+            chips = chip_order(machine, order)
+            self.assertEqual(sorted(column), sorted(chips))
+            # Each board is visited once, starting at its Ethernet chip
+            boards = [
+                (chip.nearest_ethernet_x, chip.nearest_ethernet_y)
+                for chip in chips]
+            starts = [
+                board for i, board in enumerate(boards)
+                if i == 0 or boards[i - 1] != board]
+            self.assertEqual(len(machine.ethernet_connected_chips),
+                             len(starts))
+            self.assertEqual(len(set(starts)), len(starts))
+            for board in starts:
+                self.assertEqual(board, tuple(chips[boards.index(board)]))
+
+    def test_unknown_order(self):
+        with self.assertRaises(PacmanConfigurationException):
+            chip_order(virtual_machine(8, 8), "Spiral")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from spinn_utilities.config_holder import set_config
+from spinn_machine import virtual_machine
+from pacman.config_setup import unittest_setup
+from pacman.model.graphs.machine import SimpleMachineVertex
+from pacman.model.placements import Placement, Placements
+from pacman.model.resources import ConstantSDRAM
+from pacman.operations.placer_algorithms.chip_resources import (
+    ChipResources)
+
+
+class TestChipResources(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+
+    def test_tracks_placements(self):
+        machine = virtual_machine(8, 8)
+        chip = machine[1, 1]
+        n_cores = len(chip.placable_processors_ids)
+        system = Placements([Placement(
+            SimpleMachineVertex(ConstantSDRAM(1000)), 1, 1,
+            chip.placable_processors_ids[0])])
+        resources = ChipResources(sorted(machine.chips), 10, system)
+        self.assertEqual(n_cores - 1, resources.n_cores_free(chip))
+        self.assertEqual(chip.sdram - 1000, resources.sdram_free((1, 1)))
+        self.assertEqual(
+            list(chip.placable_processors_ids[1:]),
+            resources.cores_free(chip))
+
+        resources.add_placements([
+            Placement(SimpleMachineVertex(ConstantSDRAM(500)), 1, 1, p)
+            for p in chip.placable_processors_ids[1:3]])
+        self.assertEqual(n_cores - 3, resources.n_cores_free(chip))
+        self.assertEqual(chip.sdram - 2000, resources.sdram_free(chip))
+        self.assertEqual(
+            list(chip.placable_processors_ids[3:]),
+            resources.cores_free(chip))
+
+        # Other chips are untouched
+        other = machine[2, 1]
+        self.assertEqual(
+            len(other.placable_processors_ids),
+            resources.n_cores_free(other))
+        self.assertEqual(other.sdram, resources.sdram_free(other))
+
+    def test_first_fitting(self):
+        machine = virtual_machine(8, 8)
+        chips = sorted(machine.chips)
+        resources = ChipResources(chips, 10)
+        sdram = chips[0].sdram
+        self.assertEqual(0, resources.first_fitting(1, sdram))
+        self.assertEqual(3, resources.first_fitting(1, sdram, 3))
+        self.assertEqual(-1, resources.first_fitting(1, sdram + 1))
+        self.assertEqual(-1, resources.first_fitting(1, 0, len(chips)))
+
+        # Use up the cores of the first three chips and half the SDRAM of
+        # the fourth
+        for chip in chips[:3]:
+            resources.add_placements([
+                Placement(SimpleMachineVertex(ConstantSDRAM(0)),
+                          chip.x, chip.y, p)
+                for p in chip.placable_processors_ids])
+        chip = chips[3]
+        resources.add_placement(Placement(
+            SimpleMachineVertex(ConstantSDRAM(sdram // 2)), chip.x, chip.y,
+            chip.placable_processors_ids[0]))
+        self.assertEqual(3, resources.first_fitting(1, 0))
+        self.assertEqual(4, resources.first_fitting(1, sdram // 2 + 1))
+        n_cores = len(chip.placable_processors_ids)
+        self.assertEqual(4, resources.first_fitting(n_cores, 0))
+        self.assertEqual(3, resources.n_chips_without(1, 0))
+        self.assertEqual(4, resources.n_chips_without(1, sdram // 2 + 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
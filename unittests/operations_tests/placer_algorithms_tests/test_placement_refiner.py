@@ -0,0 +1,107 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from collections import defaultdict
+from spinn_utilities.config_holder import set_config
+from spinn_machine import virtual_machine
+from pacman.config_setup import unittest_setup
+from pacman.data import PacmanDataView
+from pacman.data.pacman_data_writer import PacmanDataWriter
+from pacman.model.graphs.application import ApplicationEdge
+from pacman.model.placements import Placements
+from pacman.operations.placer_algorithms.application_placer import (
+    place_application_graph)
+from pacman.operations.placer_algorithms.placement_refiner import (
+    refine_placements)
+from .test_application_placer import _make_vertices
+
+
+class TestPlacementRefiner(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+
+    def _check_placements(self, placements, vertices):
+        machine = PacmanDataView.get_machine()
+        topology = PacmanDataView.get_machine_topology()
+        plan_n_timesteps = PacmanDataView.get_plan_n_timestep()
+        sdram = defaultdict(int)
+        for placement in placements:
+            chip = machine[placement.x, placement.y]
+            self.assertIn(placement.p, chip.placable_processors_ids)
+            sdram[chip] += placement.vertex.sdram_required.get_total_sdram(
+                plan_n_timesteps)
+        for chip, used in sdram.items():
+            self.assertLessEqual(used, chip.sdram)
+        # Each group is on one chip, and the chips of each application
+        # vertex are connected
+        for vertex in vertices:
+            xys = set()
+            for group, _sdram in vertex.splitter.get_same_chip_groups():
+                group_xys = {
+                    (placements.get_placement_of_vertex(m_vertex).x,
+                     placements.get_placement_of_vertex(m_vertex).y)
+                    for m_vertex in group}
+                self.assertEqual(1, len(group_xys))
+                xys.update(group_xys)
+            to_visit = [xys.pop()]
+            while to_visit:
+                chip_id = topology.chip_id(to_visit.pop())
+                for next_id in topology.adjacency[chip_id]:
+                    if next_id != -1 and topology.xy(next_id) in xys:
+                        xys.remove(topology.xy(next_id))
+                        to_visit.append(topology.xy(next_id))
+            self.assertEqual(set(), xys)
+
+    def test_refine(self):
+        writer = PacmanDataWriter.mock()
+        # Clusters of connected vertices, added to the graph mixed up with
+        # each other so they aren't placed together
+        n_clusters = 4
+        vertices = [
+            _make_vertices(writer, 1000, 3, 5, f"app_vertex_{i}", sdram=100)
+            for i in range(n_clusters * 3)]
+        for i, source in enumerate(vertices):
+            for j, target in enumerate(vertices):
+                if i != j and i % n_clusters == j % n_clusters:
+                    writer.add_edge(ApplicationEdge(source, target), "Test")
+        writer.set_machine(virtual_machine(24, 12))
+        placements = place_application_graph(Placements())
+        refined = refine_placements(
+            placements, Placements(), 100, max_steps=2000, seed=1)
+        self.assertIsNot(placements, refined)
+        self.assertEqual(len(placements), len(refined))
+        self._check_placements(refined, vertices)
+
+    def test_nothing_to_refine(self):
+        writer = PacmanDataWriter.mock()
+        _make_vertices(writer, 1000, 3, 5, "no_edges")
+        placements = place_application_graph(Placements())
+        self.assertIs(placements, refine_placements(
+            placements, Placements(), 100, max_steps=100, seed=1))
+
+    def test_no_time(self):
+        writer = PacmanDataWriter.mock()
+        source = _make_vertices(writer, 1000, 3, 5, "source")
+        target = _make_vertices(writer, 1000, 3, 5, "target")
+        writer.add_edge(ApplicationEdge(source, target), "Test")
+        placements = place_application_graph(Placements())
+        self.assertIs(placements, refine_placements(
+            placements, Placements(), 0, seed=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from pacman.config_setup import unittest_setup
+from pacman.data import PacmanDataView
+from pacman.data.pacman_data_writer import PacmanDataWriter
+from pacman.exceptions import PacmanConfigurationException
+from pacman.model.graphs.application import ApplicationEdge
+from pacman.operations.placer_algorithms.vertex_order import (
+    vertex_order, BREADTH_FIRST, INSERTION)
+from pacman_test_objects import SimpleTestVertex
+
+
+class TestVertexOrder(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+
+    def test_breadth_first(self):
+        writer = PacmanDataWriter.mock()
+        vertices = [SimpleTestVertex(10, f"V{i}") for i in range(7)]
+        for vertex in vertices:
+            writer.add_vertex(vertex)
+        # 0 - 3 - 5 with 3 connected twice to 5, 1 - 4, 2 alone, 6 to 5
+        for pre, post, partition in [
+                (0, 3, "A"), (5, 3, "A"), (3, 5, "A"), (1, 4, "A"),
+                (6, 5, "A"), (0, 0, "A")]:
+            writer.add_edge(
+                ApplicationEdge(vertices[pre], vertices[post]), partition)
+        ordered = vertex_order(
+            PacmanDataView.iterate_vertices(),
+            PacmanDataView.iterate_partitions(), BREADTH_FIRST)
+        self.assertEqual(
+            [vertices[i] for i in (0, 3, 5, 6, 1, 4, 2)], ordered)
+        self.assertEqual(vertices, vertex_order(
+            PacmanDataView.iterate_vertices(),
+            PacmanDataView.iterate_partitions(), INSERTION))
+
+    def test_unknown_order(self):
+        with self.assertRaises(PacmanConfigurationException):
+            vertex_order([], [], "Random")
+
+
+if __name__ == '__main__':
+    unittest.main()
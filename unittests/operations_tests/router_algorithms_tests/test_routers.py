@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from collections import deque
+import tracemalloc
 from spinn_utilities.timer import Timer
 from spinn_utilities.config_holder import set_config
 from spinn_machine import virtual_machine
@@ -26,14 +28,22 @@ from pacman.model.partitioner_splitters import (
 from pacman.utilities.utility_objs import ChipCounter
 from pacman.operations.placer_algorithms.application_placer import (
     place_application_graph)
+from pacman.operations.placer_algorithms.placement_refiner import (
+    refine_placements)
 from pacman.operations.router_algorithms.application_router import (
-    route_application_graph, _path_without_errors)
+    reroute_around_faults, route_application_graph, _route_partition,
+    _route_to_xys, _RouterOptions)
+from pacman.utilities.algorithm_utilities.path_search import (
+    path_without_errors)
+from pacman.utilities.algorithm_utilities.routing_tree import RoutingTree
 from pacman.utilities.algorithm_utilities.routing_algorithm_utilities import (
     longest_dimension_first, get_app_partitions, vertex_xy,
     vertex_xy_and_route)
 from pacman.config_setup import unittest_setup
 from pacman.model.graphs.machine import SimpleMachineVertex
 from pacman.model.placements import Placements, Placement
+from pacman.model.routing_table_by_partition import (
+    MulticastRoutingTableByPartition)
 from pacman.model.resources import ConstantSDRAM
 from pacman.model.graphs.machine import (
     MachineFPGAVertex, MachineSpiNNakerLinkVertex)
@@ -43,8 +53,28 @@ import math
 import pytest
 
 
+def _route_with_ner():
+    set_config("Mapping", "router_engine", "NER")
+    return route_application_graph()
+
+
+def _route_straight():
+    set_config("Mapping", "router_prefer_straight", True)
+    return route_application_graph()
+
+
+def _route_with_detours():
+    # Any chip with an entry is avoided if possible
+    set_config("Mapping", "router_max_detour_hops", 4)
+    set_config("Mapping", "router_table_pressure", 0.0)
+    return route_application_graph()
+
+
 @pytest.fixture(params=[
-    (route_application_graph, 10, 50)])
+    (route_application_graph, 10, 50),
+    (_route_with_ner, 10, 50),
+    (_route_straight, 10, 50),
+    (_route_with_detours, 10, 50)])
 def params(request):
     return request.param
 
@@ -800,14 +830,492 @@ def test_route_around():
     machine = virtual_machine(8, 8)
     vector = machine.get_vector((0, 0), (6, 6))
     PacmanDataWriter.mock().set_machine(machine)
+    topology = PacmanDataView.get_machine_topology()
     nodes = longest_dimension_first(vector, (0, 0))
-    nodes_fixed = _path_without_errors((0, 0), nodes, machine)
+    nodes_fixed = path_without_errors((0, 0), nodes, topology)
     _check_path((0, 0), nodes_fixed, machine, (6, 6))
 
     vector = machine.get_vector((2, 2), (6, 6))
     nodes = longest_dimension_first(vector, (2, 2))
-    nodes_fixed = _path_without_errors((2, 2), nodes, machine)
+    nodes_fixed = path_without_errors((2, 2), nodes, topology)
     _check_path((2, 2), nodes_fixed, machine, (6, 6))
 
     print(nodes)
     print(nodes_fixed)
+
+
+def _route_to_xys_with_path_copies(
+        first_xy, all_xys, topology, routes, targets, label):
+    # The previous search, which copied the path to every chip explored;
+    # kept as a reference for the benchmark below
+    chip_ids = topology.chip_ids
+    xys = topology.xys
+    open_ids = {chip_ids[xy] for xy in all_xys}
+    to_explore = deque([(chip_ids[first_xy], list())])
+    visited = set()
+    while to_explore:
+        chip_id, path = to_explore.popleft()
+        if chip_id in visited:
+            continue
+        visited.add(chip_id)
+        xy = xys[chip_id]
+        if xy in routes:
+            path = list()
+        elif xy in targets:
+            routes[xy] = RoutingTree(xy, label)
+            last_route = routes[xy]
+            for parent_id, link in reversed(path):
+                parent = xys[parent_id]
+                if parent not in routes:
+                    routes[parent] = RoutingTree(parent, label)
+                routes[parent].append_child((link, last_route))
+                last_route = routes[parent]
+            path = list()
+        for link, next_id in enumerate(topology.adjacency[chip_id]):
+            if next_id in open_ids and next_id not in visited:
+                new_path = list(path)
+                new_path.append((chip_id, link))
+                to_explore.append((next_id, new_path))
+
+
+def _tree_links(routes):
+    return {(xy, link, child.chip)
+            for xy, tree in routes.items()
+            for link, child in tree.children}
+
+
+def _measure(search, topology, all_xys, targets):
+    routes = dict()
+    tracemalloc.start()
+    timer = Timer()
+    with timer:
+        search((0, 0), all_xys, topology, routes, targets, "bench")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return routes, timer.measured_interval, peak
+
+
+def test_route_to_xys_benchmark():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    PacmanDataWriter.mock().set_machine(virtual_machine(48, 24))
+    topology = PacmanDataView.get_machine_topology()
+    all_xys = set(topology.xys)
+    # A few targets far from the source so that the search paths are long
+    targets = {xy for xy in all_xys if xy[0] >= 44 and xy[1] >= 20}
+
+    old_routes, old_time, old_peak = _measure(
+        _route_to_xys_with_path_copies, topology, all_xys, targets)
+    new_routes, new_time, new_peak = _measure(
+        _route_to_xys, topology, all_xys, targets)
+    print(f"Path copies: {old_time}, peak {old_peak} bytes")
+    print(f"Parent pointers: {new_time}, peak {new_peak} bytes")
+
+    assert old_routes.keys() == new_routes.keys()
+    assert _tree_links(old_routes) == _tree_links(new_routes)
+    assert new_peak < old_peak
+
+
+def _dump_tables(routing_tables):
+    return [
+        ((x, y), [
+            (source, partition_id, entry.spinnaker_route,
+             entry.incoming_link, entry.incoming_processor)
+            for (source, partition_id), entry in
+            routing_tables.get_entries_for_router(x, y).items()])
+        for (x, y) in routing_tables.get_routers()]
+
+
+def test_parallel_matches_serial():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    for i in range(6):
+        _make_vertices_split(writer, 1000, 3, 2, 10, f"app_vertex_{i}",
+                             internal_multicast=(i % 2 == 0))
+    for source in writer.iterate_vertices():
+        for target in writer.iterate_vertices():
+            writer.add_edge(ApplicationEdge(source, target), "Test")
+    writer.set_placements(place_application_graph(Placements()))
+
+    serial = route_application_graph()
+    set_config("Mapping", "router_n_processes", 3)
+    parallel = route_application_graph()
+    _check_edges(parallel)
+    assert _dump_tables(serial) == _dump_tables(parallel)
+
+
+def test_path_cache_matches_uncached():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    set_config("Machine", "down_chips", "2,3:3,2:5,5")
+    writer = PacmanDataWriter.mock()
+    for i in range(6):
+        _make_vertices(writer, 1000, 20, f"app_vertex_{i}")
+    for source in writer.iterate_vertices():
+        for target in writer.iterate_vertices():
+            writer.add_edge(ApplicationEdge(source, target), "Test")
+    writer.set_placements(place_application_graph(Placements()))
+
+    set_config("Mapping", "router_path_cache_size", 0)
+    uncached = route_application_graph()
+    set_config("Mapping", "router_path_cache_size", 100)
+    cached = route_application_graph()
+    path_cache = PacmanDataView.get_machine_topology().path_cache
+    assert path_cache.hits > 0
+    assert len(path_cache) <= 100
+    _check_edges(cached)
+    assert _dump_tables(uncached) == _dump_tables(cached)
+
+
+def test_incremental_matches_full():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    vertices = [_make_vertices(writer, 1000, 10, f"app_vertex_{i}")
+                for i in range(6)]
+    for i, source in enumerate(vertices):
+        writer.add_edge(ApplicationEdge(source, vertices[i - 1]), "Test")
+        writer.add_edge(ApplicationEdge(source, vertices[i - 2]), "Other")
+    writer.set_placements(place_application_graph(Placements()))
+
+    set_config("Mapping", "router_incremental", True)
+    first = route_application_graph()
+    assert len(PacmanDataView.get_partition_routes_cache()) == 12
+    set_config("Mapping", "router_incremental", False)
+    assert _dump_tables(first) == _dump_tables(route_application_graph())
+
+    # Change one partition; only that should be routed again
+    writer.add_edge(ApplicationEdge(vertices[0], vertices[3]), "Test")
+    set_config("Mapping", "router_incremental", True)
+    second = route_application_graph()
+    set_config("Mapping", "router_incremental", False)
+    full = route_application_graph()
+    _check_edges(second)
+    assert _dump_tables(second) == _dump_tables(full)
+
+    changed = 0
+    for (x, y) in first.get_routers():
+        for (source, partition_id), entry in \
+                first.get_entries_for_router(x, y).items():
+            if isinstance(source, ApplicationVertex):
+                app_vertex = source
+            else:
+                app_vertex = source.app_vertex
+            if app_vertex == vertices[0] and partition_id == "Test":
+                changed += entry is not second.get_entry_on_coords_for_edge(
+                    source, partition_id, x, y)
+            else:
+                assert entry is second.get_entry_on_coords_for_edge(
+                    source, partition_id, x, y)
+    assert changed > 0
+
+
+def test_reroute_around_faults():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    vertices = [_make_vertices(writer, 1000, 10, f"app_vertex_{i}")
+                for i in range(6)]
+    for i, source in enumerate(vertices):
+        writer.add_edge(ApplicationEdge(source, vertices[i - 3]), "Test")
+    writer.set_placements(place_application_graph(Placements()))
+    set_config("Mapping", "router_incremental", True)
+    routing_tables = route_application_graph()
+    before = {(xy, key): entry for xy in routing_tables.get_routers()
+              for key, entry in
+              routing_tables.get_entries_for_router(*xy).items()}
+
+    # Fail a link that a route uses
+    (x, y), link = next(
+        (xy, link) for (xy, _key), entry in before.items()
+        for link in entry.link_ids)
+    rerouted = reroute_around_faults(routing_tables, failed_links=[
+        (x, y, link)])
+    assert rerouted
+    for entry in routing_tables.get_entries_for_router(x, y).values():
+        assert link not in entry.link_ids
+    _check_edges(routing_tables)
+
+    # Partitions not routed again keep exactly the same entries
+    kept_sources = {
+        (p.pre_vertex, p.identifier) for p in get_app_partitions()
+        if p not in rerouted}
+    for (xy, (source, partition_id)), entry in before.items():
+        app_vertex = (source if isinstance(source, ApplicationVertex)
+                      else source.app_vertex)
+        if (app_vertex, partition_id) in kept_sources:
+            assert entry is routing_tables.get_entry_on_coords_for_edge(
+                source, partition_id, *xy)
+
+
+def _uses_link(routing_tables, x, y, link):
+    machine = PacmanDataView.get_machine()
+    other_x, other_y = machine.xy_over_link(x, y, link)
+    back_link = (link + 3) % 6
+    return any(
+        link in entry.link_ids
+        for entry in routing_tables.get_entries_for_router(x, y).values()
+    ) or any(
+        back_link in entry.link_ids
+        for entry in routing_tables.get_entries_for_router(
+            other_x, other_y).values())
+
+
+def test_reroute_around_faults_twice():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    vertices = [_make_vertices(writer, 1000, 10, f"app_vertex_{i}")
+                for i in range(6)]
+    for i, source in enumerate(vertices):
+        writer.add_edge(ApplicationEdge(source, vertices[i - 3]), "Test")
+    writer.set_placements(place_application_graph(Placements()))
+    set_config("Mapping", "router_incremental", True)
+    routing_tables = route_application_graph()
+
+    # Fail a link that a route uses, then another link of the same chip
+    # that a route uses after that; no route may go back over either
+    (x, y), link = next(
+        (xy, link) for xy in routing_tables.get_routers()
+        for entry in routing_tables.get_entries_for_router(*xy).values()
+        for link in entry.link_ids)
+    assert reroute_around_faults(routing_tables, failed_links=[(x, y, link)])
+    assert not _uses_link(routing_tables, x, y, link)
+    link_2 = next(
+        link for entry in routing_tables.get_entries_for_router(
+            x, y).values() for link in entry.link_ids)
+    assert reroute_around_faults(
+        routing_tables, failed_links=[(x, y, link_2)])
+    assert not _uses_link(routing_tables, x, y, link)
+    assert not _uses_link(routing_tables, x, y, link_2)
+    _check_edges(routing_tables)
+
+
+def _count_entries_and_hops(routing_tables):
+    n_entries = 0
+    n_hops = 0
+    for (x, y) in routing_tables.get_routers():
+        for entry in routing_tables.get_entries_for_router(x, y).values():
+            n_entries += 1
+            n_hops += len(entry.link_ids)
+    return n_entries, n_hops
+
+
+def _clustered_graph(writer, n_clusters, cluster_size, n_machine_vertices):
+    """
+    Add clusters of all to all connected vertices to the graph, mixed up
+    with each other so that adding them in order places them apart.
+    """
+    vertices = [
+        _make_vertices(writer, 1000, n_machine_vertices, f"app_vertex_{i}")
+        for i in range(n_clusters * cluster_size)]
+    for i, source in enumerate(vertices):
+        for j, target in enumerate(vertices):
+            if i != j and i % n_clusters == j % n_clusters:
+                writer.add_edge(ApplicationEdge(source, target), "Test")
+    return vertices
+
+
+def test_ner_benchmark():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    vertices = [_make_vertices(writer, 1000, 20, f"app_vertex_{i}")
+                for i in range(30)]
+    for i, source in enumerate(vertices):
+        for step in (1, 7, 13, 19):
+            writer.add_edge(ApplicationEdge(
+                source, vertices[(i + step) % len(vertices)]), "Test")
+    writer.set_placements(place_application_graph(Placements()))
+
+    default_tables = _route_and_time(route_application_graph)
+    ner_tables = _route_and_time(_route_with_ner)
+    _check_edges(ner_tables)
+    default_entries, default_hops = _count_entries_and_hops(default_tables)
+    ner_entries, ner_hops = _count_entries_and_hops(ner_tables)
+    print(f"Default: {default_entries} entries, {default_hops} link hops")
+    print(f"NER: {ner_entries} entries, {ner_hops} link hops")
+    assert ner_hops <= default_hops
+
+
+def _count_defaultable(routing_tables):
+    return sum(
+        entry.defaultable
+        for (x, y) in routing_tables.get_routers()
+        for entry in routing_tables.get_entries_for_router(x, y).values())
+
+
+def test_prefer_straight_benchmark():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    vertices = [_make_vertices(writer, 1000, 20, f"app_vertex_{i}")
+                for i in range(30)]
+    for i, source in enumerate(vertices):
+        for step in (1, 7, 13, 19):
+            writer.add_edge(ApplicationEdge(
+                source, vertices[(i + step) % len(vertices)]), "Test")
+    writer.set_placements(place_application_graph(Placements()))
+
+    default_tables = _route_and_time(route_application_graph)
+    straight_tables = _route_and_time(_route_straight)
+    _check_edges(straight_tables)
+    default_entries, default_hops = _count_entries_and_hops(default_tables)
+    straight_entries, straight_hops = _count_entries_and_hops(
+        straight_tables)
+    n_default = _count_defaultable(default_tables)
+    n_straight = _count_defaultable(straight_tables)
+    print(f"Default: {default_entries} entries, {n_default} defaultable, "
+          f"{default_hops} link hops")
+    print(f"Straight: {straight_entries} entries, {n_straight} defaultable, "
+          f"{straight_hops} link hops")
+    assert n_straight > n_default
+    assert straight_entries - n_straight <= default_entries - n_default
+
+
+def _max_entries(routing_tables):
+    return max(
+        len(routing_tables.get_entries_for_router(x, y))
+        for (x, y) in routing_tables.get_routers())
+
+
+def test_table_pressure_benchmark():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    writer.set_machine(virtual_machine(12, 12))
+    # Sources down the west edge each send to the chip mirrored on the east
+    # edge, so that the paths all cross in the middle of the machine
+    placements = Placements()
+    for y in range(12):
+        for p in range(1, 5):
+            source = _make_vertices(writer, 10, 1, f"source_{y}_{p}")
+            target = _make_vertices(writer, 10, 1, f"target_{y}_{p}")
+            placements.add_placement(Placement(
+                next(iter(source.machine_vertices)), 0, y, p))
+            placements.add_placement(Placement(
+                next(iter(target.machine_vertices)), 11, 11 - y, p))
+            writer.add_edge(ApplicationEdge(source, target), "Test")
+    writer.set_placements(placements)
+
+    default_tables = _route_and_time(route_application_graph)
+    default_max = _max_entries(default_tables)
+
+    # Avoid chips with at least half the most entries of any chip
+    n_entries = writer.get_machine()[0, 0].router.n_available_multicast_entries
+    set_config("Mapping", "router_max_detour_hops", 2)
+    set_config("Mapping", "router_table_pressure",
+               default_max / (2 * n_entries))
+    steered_tables = _route_and_time(route_application_graph)
+    _check_edges(steered_tables)
+    steered_max = _max_entries(steered_tables)
+    default_entries, default_hops = _count_entries_and_hops(default_tables)
+    steered_entries, steered_hops = _count_entries_and_hops(steered_tables)
+    print(f"Default: {default_entries} entries, at most {default_max} "
+          f"on a chip, {default_hops} link hops")
+    print(f"Steered: {steered_entries} entries, at most {steered_max} "
+          f"on a chip, {steered_hops} link hops")
+    assert steered_max < default_max
+
+
+def test_shared_partitions_match_separate():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    vertices = [
+        _make_vertices_split(writer, 1000, 3, 2, 10, f"app_vertex_{i}",
+                             internal_multicast=(i % 2 == 0))
+        for i in range(6)]
+    for i, source in enumerate(vertices):
+        # Partitions with the same targets
+        for partition_id in ("A", "B", "C"):
+            for target in vertices[i:i + 3]:
+                writer.add_edge(ApplicationEdge(source, target), partition_id)
+        # A partition with different targets
+        writer.add_edge(ApplicationEdge(source, vertices[i - 1]), "D")
+    writer.set_placements(place_application_graph(Placements()))
+
+    shared = _route_and_time(route_application_graph)
+    _check_edges(shared)
+    separate = MulticastRoutingTableByPartition()
+    topology = PacmanDataView.get_machine_topology()
+    options = _RouterOptions()
+    for partition in get_app_partitions():
+        _route_partition(partition, topology, separate, options)
+    assert _dump_tables(shared) == _dump_tables(separate)
+
+    set_config("Mapping", "router_n_processes", 3)
+    set_config("Mapping", "router_incremental", True)
+    assert _dump_tables(shared) == _dump_tables(route_application_graph())
+
+
+def test_vertex_order_benchmark():
+    results = dict()
+    for order in ("Insertion", "BreadthFirst"):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+        set_config("Mapping", "placer_vertex_order", order)
+        writer = PacmanDataWriter.mock()
+        _clustered_graph(writer, 8, 5, 10)
+        writer.set_placements(place_application_graph(Placements()))
+        routing_tables = _route_and_time(route_application_graph)
+        _check_edges(routing_tables)
+        results[order] = _count_entries_and_hops(routing_tables)
+        print(f"{order}: {results[order][0]} entries, "
+              f"{results[order][1]} link hops")
+    assert results["BreadthFirst"][0] < results["Insertion"][0]
+
+
+def test_placement_refinement_benchmark():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    writer = PacmanDataWriter.mock()
+    _clustered_graph(writer, 8, 5, 10)
+    placements = place_application_graph(Placements())
+    writer.set_placements(placements)
+    routing_tables = _route_and_time(route_application_graph)
+    before = _count_entries_and_hops(routing_tables)
+
+    writer.set_placements(refine_placements(
+        placements, Placements(), 100, max_steps=20000, seed=0))
+    routing_tables = _route_and_time(route_application_graph)
+    _check_edges(routing_tables)
+    after = _count_entries_and_hops(routing_tables)
+    print(f"Placed: {before[0]} entries, {before[1]} link hops")
+    print(f"Refined: {after[0]} entries, {after[1]} link hops")
+    assert after[0] < before[0]
+
+
+def _count_board_crossings(routing_tables):
+    machine = PacmanDataView.get_machine()
+    n_crossings = 0
+    for (x, y) in routing_tables.get_routers():
+        chip = machine[x, y]
+        for entry in routing_tables.get_entries_for_router(x, y).values():
+            for link in entry.link_ids:
+                other = machine[machine.xy_over_link(x, y, link)]
+                if (other.nearest_ethernet_x, other.nearest_ethernet_y) != (
+                        chip.nearest_ethernet_x, chip.nearest_ethernet_y):
+                    n_crossings += 1
+    return n_crossings
+
+
+def test_board_assignment_benchmark():
+    results = dict()
+    for assign in ("False", "True"):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+        set_config("Mapping", "placer_board_assignment", assign)
+        writer = PacmanDataWriter.mock()
+        writer.set_machine(virtual_machine(24, 12))
+        # Clusters each about the size of a board
+        _clustered_graph(writer, 6, 4, 30)
+        writer.set_placements(place_application_graph(Placements()))
+        routing_tables = _route_and_time(route_application_graph)
+        _check_edges(routing_tables)
+        n_entries, n_hops = _count_entries_and_hops(routing_tables)
+        results[assign] = _count_board_crossings(routing_tables)
+        print(f"Board assignment {assign}: {n_entries} entries, {n_hops} "
+              f"link hops, {results[assign]} between boards")
+    assert results["True"] < results["False"]
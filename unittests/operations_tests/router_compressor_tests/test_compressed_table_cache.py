@@ -0,0 +1,121 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy
+
+from spinn_utilities.config_holder import set_config
+from spinn_machine import MulticastRoutingEntry, virtual_machine
+from pacman.config_setup import unittest_setup
+from pacman.data.pacman_data_writer import PacmanDataWriter
+from pacman.model.routing_tables import (
+    MulticastRoutingTables, UnCompressedMulticastRoutingTable)
+from pacman.model.routing_tables.multicast_routing_tables import from_json
+from pacman.operations.router_compressors import pair_compressor
+from pacman.operations.router_compressors.compressed_table_cache import (
+    CompressedTableCache)
+from pacman.operations.router_compressors.parallel_compression import (
+    ENTRY_DTYPE)
+
+
+def _entries(n_entries):
+    return numpy.array(
+        [(i, 0xFFFFFFFF, 1 << (i % 3), False) for i in range(n_entries)],
+        dtype=ENTRY_DTYPE)
+
+
+class TestCompressedTableCache(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+
+    def test_memory(self):
+        cache = CompressedTableCache()
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", _entries(3))
+        self.assertTrue(numpy.array_equal(cache.get("a"), _entries(3)))
+
+    def test_directory_and_trim(self):
+        with tempfile.TemporaryDirectory() as directory:
+            size = len(_entries(100).tobytes())
+            cache = CompressedTableCache(directory, 3 * size)
+            for name in "abcd":
+                cache.put(name, _entries(100))
+                # Make sure the times of the files differ
+                time.sleep(0.01)
+            # Using a keeps it when trimming
+            again = CompressedTableCache(directory, 3 * size)
+            self.assertTrue(numpy.array_equal(
+                again.get("a"), _entries(100)))
+            again.trim()
+            kept = CompressedTableCache(directory, 3 * size)
+            self.assertIsNotNone(kept.get("a"))
+            self.assertIsNone(kept.get("b"))
+            self.assertIsNotNone(kept.get("d"))
+
+    def test_key(self):
+        entries = [
+            MulticastRoutingEntry(
+                key, 0xFFFFFFFF, defaultable=False, spinnaker_route=route)
+            for key, route in ((1, 2), (2, 2), (3, 4))]
+        table_1 = UnCompressedMulticastRoutingTable(0, 0)
+        for entry in entries:
+            table_1.add_multicast_routing_entry(entry)
+        table_2 = UnCompressedMulticastRoutingTable(1, 1)
+        for entry in reversed(entries):
+            table_2.add_multicast_routing_entry(entry)
+        self.assertEqual(CompressedTableCache.key(table_1, "Pair"),
+                         CompressedTableCache.key(table_2, "Pair"))
+        self.assertNotEqual(CompressedTableCache.key(table_1, "Pair"),
+                            CompressedTableCache.key(table_1, "Other"))
+
+    def test_pair_compressor(self):
+        class_file = sys.modules[self.__module__].__file__
+        path = os.path.dirname(os.path.abspath(class_file))
+        original_tables = from_json(os.path.join(path, "many_to_one.json.gz"))
+        # Each table twice, on different chips
+        tables = MulticastRoutingTables()
+        for table in original_tables:
+            tables.add_routing_table(table)
+            copy = UnCompressedMulticastRoutingTable(table.x + 24, table.y)
+            for entry in table.multicast_routing_entries:
+                copy.add_multicast_routing_entry(entry)
+            tables.add_routing_table(copy)
+        set_config(
+            "Mapping", "router_table_compress_as_far_as_possible", True)
+        writer = PacmanDataWriter.mock()
+        writer.set_precompressed(tables)
+        writer.set_machine(virtual_machine(48, 24))
+        expected = pair_compressor()
+        with tempfile.TemporaryDirectory() as directory:
+            set_config("Mapping", "compressor_cache_directory", directory)
+            for _ in range(2):
+                compressed = pair_compressor()
+                for table in tables:
+                    self.assertListEqual(
+                        list(expected.get_routing_table_for_chip(
+                            table.x, table.y).multicast_routing_entries),
+                        list(compressed.get_routing_table_for_chip(
+                            table.x, table.y).multicast_routing_entries))
+            self.assertEqual(len(os.listdir(directory)),
+                             len(original_tables.routing_tables))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@
 
 import os
 import sys
+import time
 import unittest
 
 from spinn_utilities.config_holder import set_config
@@ -21,10 +22,13 @@ from spinn_machine import virtual_machine
 from pacman.config_setup import unittest_setup
 from pacman.data.pacman_data_writer import PacmanDataWriter
 from pacman.model.routing_tables.multicast_routing_tables import (from_json)
+from pacman.model.routing_tables.uncompressed_multicast_routing_table import (
+    from_csv)
+from pacman.operations.router_compressors import RTEntry
 from pacman.operations.router_compressors.routing_compression_checker import (
     compare_tables)
 from pacman.operations.router_compressors.ordered_covering_router_compressor \
-    import ordered_covering_compressor
+    import ordered_covering, ordered_covering_compressor
 
 
 class TestOrderedCoveringCompressor(unittest.TestCase):
@@ -48,3 +52,32 @@ class TestOrderedCoveringCompressor(unittest.TestCase):
             compressed = compressed_tables.get_routing_table_for_chip(
                 original.x, original.y)
             compare_tables(original, compressed)
+
+    def test_oc_big_incremental(self):
+        set_config("Mapping", "ordered_covering_incremental", True)
+        self.test_oc_big()
+
+    def test_incremental_same(self):
+        class_file = sys.modules[self.__module__].__file__
+        path = os.path.dirname(os.path.abspath(class_file))
+        for name in ("table1.csv.gz", "table2.csv.gz"):
+            table = from_csv(os.path.join(path, name))
+            entries = [
+                RTEntry.from_multicast_routing_entry(entry)
+                for entry in list(table.multicast_routing_entries)[:2000]]
+            start = time.time()
+            original, original_aliases = ordered_covering(
+                list(entries), None, {})
+            middle = time.time()
+            incremental, incremental_aliases = ordered_covering(
+                list(entries), None, {}, incremental=True)
+            end = time.time()
+            print(f"{name}: {len(entries)} -> {len(original)} entries; "
+                  f"original {middle - start:.2f}s "
+                  f"incremental {end - middle:.2f}s")
+            self.assertEqual(
+                [(e.key, e.mask, e.defaultable, e.spinnaker_route)
+                 for e in original],
+                [(e.key, e.mask, e.defaultable, e.spinnaker_route)
+                 for e in incremental])
+            self.assertEqual(original_aliases, incremental_aliases)
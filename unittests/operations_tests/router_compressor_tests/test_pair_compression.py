@@ -20,6 +20,7 @@ from spinn_utilities.config_holder import set_config
 from spinn_machine import virtual_machine
 from pacman.config_setup import unittest_setup
 from pacman.data.pacman_data_writer import PacmanDataWriter
+from pacman.exceptions import PacmanConfigurationException
 from pacman.model.routing_tables.multicast_routing_tables import (from_json)
 from pacman.operations.router_compressors.routing_compression_checker import (
     compare_tables)
@@ -52,3 +53,52 @@ class TestPairCompressor(unittest.TestCase):
 
     def test_pair_big_python_sort(self):
         self.do_pair_big(False)
+
+    def test_pair_big_vectorised(self):
+        class_file = sys.modules[self.__module__].__file__
+        path = os.path.dirname(os.path.abspath(class_file))
+        j_router = os.path.join(path, "many_to_one.json.gz")
+        original_tables = from_json(j_router)
+        writer = PacmanDataWriter.mock()
+        writer.set_precompressed(original_tables)
+        writer.set_machine(virtual_machine(24, 24))
+
+        for ordered in (True, False):
+            expected_tables = pair_compressor(
+                ordered=ordered, accept_overflow=True)
+            compressed_tables = pair_compressor(
+                ordered=ordered, accept_overflow=True, vectorised=True)
+            for original in original_tables:
+                expected = expected_tables.get_routing_table_for_chip(
+                    original.x, original.y)
+                compressed = compressed_tables.get_routing_table_for_chip(
+                    original.x, original.y)
+                self.assertListEqual(
+                    list(expected.multicast_routing_entries),
+                    list(compressed.multicast_routing_entries))
+                compare_tables(original, compressed)
+
+    def test_vectorised_c_sort(self):
+        with self.assertRaises(PacmanConfigurationException):
+            pair_compressor(c_sort=True, vectorised=True)
+
+    def test_pair_big_parallel(self):
+        class_file = sys.modules[self.__module__].__file__
+        path = os.path.dirname(os.path.abspath(class_file))
+        j_router = os.path.join(path, "many_to_one.json.gz")
+        original_tables = from_json(j_router)
+        writer = PacmanDataWriter.mock()
+        writer.set_precompressed(original_tables)
+        writer.set_machine(virtual_machine(24, 24))
+
+        expected_tables = pair_compressor()
+        set_config("Mapping", "compressor_n_processes", 3)
+        compressed_tables = pair_compressor()
+        for original in original_tables:
+            expected = expected_tables.get_routing_table_for_chip(
+                original.x, original.y)
+            compressed = compressed_tables.get_routing_table_for_chip(
+                original.x, original.y)
+            self.assertListEqual(
+                list(expected.multicast_routing_entries),
+                list(compressed.multicast_routing_entries))
@@ -17,8 +17,10 @@ import sys
 import unittest
 from spinn_utilities.config_holder import set_config
 from pacman.config_setup import unittest_setup
+from pacman.data import PacmanDataView
 from pacman.data.pacman_data_writer import PacmanDataWriter
-from pacman.model.routing_tables import MulticastRoutingTables
+from pacman.model.routing_tables import (
+    MulticastRoutingTables, UnCompressedMulticastRoutingTable)
 from pacman.model.routing_tables.uncompressed_multicast_routing_table import (
     from_csv)
 from pacman.operations.router_compressors import (
@@ -54,6 +56,39 @@ class TestRangeCompressor(unittest.TestCase):
         c_table = compressed.get_routing_table_for_chip(0, 0)
         compare_tables(table, c_table)
 
+    def test_tables_parallel(self):
+        tables = MulticastRoutingTables()
+        path = os.path.dirname(sys.modules[self.__module__].__file__)
+        for name, y in (("table1.csv.gz", 0), ("table2.csv.gz", 1)):
+            table = from_csv(os.path.join(path, name))
+            parallel_table = UnCompressedMulticastRoutingTable(0, y)
+            for entry in table.multicast_routing_entries:
+                parallel_table.add_multicast_routing_entry(entry)
+            tables.add_routing_table(parallel_table)
+        PacmanDataWriter.mock().set_uncompressed(tables)
+        expected = range_compressor()
+        set_config("Mapping", "compressor_n_processes", 2)
+        compressed = range_compressor()
+        for table in tables:
+            c_table = compressed.get_routing_table_for_chip(table.x, table.y)
+            self.assertListEqual(
+                list(expected.get_routing_table_for_chip(
+                    table.x, table.y).multicast_routing_entries),
+                list(c_table.multicast_routing_entries))
+            compare_tables(table, c_table)
+
+    def test_cache_settings(self):
+        table = UnCompressedMulticastRoutingTable(0, 0)
+        compressor = RangeCompressor()
+        self.assertEqual("RangeCompressor(target_length=None)",
+                         compressor.cache_settings(table))
+        set_config(
+            "Mapping", "router_table_compress_as_far_as_possible", False)
+        target = PacmanDataView.get_chip_at(
+            0, 0).router.n_available_multicast_entries
+        self.assertEqual(f"RangeCompressor(target_length={target})",
+                         compressor.cache_settings(table))
+
 
 if __name__ == '__main__':
     unittest.main()
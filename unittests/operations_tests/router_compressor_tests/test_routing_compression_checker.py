@@ -0,0 +1,80 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from spinn_machine import MulticastRoutingEntry
+from pacman.config_setup import unittest_setup
+from pacman.exceptions import PacmanRoutingException
+from pacman.model.routing_tables import (
+    CompressedMulticastRoutingTable, UnCompressedMulticastRoutingTable)
+from pacman.operations.router_compressors.routing_compression_checker import (
+    codify, codify_table, compare_route, compare_tables)
+
+
+def _table(table, entries):
+    for key, mask, route, defaultable in entries:
+        table.add_multicast_routing_entry(MulticastRoutingEntry(
+            key, mask, defaultable=defaultable, spinnaker_route=route))
+    return table
+
+
+class TestRoutingCompressionChecker(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+        self.original = _table(UnCompressedMulticastRoutingTable(0, 0), [
+            (0b0000, 0xFFFFFFFF, 1, False),
+            (0b0001, 0xFFFFFFFF, 1, False),
+            (0b0010, 0xFFFFFFFE, 1, True),
+            (0b0100, 0xFFFFFFFF, 2, False)])
+
+    def test_codify(self):
+        entry = MulticastRoutingEntry(
+            0b0100, 0xFFFFFFF5, defaultable=False, spinnaker_route=1)
+        self.assertEqual("0" * 28 + "*1*0", codify(entry))
+        self.assertEqual("*1*0", codify(entry, 4))
+
+    def test_good(self):
+        compressed = _table(CompressedMulticastRoutingTable(0, 0), [
+            (0b0100, 0xFFFFFFFF, 2, False),
+            (0b0000, 0xFFFFFFF8, 1, False)])
+        compare_tables(self.original, compressed)
+        compressed_dict = codify_table(compressed)
+        for route in self.original.multicast_routing_entries:
+            compare_route(route, compressed_dict)
+
+    def test_defaultable_dropped(self):
+        compressed = _table(CompressedMulticastRoutingTable(0, 0), [
+            (0b0100, 0xFFFFFFFF, 2, False),
+            (0b0000, 0xFFFFFFFE, 1, False)])
+        compare_tables(self.original, compressed)
+
+    def test_wrong_order(self):
+        compressed = _table(CompressedMulticastRoutingTable(0, 0), [
+            (0b0000, 0xFFFFFFF8, 1, False),
+            (0b0100, 0xFFFFFFFF, 2, False)])
+        with self.assertRaisesRegex(
+                PacmanRoutingException, "different link_ids"):
+            compare_tables(self.original, compressed)
+
+    def test_missing(self):
+        compressed = _table(CompressedMulticastRoutingTable(0, 0), [
+            (0b0100, 0xFFFFFFFF, 2, False),
+            (0b0000, 0xFFFFFFFF, 1, False)])
+        with self.assertRaisesRegex(PacmanRoutingException, "No route found"):
+            compare_tables(self.original, compressed)
+
+
+if __name__ == '__main__':
+    unittest.main()
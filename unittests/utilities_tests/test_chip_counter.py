@@ -0,0 +1,129 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import unittest
+from spinn_utilities.config_holder import set_config
+from spinn_utilities.timer import Timer
+from pacman.config_setup import unittest_setup
+from pacman.data import PacmanDataView
+from pacman.data.pacman_data_writer import PacmanDataWriter
+from pacman.exceptions import PacmanConfigurationException
+from pacman.model.resources import ConstantSDRAM, VariableSDRAM
+from pacman.utilities.utility_objs import ChipCounter
+
+
+def _chip_sdram():
+    return PacmanDataView.get_machine_version().max_sdram_per_chip
+
+
+def _random_sdrams(n_cores, seed):
+    rng = random.Random(seed)
+    sdram = _chip_sdram()
+    # Mostly small, with some big enough to fill a chip on their own
+    return [rng.choice([0, sdram // 100, sdram // 7, sdram // 3, sdram + 1])
+            if rng.random() < 0.2 else rng.randint(0, sdram // 20)
+            for _ in range(n_cores)]
+
+
+class TestChipCounter(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+        set_config("Machine", "version", 5)
+        PacmanDataWriter.mock().set_plan_n_timesteps(100)
+
+    def test_add_cores_same_as_add_core(self):
+        sdrams = _random_sdrams(2000, 1)
+        one_by_one = ChipCounter()
+        for sdram in sdrams:
+            one_by_one.add_core(ConstantSDRAM(sdram))
+        in_bulk = ChipCounter()
+        # Mixed with single cores, so each call carries on from the last
+        in_bulk.add_cores(sdrams[:700])
+        in_bulk.add_core(ConstantSDRAM(sdrams[700]))
+        in_bulk.add_cores(sdrams[701:])
+        self.assertEqual(one_by_one.n_chips, in_bulk.n_chips)
+
+    def test_per_timestep(self):
+        one_by_one = ChipCounter()
+        in_bulk = ChipCounter()
+        fixed = [1000, 20000, 3000000]
+        per_timestep = [0.5, 100, 1234.25]
+        for f, p in zip(fixed, per_timestep):
+            one_by_one.add_core(VariableSDRAM(f, p))
+        in_bulk.add_cores(fixed, per_timestep)
+        self.assertEqual(one_by_one.n_chips, in_bulk.n_chips)
+
+        PacmanDataWriter.mock().set_plan_n_timesteps(None)
+        counter = ChipCounter()
+        counter.add_cores(fixed, [0, 0, 0])
+        with self.assertRaises(PacmanConfigurationException):
+            counter.add_cores(fixed, per_timestep)
+
+    def test_best_fit_decreasing(self):
+        third = _chip_sdram() // 3
+        # Next fit puts each small core with a big one and needs a chip for
+        # each pair; packing the big ones first needs fewer
+        sdrams = [2 * third, third // 2] * 6
+        counter = ChipCounter()
+        counter.add_cores(sdrams)
+        self.assertEqual(6, counter.n_chips)
+
+        set_config("Mapping", "chip_counter_best_fit_decreasing", "True")
+        counter = ChipCounter()
+        self.assertEqual(0, counter.n_chips)
+        counter.add_cores(sdrams)
+        self.assertEqual(6, counter.n_chips)
+        counter.add_cores([third // 2] * 6)
+        self.assertEqual(6, counter.n_chips)
+        counter.add_core(ConstantSDRAM(third))
+        self.assertEqual(7, counter.n_chips)
+
+    def test_too_big(self):
+        for best_fit in ("False", "True"):
+            set_config("Mapping", "chip_counter_best_fit_decreasing", best_fit)
+            counter = ChipCounter()
+            counter.add_cores([_chip_sdram() * 2, 0, _chip_sdram() * 2])
+            self.assertEqual(3, counter.n_chips)
+
+
+def test_chip_counter_benchmark():
+    unittest_setup()
+    set_config("Machine", "version", 5)
+    PacmanDataWriter.mock().set_plan_n_timesteps(100)
+    sdrams = _random_sdrams(100000, 2)
+    results = dict()
+    for best_fit in ("False", "True"):
+        set_config("Mapping", "chip_counter_best_fit_decreasing", best_fit)
+        one_by_one = ChipCounter()
+        timer = Timer()
+        with timer:
+            for sdram in sdrams:
+                one_by_one.add_core(ConstantSDRAM(sdram))
+            n_chips = one_by_one.n_chips
+        in_bulk = ChipCounter()
+        bulk_timer = Timer()
+        with bulk_timer:
+            in_bulk.add_cores(sdrams)
+            assert in_bulk.n_chips == n_chips
+        results[best_fit] = n_chips
+        print(f"Best fit decreasing {best_fit}: {n_chips} chips; "
+              f"add_core {timer.measured_interval}, "
+              f"add_cores {bulk_timer.measured_interval}")
+    assert results["True"] < results["False"]
+
+
+if __name__ == '__main__':
+    unittest.main()
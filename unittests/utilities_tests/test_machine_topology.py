@@ -0,0 +1,88 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from spinn_utilities.config_holder import set_config
+from spinn_machine import virtual_machine
+from pacman.config_setup import unittest_setup
+from pacman.data import PacmanDataView
+from pacman.data.pacman_data_writer import PacmanDataWriter
+from pacman.utilities.algorithm_utilities.machine_topology import (
+    MachineTopology, NO_CHIP)
+
+
+class TestMachineTopology(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+
+    def test_matches_machine(self):
+        set_config("Machine", "version", 5)
+        set_config("Machine", "down_chips", "2,3:3,2")
+        machine = virtual_machine(8, 8)
+        topology = MachineTopology(machine)
+        self.assertEqual(machine.n_chips, topology.n_chips)
+        self.assertEqual(NO_CHIP, topology.chip_id((2, 3)))
+        for chip_id, (x, y) in enumerate(topology.xys):
+            self.assertEqual(chip_id, topology.chip_id((x, y)))
+            self.assertEqual((x, y), topology.xy(chip_id))
+            for link in range(6):
+                next_id = topology.neighbour(chip_id, link)
+                self.assertEqual(
+                    next_id, topology.neighbours[chip_id, link])
+                if next_id == NO_CHIP:
+                    self.assertFalse(topology.is_usable_link((x, y), link))
+                    if machine.is_link_at(x, y, link):
+                        self.assertFalse(machine.is_chip_at(
+                            *machine.xy_over_link(x, y, link)))
+                else:
+                    self.assertTrue(topology.is_usable_link((x, y), link))
+                    self.assertEqual(
+                        machine.xy_over_link(x, y, link),
+                        topology.xy(next_id))
+        self.assertFalse(topology.is_usable_link((2, 3), 0))
+
+    def test_view_caches_per_machine(self):
+        set_config("Machine", "version", 5)
+        writer = PacmanDataWriter.mock()
+        writer.set_machine(virtual_machine(8, 8))
+        topology = PacmanDataView.get_machine_topology()
+        self.assertIs(topology, PacmanDataView.get_machine_topology())
+        machine = virtual_machine(8, 8)
+        writer.set_machine(machine)
+        topology2 = PacmanDataView.get_machine_topology()
+        self.assertIsNot(topology, topology2)
+        self.assertIs(machine, topology2.machine)
+
+    def test_without(self):
+        set_config("Machine", "version", 5)
+        topology = MachineTopology(virtual_machine(8, 8))
+        faulty = topology.without([(3, 3)], [(1, 1, 0)])
+        self.assertEqual(topology.xys, faulty.xys)
+        self.assertNotEqual(topology.signature, faulty.signature)
+        # Nothing to or from the failed chip
+        for link in range(6):
+            self.assertFalse(faulty.is_usable_link((3, 3), link))
+        self.assertNotIn(faulty.chip_id((3, 3)), faulty.neighbours)
+        # The failed link is gone in both directions
+        self.assertTrue(topology.is_usable_link((1, 1), 0))
+        self.assertFalse(faulty.is_usable_link((1, 1), 0))
+        self.assertFalse(faulty.is_usable_link((2, 1), 3))
+        self.assertTrue(faulty.is_usable_link((1, 1), 1))
+        # The original is unchanged
+        self.assertTrue(topology.is_usable_link((3, 3), 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from pacman.config_setup import unittest_setup
+from pacman.utilities.algorithm_utilities.path_cache import PathCache
+
+
+class TestPathCache(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+
+    def test_lru(self):
+        cache = PathCache(2)
+        path_a = ((0, (1, 0)),)
+        path_b = ((2, (0, 1)),)
+        path_c = ((1, (1, 1)),)
+        self.assertIsNone(cache.get_path((0, 0), (1, 0)))
+        cache.add_path((0, 0), (1, 0), path_a)
+        cache.add_path((0, 0), (0, 1), path_b)
+        self.assertEqual(path_a, cache.get_path((0, 0), (1, 0)))
+        # (0, 0) -> (0, 1) is now the least recently used
+        cache.add_path((0, 0), (1, 1), path_c)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get_path((0, 0), (0, 1)))
+        self.assertEqual(path_a, cache.get_path((0, 0), (1, 0)))
+        self.assertEqual(path_c, cache.get_path((0, 0), (1, 1)))
+        self.assertEqual(3, cache.hits)
+        self.assertEqual(2, cache.misses)
+        cache.add_counts(4, 5)
+        self.assertEqual(7, cache.hits)
+        self.assertEqual(7, cache.misses)
+
+    def test_zero_size(self):
+        cache = PathCache(0)
+        cache.add_path((0, 0), (1, 0), ((0, (1, 0)),))
+        self.assertEqual(0, len(cache))
+        self.assertIsNone(cache.get_path((0, 0), (1, 0)))
+        self.assertEqual(1, cache.misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+# Copyright (c) 2024 The University of Manchester
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from pacman.config_setup import unittest_setup
+from pacman.utilities.utility_calls import map_in_fork, split_into_shards
+
+
+class TestUtilityCalls(unittest.TestCase):
+
+    def setUp(self):
+        unittest_setup()
+
+    def test_split_into_shards(self):
+        self.assertEqual([range(0, 4), range(4, 7), range(7, 10)],
+                         split_into_shards(10, 3))
+        self.assertEqual([range(0, 1), range(1, 2)], split_into_shards(2, 5))
+
+    def test_map_in_fork(self):
+        # The state includes a lambda, which could not be pickled
+        state = (lambda item: item * 2, 1)
+        shards = split_into_shards(100, 8)
+        for n_processes in (1, 3):
+            self.assertEqual(
+                [sum(range(2 * shard.start + 1, 2 * shard.stop + 1, 2))
+                 for shard in shards],
+                list(map_in_fork(
+                    state, lambda s, shard: sum(
+                        s[0](i) + s[1] for i in shard),
+                    shards, n_processes)))
+
+
+if __name__ == '__main__':
+    unittest.main()